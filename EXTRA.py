@@ -1,12 +1,80 @@
-from time import time, sleep
-import tkinter as tk
+from collections import deque, namedtuple
+from time import perf_counter, time, sleep
+import itertools
+import json
+import queue
+import threading
+
+from indice_espacial import RejillaCubetas, mas_cercano
+
+try:
+    import tkinter as tk
+except ImportError:  # sin Tk solo falta la ventana; Simulador funciona igual
+    tk = None
+
+try:
+    import numpy as np
+except ImportError:  # PseudoAzar rellena los bloques en Python puro
+    np = None
 
 # -------- Pseudo-azar SIN 'random' --------
+# SplitMix64: el número i sale de (semilla + i * DORADO) sin depender del
+# anterior, así que un bloque entero se calcula de una vez (con NumPy o sin él,
+# y la serie es la misma)
+DORADO = 0x9E3779B97F4A7C15
+MEZCLA1 = 0xBF58476D1CE4E5B9
+MEZCLA2 = 0x94D049BB133111EB
+MASCARA64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _bloque_python(semilla, inicio, n):
+    """Los u32 de las posiciones inicio+1 .. inicio+n (Python puro)."""
+    bloque = []
+    for i in range(inicio + 1, inicio + n + 1):
+        z = (semilla + i * DORADO) & MASCARA64
+        z = ((z ^ (z >> 30)) * MEZCLA1) & MASCARA64
+        z = ((z ^ (z >> 27)) * MEZCLA2) & MASCARA64
+        bloque.append((z ^ (z >> 31)) >> 32)
+    return bloque
+
+
+def _bloque_numpy(semilla, inicio, n):
+    """Lo mismo que _bloque_python, con arrays (la aritmética uint64 ya da la vuelta)."""
+    z = np.uint64(semilla) + np.arange(inicio + 1, inicio + n + 1, dtype=np.uint64) * np.uint64(DORADO)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(MEZCLA1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(MEZCLA2)
+    return ((z ^ (z >> np.uint64(31))) >> np.uint64(32)).tolist()
+
+
 class PseudoAzar:
-    def __init__(self, semilla=None):
+    """
+    Por defecto depende solo de la semilla: los números salen de bloques
+    de tam_bloque calculados de golpe (con NumPy si está; con_numpy=False
+    fuerza la versión en Python puro, que da la misma serie).
+    reloj=True es el modo antiguo: cada número mezcla la hora actual, así
+    que no se puede repetir una ejecución.
+    """
+
+    def __init__(self, semilla=None, reloj=False, tam_bloque=4096, con_numpy=True):
         self.s = semilla if semilla is not None else int(time() * 1000)
+        self.reloj = reloj
+        if reloj:
+            return
+        self.semilla = self.s & MASCARA64
+        self.tam_bloque = tam_bloque
+        self._generar = _bloque_numpy if con_numpy and np is not None else _bloque_python
+        self._usados = 0  # números ya calculados
+        # next_u32 pasa a ser el __next__ de un iterador sobre los bloques
+        self.next_u32 = itertools.chain.from_iterable(self._bloques()).__next__
+
+    def _bloques(self):
+        while True:
+            bloque = self._generar(self.semilla, self._usados, self.tam_bloque)
+            self._usados += self.tam_bloque
+            yield bloque
 
     def next_u32(self):
+        # solo en modo reloj (en el otro lo tapa el atributo de __init__)
         tms = int(time() * 1000)
         # mezcla tipo xorshift + LCG simple
         self.s ^= (tms & 0xFFFFFFFF)
@@ -22,6 +90,111 @@ class PseudoAzar:
     def rand01(self) -> float:
         return (self.next_u32() & 0xFFFFFF) / float(0x1000000)
 
+    def cara(self) -> bool:
+        """Moneda al aire (en modo reloj, como siempre: la paridad de los milisegundos)."""
+        if self.reloj:
+            return int(time() * 1000) % 2 == 0
+        return self.next_u32() < 0x80000000
+
+
+# -------- Registro de eventos (en vez de print) --------
+# niveles, de más a menos detalle
+TABLERO = 5      # estado de todo el tablero en cada tick
+DETALLE = 10     # cada mini-acción de un encuentro
+INFO = 20        # encuentros y nacimientos
+
+Evento = namedtuple("Evento", "tick nivel tipo datos")
+
+
+def texto_evento(ev):
+    """El evento como la línea que antes salía por consola (None si no había)."""
+    d = ev.datos
+    if ev.tipo == "estado":
+        estado = " | ".join(f"{n}:{(x, y)} E{e} I{i}" for n, x, y, e, i in d["personas"])
+        return f"[Tablero {d['ancho']}x{d['alto']}] {estado}"
+    if ev.tipo == "encuentro":
+        return f"\n🤝 {d['a']} y {d['b']} se encuentran en {d['pos']}"
+    if ev.tipo == "nacimiento":
+        return f"   👶 Nace {d['nombre']} en {d['pos']} (E{d['energia']}, I{d['ideas']})"
+    a, b = d["a"], d["b"]
+    (ea, eb), (ia, ib) = d["energia"], d["ideas"]
+    if d["accion"] == "cooperan":
+        return f"   🔧 Cooperan → {a}:{ea} | {b}:{eb}"
+    if d["accion"] == "debaten":
+        return f"   🗣 Debaten → {a}:{ea} | {b}:{eb}"
+    if d["accion"] == "idea":
+        if d["de"] is None:
+            return "   🤷 No tenían ideas que intercambiar."
+        return f"   🔄 {d['de']} comparte una idea → {a}:{ia} | {b}:{ib}"
+    if d["de"] is None:
+        return None
+    return f"   ⚡ {d['de']} cede 1 energía → {a}:{ea} | {b}:{eb}"
+
+
+class RegistroEventos:
+    """
+    Registro estructurado de la simulación:
+    - los últimos 'capacidad' eventos quedan en un buffer circular (ultimos());
+    - con destino (ruta de fichero o función que recibe una lista de eventos)
+      se envían por lotes de 'vaciar_cada' (en fichero, un JSON por línea);
+    - consola=True imprime además cada evento como antes.
+    Los eventos por debajo de 'nivel' se descartan sin guardarlos.
+    ultimos() se puede llamar desde otro hilo (la GUI) mientras se registra.
+    """
+
+    def __init__(self, nivel=DETALLE, capacidad=1000, destino=None,
+                 vaciar_cada=500, consola=False):
+        self.nivel = nivel
+        self.buffer = deque(maxlen=capacidad)
+        self.cerrojo = threading.Lock()     # protege buffer
+        self.destino = destino
+        self.vaciar_cada = vaciar_cada
+        self.consola = consola
+        self.tick = 0
+        self._pendientes = []
+
+    def activo(self, nivel):
+        """Para no preparar los datos de un evento que se va a descartar."""
+        return nivel >= self.nivel
+
+    def registrar(self, nivel, tipo, **datos):
+        if nivel < self.nivel:
+            return
+        ev = Evento(self.tick, nivel, tipo, datos)
+        with self.cerrojo:
+            self.buffer.append(ev)
+        if self.consola:
+            linea = texto_evento(ev)
+            if linea is not None:
+                print(linea)
+        if self.destino is not None:
+            self._pendientes.append(ev)
+            if len(self._pendientes) >= self.vaciar_cada:
+                self.vaciar()
+
+    def vaciar(self):
+        """Envía al destino los eventos pendientes."""
+        if not self._pendientes:
+            return
+        lote, self._pendientes = self._pendientes, []
+        if callable(self.destino):
+            self.destino(lote)
+            return
+        with open(self.destino, "a", encoding="utf-8") as f:
+            for ev in lote:
+                f.write(json.dumps(ev._asdict(), ensure_ascii=False) + "\n")
+
+    def cerrar(self):
+        self.vaciar()
+
+    def ultimos(self, n=20, tipo=None):
+        """Los n eventos más recientes (opcionalmente de un tipo), del más antiguo al último."""
+        with self.cerrojo:
+            eventos = list(self.buffer)
+        if tipo is None:
+            return eventos[-n:]
+        return [ev for ev in eventos if ev.tipo == tipo][-n:]
+
 
 # -------- Lógica de movimiento --------
 class Desplazamiento:
@@ -69,77 +242,108 @@ class Persona:
         dx, dy = self.move.paso_aleatorio()
         self.set_pos(self.x + dx, self.y + dy)
 
-    def paso(self, vecinos):
+    def mas_cercano(self, vecinos, rejilla=None, clave=None):
+        """
+        Posición más cercana (Manhattan, empates al primero de la lista).
+        Con rejilla (RejillaCubetas de posiciones) busca en ella sin contar
+        la entrada 'clave' en vez de recorrer vecinos.
+        """
+        if rejilla is not None:
+            entrada = mas_cercano((rejilla,), self.x, self.y, excluir=clave)
+            return None if entrada is None else (entrada[0], entrada[1])
+        if vecinos:
+            return min(vecinos, key=lambda p: abs(p[0] - self.x) + abs(p[1] - self.y))
+        return None
+
+    def paso(self, vecinos, rejilla=None, clave=None):
         """4 pasos por tick, 60% sesgo a acercarse al más cercano"""
         for _ in range(4):
-            if vecinos:
-                tx, ty = min(vecinos, key=lambda p: abs(p[0] - self.x) + abs(p[1] - self.y))
+            objetivo = self.mas_cercano(vecinos, rejilla, clave)
+            if objetivo is not None:
                 if self.rng.rand01() < 0.6:
-                    self.mover_hacia((tx, ty))
+                    self.mover_hacia(objetivo)
                 else:
                     self.mover_aleatorio()
             else:
                 self.mover_aleatorio()
 
-    def interactuar(self, otra, nombre_nuevo_cb):
+    def interactuar(self, otra, nombre_nuevo_cb, registro=None):
         """
         Interacción: varias mini-acciones.
         Si en total se transfieren >=2 puntos de energía en este encuentro,
-        nace una nueva persona en la misma celda.
+        nace una nueva persona en la misma celda. nombre_nuevo_cb da su
+        nombre, o None si no hay sitio para ella (y entonces no nace).
+        Lo que pasa se anota en 'registro' (RegistroEventos), si se da.
         """
-        print(f"\n🤝 {self.nombre} y {otra.nombre} se encuentran en {self.posicion()}")
+        if registro is not None:
+            registro.registrar(INFO, "encuentro", a=self.nombre, b=otra.nombre,
+                               pos=self.posicion())
         energia_transferida = 0
         nuevos = []
 
         for _ in range(3):  # tres mini-acciones
+            antes = (self.energia, otra.energia)
+            quien = None  # quién da la idea o la energía
             accion = self.rng.indice(4)
             if accion == 0:
                 # cooperación
+                tipo = "cooperan"
                 self.energia += 1
                 otra.energia += 1
-                print(f"   🔧 Cooperan → {self.nombre}:{self.energia} | {otra.nombre}:{otra.energia}")
 
             elif accion == 1:
                 # debate
+                tipo = "debaten"
                 if self.energia > 0:
                     self.energia -= 1
                 if otra.energia > 0:
                     otra.energia -= 1
-                print(f"   🗣 Debaten → {self.nombre}:{self.energia} | {otra.nombre}:{otra.energia}")
 
             elif accion == 2:
                 # trueque de ideas
+                tipo = "idea"
                 if self.ideas > 0:
                     self.ideas -= 1
                     otra.ideas += 1
-                    print(f"   🔄 {self.nombre} comparte una idea → {self.nombre}:{self.ideas} | {otra.nombre}:{otra.ideas}")
+                    quien = self.nombre
                 elif otra.ideas > 0:
                     otra.ideas -= 1
                     self.ideas += 1
-                    print(f"   🔄 {otra.nombre} comparte una idea → {self.nombre}:{self.ideas} | {otra.nombre}:{otra.ideas}")
-                else:
-                    print("   🤷 No tenían ideas que intercambiar.")
+                    quien = otra.nombre
 
             else:
                 # transferencia de energía (cuenta)
-                if int(time() * 1000) % 2 == 0 and self.energia > 0:
+                tipo = "energia"
+                if self.rng.cara() and self.energia > 0:
                     self.energia -= 1
                     otra.energia += 1
                     energia_transferida += 1
-                    print(f"   ⚡ {self.nombre} cede 1 energía → {self.nombre}:{self.energia} | {otra.nombre}:{otra.energia}")
+                    quien = self.nombre
                 elif otra.energia > 0:
                     otra.energia -= 1
                     self.energia += 1
                     energia_transferida += 1
-                    print(f"   ⚡ {otra.nombre} cede 1 energía → {self.nombre}:{self.energia} | {otra.nombre}:{otra.energia}")
+                    quien = otra.nombre
+
+            if registro is not None:
+                registro.registrar(
+                    DETALLE, "accion", a=self.nombre, b=otra.nombre, accion=tipo, de=quien,
+                    energia=(self.energia, otra.energia), ideas=(self.ideas, otra.ideas),
+                    delta_energia=(self.energia - antes[0], otra.energia - antes[1]),
+                )
 
             # nacimiento
             if energia_transferida >= 2 and not nuevos:
                 nombre = nombre_nuevo_cb()
+                if nombre is None:
+                    continue
                 bebe = Persona(nombre, self.x, self.y, self.rng,
                                ancho=self.ancho, alto=self.alto,
                                energia=5, ideas=1)
-                print(f"   👶 Nace {nombre} en {bebe.posicion()} (E5, I1)")
+                if registro is not None:
+                    registro.registrar(INFO, "nacimiento", nombre=nombre, pos=bebe.posicion(),
+                                       energia=bebe.energia, ideas=bebe.ideas,
+                                       padres=(self.nombre, otra.nombre))
                 nuevos.append(bebe)
 
         return nuevos
@@ -147,15 +351,43 @@ class Persona:
 
 # -------- Simulador (CONEXIÓN entre lógica y GUI) --------
 class Simulador:
-    def __init__(self, ancho=4, alto=4):
+    # qué hacer con los nacimientos cuando se llega a max_poblacion
+    POLITICAS = ("sin_nacimientos", "sacrificio")
+
+    def __init__(self, ancho=4, alto=4, n_personas=4, max_poblacion=None,
+                 politica="sin_nacimientos", registro=None, semilla=None, reloj=False):
+        """
+        n_personas: población inicial (las 4 primeras son Ana, Luis, Iris
+        y Omar en la diagonal; el resto, en casillas al azar).
+        registro: RegistroEventos donde se anota lo que pasa (por defecto
+        uno en memoria, sin consola).
+        semilla, reloj: para PseudoAzar (con la misma semilla y sin reloj,
+        la ejecución se repite igual).
+        max_poblacion: tope opcional. Al llegar a él, con "sin_nacimientos"
+        no se añaden más bebés; con "sacrificio" se añaden y luego se quita
+        a los de menos energía hasta volver al tope.
+        """
+        if politica not in self.POLITICAS:
+            raise ValueError(f"política desconocida: {politica!r} (opciones: {self.POLITICAS})")
         self.ancho = ancho
         self.alto = alto
-        self.rng = PseudoAzar()
+        self.max_poblacion = max_poblacion
+        self.politica = politica
+        self.registro = registro if registro is not None else RegistroEventos()
+        self.tick = 0
+        self.rng = PseudoAzar(semilla, reloj=reloj)
 
         # contador para nombres de nuevos agentes
         self._contador_nuevos = {"n": 1}
+        # bebés de este tick, que aún no están en self.personas
+        self._por_nacer = 0
 
         def nombre_nuevo():
+            """Nombre del próximo bebé, o None si con "sin_nacimientos" ya no cabe."""
+            if (self.max_poblacion is not None and self.politica == "sin_nacimientos"
+                    and len(self.personas) + self._por_nacer >= self.max_poblacion):
+                return None
+            self._por_nacer += 1
             n = self._contador_nuevos["n"]
             self._contador_nuevos["n"] += 1
             return f"Nuevo{n}"
@@ -168,62 +400,230 @@ class Simulador:
             Persona("Luis", 1, 1, self.rng, ancho, alto),
             Persona("Iris", 2, 2, self.rng, ancho, alto),
             Persona("Omar", 3, 3, self.rng, ancho, alto),
-        ]
+        ][:n_personas]
+        for i in range(len(self.personas), n_personas):
+            self.personas.append(
+                Persona(f"P{i + 1}", self.rng.indice(ancho), self.rng.indice(alto),
+                        self.rng, ancho, alto)
+            )
 
         self._ultima_interacciones = []  # para que la GUI dibuje líneas rojas
 
     def step(self):
         """Un 'tick' de simulación."""
-        # mover todos
-        posiciones = [p.posicion() for p in self.personas]
+        # mover todos: cada uno busca al más cercano entre las posiciones del
+        # inicio del tick (en una rejilla de cubetas, sin recorrer a todos)
+        rejilla = RejillaCubetas(self.ancho, self.alto)
         for idx, p in enumerate(self.personas):
-            otros = posiciones[:idx] + posiciones[idx + 1:]
-            p.paso(otros)
+            rejilla.insertar(idx, p.x, p.y, idx)
+        for idx, p in enumerate(self.personas):
+            p.paso(None, rejilla, idx)
 
         # validación de límites
         for p in self.personas:
             assert 0 <= p.x < p.ancho and 0 <= p.y < p.alto, (p.nombre, p.posicion(), p.ancho, p.alto)
 
-        # estado por consola (opcional)
-        estado = " | ".join(f"{p.nombre}:{p.posicion()} E{p.energia} I{p.ideas}" for p in self.personas)
-        print(f"[Tablero {self.ancho}x{self.alto}] {estado}")
+        # estado del tablero (solo si el registro lo quiere: es O(N))
+        if self.registro.activo(TABLERO):
+            self.registro.registrar(
+                TABLERO, "estado", ancho=self.ancho, alto=self.alto,
+                personas=[(p.nombre, p.x, p.y, p.energia, p.ideas) for p in self.personas],
+            )
 
-        # encuentros
+        # encuentros: se agrupa por casilla y se recorren las parejas de cada
+        # una en el mismo orden (i, j) que el doble bucle sobre todos
         nacimientos = []
         interacciones = []
-        for i in range(len(self.personas)):
-            for j in range(i + 1, len(self.personas)):
-                if self.personas[i].posicion() == self.personas[j].posicion():
-                    interacciones.append((self.personas[i], self.personas[j]))
-                    nac = self.personas[i].interactuar(self.personas[j], self.nombre_nuevo)
-                    nacimientos.extend(nac)
+        for i, j in self.parejas_en_misma_casilla():
+            a, b = self.personas[i], self.personas[j]
+            interacciones.append((a, b))
+            nacimientos.extend(a.interactuar(b, self.nombre_nuevo, self.registro))
 
+        # los bebés se añaden todos juntos al final del tick
         if nacimientos:
-            self.personas.extend(nacimientos)
+            self._anadir_nacimientos(nacimientos)
+        self._por_nacer = 0
 
         self._ultima_interacciones = interacciones
+        self.tick += 1
+        self.registro.tick = self.tick
+
+    def parejas_en_misma_casilla(self):
+        """Parejas (i, j), i < j, de personas en la misma casilla, ordenadas."""
+        por_casilla = {}
+        for idx, p in enumerate(self.personas):
+            por_casilla.setdefault(p.posicion(), []).append(idx)
+        parejas = [
+            (grupo[a], grupo[b])
+            for grupo in por_casilla.values() if len(grupo) > 1
+            for a in range(len(grupo))
+            for b in range(a + 1, len(grupo))
+        ]
+        parejas.sort()
+        return parejas
+
+    def _anadir_nacimientos(self, nacimientos):
+        # con "sin_nacimientos" solo han nacido los que caben (ver nombre_nuevo)
+        self.personas.extend(nacimientos)
+        if self.max_poblacion is not None and self.politica == "sacrificio":
+            # fuera los de menos energía (a igualdad, los primeros)
+            sobran = len(self.personas) - self.max_poblacion
+            if sobran > 0:
+                fuera = set(sorted(range(len(self.personas)),
+                                   key=lambda i: self.personas[i].energia)[:sobran])
+                self.personas = [p for i, p in enumerate(self.personas) if i not in fuera]
 
     def obtener_interacciones(self):
         """Usado por la GUI para dibujar líneas entre agentes que se encuentran."""
         return self._ultima_interacciones
 
+    def ultimos_eventos(self, n=20, tipo=None):
+        """Para la GUI: los últimos eventos del registro, ya estructurados."""
+        return self.registro.ultimos(n, tipo)
+
+    def cerrar(self):
+        """Al terminar: envía al destino lo que quede pendiente en el registro."""
+        self.registro.cerrar()
+
+    def fotograma(self):
+        """Copia inmutable de lo que la GUI dibuja (se puede pasar a otro hilo)."""
+        return Fotograma(
+            self.tick,
+            tuple((p.nombre, p.x, p.y, p.energia, p.ideas) for p in self.personas),
+            tuple((a.posicion(), b.posicion()) for a, b in self._ultima_interacciones),
+        )
+
+
+# -------- Simulación en segundo plano --------
+# personas: (nombre, x, y, energia, ideas); interacciones: ((x1, y1), (x2, y2))
+Fotograma = namedtuple("Fotograma", "tick personas interacciones")
+
+
+class HiloSimulacion(threading.Thread):
+    """
+    Ejecuta sim.step() en un hilo aparte a ticks_por_segundo (0 = lo más
+    rápido posible) y deja un Fotograma por tick en una cola acotada.
+    Si la cola está llena se tira el fotograma más viejo: quien dibuja
+    siempre encuentra el más reciente y la simulación no espera por él.
+    Un hilo (y no un proceso) basta: Python alterna los hilos cada pocos
+    milisegundos, así que la ventana responde aunque un step() sea largo.
+    step() solo se llama desde este hilo: el botón "Paso" pide un tick con
+    pedir_paso() y el hilo lo da cuando está en pausa.
+    """
+
+    def __init__(self, sim, ticks_por_segundo=2.0, max_fotogramas=2):
+        super().__init__(daemon=True)
+        self.sim = sim
+        self.ticks_por_segundo = ticks_por_segundo
+        self.fotogramas = queue.Queue(maxsize=max_fotogramas)
+        self.cerrojo = threading.Lock()   # protege _pasos_pedidos
+        self._pasos_pedidos = 0
+        self._en_marcha = threading.Event()
+        self._parar = threading.Event()
+        self._despertar = threading.Event()   # lo espera el hilo en pausa
+
+    def reanudar(self):
+        self._en_marcha.set()
+        self._despertar.set()
+
+    def pausar(self):
+        self._en_marcha.clear()
+
+    def detener(self):
+        self._parar.set()
+        self._despertar.set()   # por si estaba esperando en pausa
+
+    def pedir_paso(self):
+        """Para el botón "Paso": un tick que dará el hilo (no quien llama)."""
+        with self.cerrojo:
+            self._pasos_pedidos += 1
+        self._despertar.set()
+
+    def _tomar_paso(self):
+        with self.cerrojo:
+            if self._pasos_pedidos == 0:
+                return False
+            self._pasos_pedidos -= 1
+            return True
+
+    def paso(self):
+        """Un tick y su fotograma (solo desde el hilo)."""
+        self.sim.step()
+        self.publicar(self.sim.fotograma())
+
+    def publicar(self, foto):
+        while True:
+            try:
+                self.fotogramas.put_nowait(foto)
+                return
+            except queue.Full:
+                try:
+                    self.fotogramas.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def ultimo_fotograma(self):
+        """El fotograma más reciente de la cola (None si no hay ninguno nuevo)."""
+        foto = None
+        while True:
+            try:
+                foto = self.fotogramas.get_nowait()
+            except queue.Empty:
+                return foto
+
+    def run(self):
+        siguiente = perf_counter()
+        while not self._parar.is_set():
+            if not self._en_marcha.is_set():
+                if self._tomar_paso():
+                    self.paso()
+                    continue
+                self._despertar.wait()
+                self._despertar.clear()
+                siguiente = perf_counter()
+                continue
+            self.paso()
+            if self.ticks_por_segundo > 0:
+                siguiente = max(siguiente + 1.0 / self.ticks_por_segundo, perf_counter() - 0.1)
+                espera = siguiente - perf_counter()
+                if espera > 0:
+                    sleep(espera)
+            else:
+                sleep(0)   # deja pasar al hilo de la ventana
+
 
 # --------- PARTE GUI (Tkinter) ---------
-GRID_SIZE = 4          # tamaño del espacio (4x4)
-CELL_SIZE = 80         # tamaño de cada casilla en píxeles
+GRID_SIZE = 4          # tamaño del espacio por defecto (4x4)
+CELL_SIZE = 80         # tamaño máximo de cada casilla en píxeles
+MAX_LADO_PX = 800      # el tablero se encoge para caber en esto
+MIN_CELDA_TEXTO = 24   # por debajo, los agentes van sin nombre
 
 
 class VentanaSimulacion:
-    def __init__(self, simulador):
+    """
+    El canvas no se borra entre ticks: la rejilla se dibuja una vez y cada
+    agente conserva su círculo (y su nombre), que solo se mueve con coords
+    si cambió de casilla. Las líneas de interacción se reutilizan de una
+    reserva y las que sobran se ocultan.
+    La simulación corre en un HiloSimulacion; la ventana mira la cola cada
+    SONDEO_MS y dibuja solo el último fotograma (se salta los intermedios).
+    """
+
+    SONDEO_MS = 30
+
+    def __init__(self, simulador, ticks_por_segundo=2.0):
         self.sim = simulador
+        self.hilo = HiloSimulacion(simulador, ticks_por_segundo)
+        lado = max(simulador.ancho, simulador.alto)
+        self.celda = max(2, min(CELL_SIZE, MAX_LADO_PX // lado))
 
         # Crear ventana
         self.root = tk.Tk()
-        self.root.title("Simulación 4x4")
+        self.root.title(f"Simulación {simulador.ancho}x{simulador.alto}")
 
         # Canvas donde dibujamos el grid y los elementos
-        w = GRID_SIZE * CELL_SIZE
-        h = GRID_SIZE * CELL_SIZE
+        w = simulador.ancho * self.celda
+        h = simulador.alto * self.celda
         self.canvas = tk.Canvas(self.root, width=w, height=h)
         self.canvas.pack()
 
@@ -233,76 +633,129 @@ class VentanaSimulacion:
         tk.Button(frame, text="Paso", command=self.un_paso).pack(side=tk.LEFT, padx=5)
         tk.Button(frame, text="Auto", command=self.modo_auto).pack(side=tk.LEFT, padx=5)
         tk.Button(frame, text="Parar", command=self.parar_auto).pack(side=tk.LEFT, padx=5)
+        self.velocidad = tk.Scale(frame, from_=1, to=200, orient=tk.HORIZONTAL,
+                                  label="ticks/s", command=self.cambiar_velocidad)
+        self.velocidad.set(ticks_por_segundo)
+        self.velocidad.pack(side=tk.LEFT, padx=5)
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
 
-        self.auto = False
+        # elementos del canvas que se conservan entre ticks
+        self._agentes = {}     # nombre -> (id círculo, id texto o None, (x, y) dibujada)
+        self._lineas = []      # reserva de líneas de interacción
+        self._lineas_visibles = 0
 
         # Dibujar inicial
-        self.dibujar()
+        self.dibujar_grid()
+        self.dibujar(simulador.fotograma())
+
+        self.hilo.start()
+        self.root.after(self.SONDEO_MS, self.sondear)
 
     # ---------------------- DIBUJO ----------------------------
 
-    def dibujar(self):
-        self.canvas.delete("all")     # limpia canvas
-        self.dibujar_grid()
-        self.dibujar_personas()
-        self.dibujar_interacciones()
+    def dibujar(self, foto):
+        self.dibujar_personas(foto.personas)
+        self.dibujar_interacciones(foto.interacciones)
 
-    def dibujar_grid(self):
-        for i in range(GRID_SIZE + 1):
-            x = i * CELL_SIZE
-            y = i * CELL_SIZE
-
-            # Líneas verticales
-            self.canvas.create_line(x, 0, x, GRID_SIZE * CELL_SIZE, width=2)
-
-            # Líneas horizontales
-            self.canvas.create_line(0, y, GRID_SIZE * CELL_SIZE, y, width=2)
-
-    def dibujar_personas(self):
-        """Dibuja cada persona como un círculo con su nombre."""
-        for p in self.sim.personas:
-            cx = p.x * CELL_SIZE + CELL_SIZE / 2
-            cy = p.y * CELL_SIZE + CELL_SIZE / 2
-            r = CELL_SIZE * 0.3
-
-            self.canvas.create_oval(
-                cx - r, cy - r, cx + r, cy + r,
-                fill="lightblue", outline="black", width=2
-            )
-            self.canvas.create_text(cx, cy, text=p.nombre)
+    def _centro(self, x, y):
+        return x * self.celda + self.celda / 2, y * self.celda + self.celda / 2
 
-    def dibujar_interacciones(self):
+    def dibujar_grid(self):
+        """Solo una vez: la rejilla no cambia."""
+        w = self.sim.ancho * self.celda
+        h = self.sim.alto * self.celda
+        grosor = 2 if self.celda >= MIN_CELDA_TEXTO else 1
+        # Líneas verticales
+        for i in range(self.sim.ancho + 1):
+            self.canvas.create_line(i * self.celda, 0, i * self.celda, h, width=grosor)
+        # Líneas horizontales
+        for j in range(self.sim.alto + 1):
+            self.canvas.create_line(0, j * self.celda, w, j * self.celda, width=grosor)
+
+    def dibujar_personas(self, personas):
+        """Cada persona es un círculo con su nombre; solo se tocan los que cambian."""
+        r = self.celda * 0.3
+        vistos = set()
+        for nombre, x, y, _, _ in personas:
+            vistos.add(nombre)
+            cx, cy = self._centro(x, y)
+            item = self._agentes.get(nombre)
+            if item is None:
+                circulo = self.canvas.create_oval(
+                    cx - r, cy - r, cx + r, cy + r,
+                    fill="lightblue", outline="black",
+                    width=2 if self.celda >= MIN_CELDA_TEXTO else 1
+                )
+                texto = None
+                if self.celda >= MIN_CELDA_TEXTO:
+                    texto = self.canvas.create_text(cx, cy, text=nombre)
+                self._agentes[nombre] = (circulo, texto, (x, y))
+            elif item[2] != (x, y):
+                circulo, texto, _ = item
+                self.canvas.coords(circulo, cx - r, cy - r, cx + r, cy + r)
+                if texto is not None:
+                    self.canvas.coords(texto, cx, cy)
+                self._agentes[nombre] = (circulo, texto, (x, y))
+
+        # los que ya no están (sacrificados por el tope de población)
+        if len(vistos) != len(self._agentes):
+            for nombre in [n for n in self._agentes if n not in vistos]:
+                circulo, texto, _ = self._agentes.pop(nombre)
+                self.canvas.delete(circulo)
+                if texto is not None:
+                    self.canvas.delete(texto)
+
+    def dibujar_interacciones(self, interacciones):
         """Dibuja líneas rojas entre personas que se han encontrado en el último step()."""
-        interacciones = self.sim.obtener_interacciones()
-
-        for p1, p2 in interacciones:
-            x1 = p1.x * CELL_SIZE + CELL_SIZE / 2
-            y1 = p1.y * CELL_SIZE + CELL_SIZE / 2
-            x2 = p2.x * CELL_SIZE + CELL_SIZE / 2
-            y2 = p2.y * CELL_SIZE + CELL_SIZE / 2
-
-            self.canvas.create_line(x1, y1, x2, y2, width=3, fill="red")
+        for k, (pos1, pos2) in enumerate(interacciones):
+            x1, y1 = self._centro(*pos1)
+            x2, y2 = self._centro(*pos2)
+            if k < len(self._lineas):
+                self.canvas.coords(self._lineas[k], x1, y1, x2, y2)
+                if k >= self._lineas_visibles:
+                    self.canvas.itemconfigure(self._lineas[k], state="normal")
+            else:
+                self._lineas.append(self.canvas.create_line(
+                    x1, y1, x2, y2, width=3, fill="red", tags="interaccion"
+                ))
+        for k in range(len(interacciones), self._lineas_visibles):
+            self.canvas.itemconfigure(self._lineas[k], state="hidden")
+        self._lineas_visibles = len(interacciones)
+        # por encima de los círculos nuevos
+        if interacciones:
+            self.canvas.tag_raise("interaccion")
 
     # ------------------ CONTROL DEL TIEMPO --------------------
 
     def un_paso(self):
-        self.sim.step()   # aquí llamas tu lógica
-        self.dibujar()
+        self.hilo.pedir_paso()   # el fotograma llega por la cola, como en modo auto
 
     def modo_auto(self):
-        self.auto = True
-        self.loop_auto()
+        self.hilo.reanudar()
 
     def parar_auto(self):
-        self.auto = False
+        self.hilo.pausar()
+
+    def cambiar_velocidad(self, valor):
+        self.hilo.ticks_por_segundo = float(valor)
+
+    def sondear(self):
+        foto = self.hilo.ultimo_fotograma()
+        if foto is not None:
+            self.dibujar(foto)
+        self.root.after(self.SONDEO_MS, self.sondear)
 
-    def loop_auto(self):
-        if self.auto:
-            self.un_paso()
-            self.root.after(500, self.loop_auto)
+    def cerrar(self):
+        self.root.destroy()
 
     def ejecutar(self):
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # el hilo es daemon: hay que esperarlo antes de vaciar el registro
+            self.hilo.detener()
+            self.hilo.join(timeout=5)
+            self.sim.cerrar()
 
 
 # -------- Punto de entrada --------
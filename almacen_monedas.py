@@ -0,0 +1,77 @@
+# almacen_monedas.py
+from __future__ import annotations
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from indice_espacial import RejillaCubetas, mas_cercano
+
+Posicion = Tuple[int, int]
+
+
+class AlmacenMonedas(Mapping):
+    """
+    Monedas del tablero: {(x, y): [valores]} con un índice espacial
+    que se mantiene al insertar y al quitar casillas.
+    Se comporta como un dict de solo lectura (items, keys, in, ...);
+    para modificarlo se usan setdefault y pop, como con el dict de antes.
+    """
+
+    def __init__(self, ancho: int, alto: int, tam: int = 4):
+        self.ancho = ancho
+        self.alto = alto
+        self._celdas: Dict[Posicion, List[int]] = {}
+        self._rejilla = RejillaCubetas(ancho, alto, tam)
+        self._siguiente = 0
+
+    # --- vista de dict ---
+
+    def __getitem__(self, pos: Posicion) -> List[int]:
+        return self._celdas[pos]
+
+    def __iter__(self) -> Iterator[Posicion]:
+        return iter(self._celdas)
+
+    def __len__(self) -> int:
+        return len(self._celdas)
+
+    def __contains__(self, pos) -> bool:
+        return pos in self._celdas
+
+    def __repr__(self) -> str:
+        return f"AlmacenMonedas({self._celdas!r})"
+
+    # --- modificación ---
+
+    def setdefault(self, pos: Posicion, valores: Optional[List[int]] = None) -> List[int]:
+        """Devuelve la lista de la casilla, creándola (e indexándola) si no existe."""
+        lista = self._celdas.get(pos)
+        if lista is None:
+            lista = [] if valores is None else valores
+            self._celdas[pos] = lista
+            # el orden de inserción desempata igual que el dict original
+            self._rejilla.insertar(pos, pos[0], pos[1], self._siguiente)
+            self._siguiente += 1
+        return lista
+
+    def agregar(self, xs, ys, valores) -> None:
+        """Una moneda de valores[i] en (xs[i], ys[i]), en orden (como MonedasDensas.agregar)."""
+        for x, y, valor in zip(xs, ys, valores):
+            self.setdefault((x, y), []).append(valor)
+
+    def pop(self, pos: Posicion, *default):
+        """Quita la casilla entera y devuelve su lista de valores."""
+        if pos not in self._celdas:
+            if default:
+                return default[0]
+            raise KeyError(pos)
+        self._rejilla.quitar(pos, pos[0], pos[1])
+        return self._celdas.pop(pos)
+
+    # --- consultas ---
+
+    def mas_cercana(self, x: int, y: int) -> Optional[Posicion]:
+        """Casilla con monedas más cercana a (x, y) en distancia Manhattan."""
+        entrada = mas_cercano([self._rejilla], x, y)
+        if entrada is None:
+            return None
+        return entrada[0], entrada[1]
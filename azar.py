@@ -0,0 +1,102 @@
+# azar.py
+"""
+Generadores de números aleatorios para la simulación.
+
+Todas las funciones que usan azar reciben un generador con la interfaz de
+random.Random (random, choice, randrange, randint, getrandbits). Aquí están:
+- random.Random(semilla): el modo normal;
+- AzarPorBloques(semilla): saca los uniformes de bloques generados con
+  NumPy en una sola llamada y los consume en orden.
+"""
+from __future__ import annotations
+from typing import Iterator, List, Optional, Sequence, TypeVar
+import itertools
+import operator
+import random
+
+T = TypeVar("T")
+
+
+class AzarPorBloques:
+    """
+    Generador que consume uniformes precalculados en bloque.
+    random() es directamente el __next__ de un iterador sobre los bloques
+    (sin capa de Python por llamada). La secuencia no depende del tamaño de
+    los bloques (NumPy genera la misma serie de uniformes en una llamada o
+    en varias), así que con la misma semilla el resultado es idéntico
+    aunque cambie cuánto se prepara.
+    """
+
+    def __init__(self, semilla: Optional[int] = None, tam_bloque: int = 4096):
+        import numpy as np  # solo hace falta en este modo
+
+        self._gen = np.random.default_rng(semilla)
+        self.tam_bloque = tam_bloque
+        self._empezar([])
+
+    def _empezar(self, pendientes: List[float]) -> None:
+        self._lista = pendientes
+        self._actual = iter(pendientes)
+        self._it = itertools.chain.from_iterable(self._bloques())
+        self.random = self._it.__next__
+
+    def _bloques(self) -> Iterator[Iterator[float]]:
+        yield self._actual
+        while True:
+            self._lista = self._gen.random(self.tam_bloque).tolist()
+            self._actual = iter(self._lista)
+            yield self._actual
+
+    def _pendientes(self) -> List[float]:
+        quedan = operator.length_hint(self._actual)
+        return self._lista[len(self._lista) - quedan:]
+
+    def preparar(self, n: int) -> None:
+        """Se asegura de tener al menos n uniformes listos (p. ej. los de un turno)."""
+        pendientes = self._pendientes()
+        if len(pendientes) < n:
+            nuevos = self._gen.random(max(n - len(pendientes), self.tam_bloque)).tolist()
+            self._empezar(pendientes + nuevos)
+
+    def randrange(self, inicio: int, fin: Optional[int] = None) -> int:
+        if fin is None:
+            inicio, fin = 0, inicio
+        return inicio + int(self.random() * (fin - inicio))
+
+    def randint(self, a: int, b: int) -> int:
+        return self.randrange(a, b + 1)
+
+    def choice(self, seq: Sequence[T]) -> T:
+        return seq[int(self.random() * len(seq))]
+
+    def getrandbits(self, k: int) -> int:
+        # 32 bits por uniforme (los de NumPy llevan 53), de la misma serie que random()
+        bits = 0
+        for _ in range(-(-k // 32)):
+            bits = (bits << 32) | int(self.random() * 4294967296.0)
+        return bits >> (-k % 32)
+
+    # el iterador no se puede copiar: se guarda lo pendiente y el generador
+    def __getstate__(self):
+        return {
+            "gen": self._gen,
+            "tam_bloque": self.tam_bloque,
+            "pendientes": self._pendientes(),
+        }
+
+    def __setstate__(self, estado) -> None:
+        self._gen = estado["gen"]
+        self.tam_bloque = estado["tam_bloque"]
+        self._empezar(estado["pendientes"])
+
+
+def crear_rng(semilla: Optional[int] = None, por_bloques: bool = False):
+    """
+    Generador para una ejecución. Sin semilla se saca una del random global,
+    así que random.seed() antes de simular() sigue fijando el resultado.
+    """
+    if semilla is None:
+        semilla = random.getrandbits(64)
+    if por_bloques:
+        return AzarPorBloques(semilla)
+    return random.Random(semilla)
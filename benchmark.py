@@ -0,0 +1,209 @@
+# benchmark.py
+"""
+Banco de pruebas de rendimiento: cómo escala el turno de simular() y el
+step() de EXTRA.Simulador.
+
+Barre nº de agentes, tamaño del tablero y nº de turnos (un eje cada vez,
+alrededor de un caso base) y mide cada fase del turno por separado.
+También mide cuántos números por segundo da EXTRA.PseudoAzar en cada modo.
+No abre ventanas (ni matplotlib ni Tk), así que sirve en cualquier máquina.
+
+    python benchmark.py                          # medir e imprimir
+    python benchmark.py --guardar base.json      # guardar como referencia
+    python benchmark.py --comparar base.json     # avisar si algo va más lento
+"""
+from __future__ import annotations
+from time import perf_counter
+from typing import Dict, List, Optional
+import argparse
+import json
+import platform
+import sys
+
+import EXTRA
+from instrumentacion import PerfilFases
+from simulacion import ConfigSimulacion, simular
+
+FORMATO = 1
+
+# -------------------------------------------------------------------
+# MEDICIONES
+# -------------------------------------------------------------------
+
+def medir_simular(config: ConfigSimulacion, semilla: int = 0) -> Dict[str, float]:
+    """Segundos por turno de cada fase (y el total) en una ejecución completa."""
+    perfil = PerfilFases()
+    simular(config, semilla=semilla, observador=perfil)
+    return perfil.segundos_por_turno()
+
+
+def medir_extra(n_agentes: int, lado: int, n_pasos: int, semilla: int = 0) -> Dict[str, float]:
+    """Segundos por step() de EXTRA.Simulador (registro por defecto: sin consola)."""
+    # con tope de población: sin él los nacimientos la disparan y el
+    # tiempo por step depende más de la suerte que del tamaño
+    sim = EXTRA.Simulador(ancho=lado, alto=lado, n_personas=n_agentes,
+                          max_poblacion=4 * n_agentes, semilla=semilla)
+    t0 = perf_counter()
+    for _ in range(n_pasos):
+        sim.step()
+    total = perf_counter() - t0
+    return {"step": total / n_pasos, "poblacion_final": len(sim.personas)}
+
+
+MODOS_AZAR = {
+    "reloj": dict(reloj=True),
+    "bloques-numpy": dict(),
+    "bloques-python": dict(con_numpy=False),
+}
+
+
+def medir_pseudoazar(modo: str, n_sorteos: int, semilla: int = 0) -> Dict[str, float]:
+    """Segundos por llamada a indice() y a rand01() de EXTRA.PseudoAzar."""
+    rng = EXTRA.PseudoAzar(semilla, **MODOS_AZAR[modo])
+    indice, rand01 = rng.indice, rng.rand01
+    t0 = perf_counter()
+    for _ in range(n_sorteos):
+        indice(8)
+    t1 = perf_counter()
+    for _ in range(n_sorteos):
+        rand01()
+    t2 = perf_counter()
+    return {"indice": (t1 - t0) / n_sorteos, "rand01": (t2 - t1) / n_sorteos}
+
+
+def _mejor(medir, repeticiones: int) -> Dict[str, float]:
+    """Mínimo de cada medida en varias repeticiones (lo menos ruidoso)."""
+    medidas = [medir() for _ in range(repeticiones)]
+    return {k: min(m[k] for m in medidas) for k in medidas[0]}
+
+# -------------------------------------------------------------------
+# BARRIDOS
+# -------------------------------------------------------------------
+
+def casos_simular(agentes: List[int], lados: List[int], turnos: List[int],
+                  base: ConfigSimulacion) -> Dict[str, ConfigSimulacion]:
+    """Un eje cada vez alrededor de la config base (sin repetir casos)."""
+    configs = (
+        [ConfigSimulacion(base.ancho, base.alto, n, base.n_turnos) for n in agentes]
+        + [ConfigSimulacion(l, l, base.n_personas, base.n_turnos) for l in lados]
+        + [ConfigSimulacion(base.ancho, base.alto, base.n_personas, t) for t in turnos]
+    )
+    return {
+        f"simular-n{c.n_personas}-{c.ancho}x{c.alto}-t{c.n_turnos}": c
+        for c in configs
+    }
+
+
+def ejecutar(args) -> Dict:
+    base = ConfigSimulacion(args.lado_base, args.lado_base, args.agentes_base, args.turnos_base)
+    casos: Dict[str, Dict] = {}
+
+    for clave, config in casos_simular(args.agentes, args.lados, args.turnos, base).items():
+        medida = _mejor(lambda: medir_simular(config), args.repeticiones)
+        casos[clave] = {
+            "parametros": {"n_personas": config.n_personas, "ancho": config.ancho,
+                           "alto": config.alto, "n_turnos": config.n_turnos},
+            "segundos_por_turno": medida,
+        }
+        print(f"{clave:32s} {medida['total'] * 1e3:9.3f} ms/turno", file=sys.stderr)
+
+    for n in args.agentes_extra:
+        clave = f"extra-n{n}-{args.lado_extra}x{args.lado_extra}-p{args.pasos_extra}"
+        medida = _mejor(lambda: medir_extra(n, args.lado_extra, args.pasos_extra),
+                        args.repeticiones)
+        casos[clave] = {
+            "parametros": {"n_agentes": n, "lado": args.lado_extra, "pasos": args.pasos_extra},
+            "segundos_por_turno": {"step": medida["step"]},
+            "poblacion_final": medida["poblacion_final"],
+        }
+        print(f"{clave:32s} {medida['step'] * 1e3:9.3f} ms/step", file=sys.stderr)
+
+    if args.sorteos_azar:
+        for modo in MODOS_AZAR:
+            if modo == "bloques-numpy" and EXTRA.np is None:
+                continue
+            clave = f"pseudoazar-{modo}"
+            medida = _mejor(lambda: medir_pseudoazar(modo, args.sorteos_azar),
+                            args.repeticiones)
+            casos[clave] = {
+                "parametros": {"sorteos": args.sorteos_azar},
+                "segundos_por_turno": medida,
+            }
+            print(f"{clave:32s} {1 / medida['indice'] / 1e6:9.3f} M sorteos/s", file=sys.stderr)
+
+    return {
+        "formato": FORMATO,
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "casos": casos,
+    }
+
+# -------------------------------------------------------------------
+# COMPARACIÓN CON UNA REFERENCIA
+# -------------------------------------------------------------------
+
+def comparar(actual: Dict, referencia: Dict, tolerancia: float,
+             minimo: float = 1e-4) -> List[str]:
+    """
+    Regresiones: medidas más de un (1 + tolerancia) más lentas que en la
+    referencia. Las que en la referencia no llegan a 'minimo' segundos por
+    turno se ignoran (son sobre todo ruido).
+    """
+    regresiones = []
+    for clave, caso in referencia["casos"].items():
+        if clave not in actual["casos"]:
+            continue
+        ahora = actual["casos"][clave]["segundos_por_turno"]
+        for medida, antes in caso["segundos_por_turno"].items():
+            if antes < minimo or medida not in ahora:
+                continue
+            razon = ahora[medida] / antes
+            if razon > 1 + tolerancia:
+                regresiones.append(
+                    f"{clave} [{medida}]: {antes * 1e3:.3f} -> {ahora[medida] * 1e3:.3f} ms (x{razon:.2f})"
+                )
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--agentes", type=int, nargs="*", default=[30, 100, 300, 1000])
+    parser.add_argument("--lados", type=int, nargs="*", default=[20, 40, 80])
+    parser.add_argument("--turnos", type=int, nargs="*", default=[50, 200])
+    parser.add_argument("--agentes-base", type=int, default=100)
+    parser.add_argument("--lado-base", type=int, default=20)
+    parser.add_argument("--turnos-base", type=int, default=100)
+    parser.add_argument("--agentes-extra", type=int, nargs="*", default=[4, 16, 64])
+    parser.add_argument("--lado-extra", type=int, default=16)
+    parser.add_argument("--pasos-extra", type=int, default=20)
+    parser.add_argument("--sorteos-azar", type=int, default=200_000,
+                        help="llamadas por medida de PseudoAzar (0 = no medir)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--guardar", metavar="JSON", help="escribe las medidas como referencia")
+    parser.add_argument("--comparar", metavar="JSON", help="compara con una referencia guardada")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="margen antes de avisar (0.25 = 25%% más lento)")
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar(args)
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2)
+    else:
+        json.dump(resultado, sys.stdout, indent=2)
+        print()
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            referencia = json.load(f)
+        regresiones = comparar(resultado, referencia, args.tolerancia)
+        for r in regresiones:
+            print("MÁS LENTO:", r, file=sys.stderr)
+        if regresiones:
+            return 1
+        print(f"sin regresiones (tolerancia {args.tolerancia:.0%})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+# cache_resultados.py
+"""
+Caché en disco de los resultados de simular(), para que un barrido de
+parámetros (o varios cuadernos, o la CI) no repita ejecuciones ya hechas.
+
+    cache = CacheResultados(".cache_simulacion", max_bytes=200 * 2**20)
+    res = cache.simular(config, semilla=3)       # la segunda vez sale del disco
+
+La clave es un hash de la config completa, la semilla, el backend, el
+catálogo de eventos y la versión del código (un hash de los fuentes del
+motor), así que cambiar cualquiera de ellos da otra entrada. Se guarda el
+resultado sin lo que pesa y solo sirve para dibujar (personas, monedas,
+territorios, fotogramas): métricas e historias, comprimido, un fichero
+por entrada. Si el directorio pasa de max_bytes se borran las entradas
+que hace más tiempo que no se usan.
+"""
+from __future__ import annotations
+from dataclasses import asdict
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import pickle
+import zlib
+
+from eventos import CATALOGO, CatalogoEventos
+from simulacion import ConfigSimulacion, simular
+
+# cabecera de los ficheros de la caché (cambiarla si cambia el formato)
+FORMATO = b"SIMULACION-CACHE-1\n"
+EXTENSION = ".res"
+
+# claves de simular() que no se guardan
+SIN_CACHE = ("personas", "territorios", "monedas", "fotogramas")
+
+# módulos de los que depende el resultado de simular()
+MODULOS_MOTOR = (
+    "simulacion", "persona", "utils", "eventos", "territorio", "almacen_monedas",
+    "indice_espacial", "estadisticas", "azar", "mundo", "visitas", "interacciones",
+    "monedas_densas", "motor_numpy", "motor_dominios",
+)
+
+_version_codigo: Optional[str] = None
+
+
+def version_codigo() -> str:
+    """Hash de los fuentes de MODULOS_MOTOR (se calcula una vez por proceso)."""
+    global _version_codigo
+    if _version_codigo is None:
+        h = hashlib.sha256()
+        for nombre in MODULOS_MOTOR:
+            spec = find_spec(nombre)
+            if spec is None or spec.origin is None:
+                continue
+            with open(spec.origin, "rb") as f:
+                h.update(nombre.encode() + b"\0" + f.read())
+        _version_codigo = h.hexdigest()
+    return _version_codigo
+
+
+def resumen_resultados(res: Dict) -> Dict:
+    """Lo que se guarda de un resultado de simular()."""
+    return {k: v for k, v in res.items() if k not in SIN_CACHE}
+
+
+def _describir_eventos(eventos: CatalogoEventos) -> List:
+    """El catálogo como algo que se puede pasar a JSON (funciones por su nombre)."""
+    def nombre(f):
+        return None if f is None else f"{f.__module__}.{f.__qualname__}"
+
+    return [
+        [e.nombre, e.probabilidad, nombre(e.sobre_personas), nombre(e.sobre_columnas),
+         e.territorios, e.afecta_personas, e.sin_interacciones]
+        for e in eventos.eventos
+    ]
+
+
+class CacheResultados:
+    """Resultados de simular() en ficheros de 'directorio', con tope de tamaño LRU."""
+
+    def __init__(self, directorio: str, max_bytes: Optional[int] = None):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    # --- claves ---
+
+    def clave(self, config: ConfigSimulacion, semilla: int, backend: str = "objetos",
+              eventos: Optional[CatalogoEventos] = None) -> str:
+        """Nombre de la entrada: versión del código y hash de todo lo demás."""
+        datos = {
+            "config": asdict(config),
+            "semilla": semilla,
+            "backend": backend,
+            "eventos": _describir_eventos(eventos or CATALOGO),
+        }
+        texto = json.dumps(datos, sort_keys=True, default=repr)
+        return version_codigo()[:12] + "-" + hashlib.sha256(texto.encode()).hexdigest()[:32]
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave + EXTENSION)
+
+    def _entradas(self) -> List[Tuple[float, int, str]]:
+        """(último uso, bytes, ruta) de cada entrada."""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(EXTENSION):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                st = os.stat(ruta)
+            except FileNotFoundError:     # la ha borrado otro proceso
+                continue
+            entradas.append((st.st_mtime, st.st_size, ruta))
+        return entradas
+
+    # --- lectura y escritura ---
+
+    def obtener(self, config: ConfigSimulacion, semilla: int, backend: str = "objetos",
+                eventos: Optional[CatalogoEventos] = None) -> Optional[Dict]:
+        """El resultado guardado, o None si no está."""
+        ruta = self._ruta(self.clave(config, semilla, backend, eventos))
+        try:
+            with open(ruta, "rb") as f:
+                cabecera = f.read(len(FORMATO))
+                datos = f.read()
+        except FileNotFoundError:
+            self.fallos += 1
+            return None
+        if cabecera != FORMATO:
+            self.fallos += 1
+            return None
+        try:
+            os.utime(ruta)      # la fecha de modificación hace de "último uso"
+        except FileNotFoundError:
+            pass
+        self.aciertos += 1
+        return pickle.loads(zlib.decompress(datos))
+
+    def guardar(self, config: ConfigSimulacion, semilla: int, res: Dict,
+                backend: str = "objetos", eventos: Optional[CatalogoEventos] = None,
+                nivel: int = 6) -> None:
+        """Guarda el resumen de res (el resultado de simular con esos parámetros)."""
+        ruta = self._ruta(self.clave(config, semilla, backend, eventos))
+        datos = zlib.compress(
+            pickle.dumps(resumen_resultados(res), protocol=pickle.HIGHEST_PROTOCOL), nivel
+        )
+        # temporal propio del proceso: varios procesos pueden compartir la caché
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(FORMATO)
+            f.write(datos)
+        os.replace(temporal, ruta)
+        self.recortar()
+
+    def simular(self, config: Optional[ConfigSimulacion] = None, semilla: Optional[int] = None,
+                backend: str = "objetos", eventos: Optional[CatalogoEventos] = None) -> Dict:
+        """
+        simular(config, semilla, backend, eventos=eventos) desde la caché si
+        ya está; si no, se ejecuta y se guarda. Devuelve el resumen (sin
+        personas, territorios, monedas ni fotogramas).
+        """
+        if semilla is None:
+            raise ValueError("sin semilla el resultado no se puede reutilizar")
+        config = config or ConfigSimulacion.desde_globales()
+        res = self.obtener(config, semilla, backend, eventos)
+        if res is None:
+            res = resumen_resultados(simular(config, semilla=semilla, backend=backend,
+                                             eventos=eventos))
+            self.guardar(config, semilla, res, backend, eventos)
+        return res
+
+    # --- tamaño e invalidación ---
+
+    def tamaño(self) -> int:
+        return sum(n for _, n, _ in self._entradas())
+
+    def recortar(self) -> int:
+        """Borra las entradas menos usadas hasta quedar en max_bytes. Devuelve cuántas."""
+        if self.max_bytes is None:
+            return 0
+        entradas = sorted(self._entradas())
+        total = sum(n for _, n, _ in entradas)
+        borradas = 0
+        for _, n, ruta in entradas:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+                borradas += 1
+            except FileNotFoundError:
+                pass
+            total -= n
+        return borradas
+
+    def invalidar(self, config: ConfigSimulacion, semilla: int, backend: str = "objetos",
+                  eventos: Optional[CatalogoEventos] = None) -> bool:
+        """Borra una entrada. Devuelve si estaba."""
+        try:
+            os.remove(self._ruta(self.clave(config, semilla, backend, eventos)))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def purgar_versiones_antiguas(self) -> int:
+        """Borra las entradas de otras versiones del código (ya no se van a leer)."""
+        actual = version_codigo()[:12] + "-"
+        borradas = 0
+        for _, _, ruta in self._entradas():
+            if not os.path.basename(ruta).startswith(actual):
+                try:
+                    os.remove(ruta)
+                    borradas += 1
+                except FileNotFoundError:
+                    pass
+        return borradas
+
+    def vaciar(self) -> int:
+        """Borra todas las entradas. Devuelve cuántas había."""
+        borradas = 0
+        for _, _, ruta in self._entradas():
+            try:
+                os.remove(ruta)
+                borradas += 1
+            except FileNotFoundError:
+                pass
+        return borradas
@@ -0,0 +1,175 @@
+# ensamble.py
+"""
+Ejecución de K réplicas independientes de simular() en un pool de procesos
+(Monte Carlo). Cada réplica recibe la config y una semilla derivada de la
+semilla maestra, así que cualquier réplica se puede repetir por separado:
+
+    simular(config, semilla=res["semillas"][i])
+
+Cada proceso devuelve solo un resumen (sin la lista de personas). Con una
+CacheResultados (ver cache_resultados.py) solo se ejecutan las réplicas
+que no estén ya en ella.
+En Windows/macOS hay que llamarlo desde un bloque if __name__ == "__main__".
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist, mean, stdev
+from typing import Dict, List, Optional, Sequence, Tuple
+import random
+
+from persona import ROLES
+from simulacion import ConfigSimulacion, simular
+from cache_resultados import CacheResultados, resumen_resultados
+
+
+def semillas_replicas(semilla_maestra: int, n_replicas: int) -> List[int]:
+    """Semillas de cada réplica, siempre las mismas para la misma maestra."""
+    gen = random.Random(semilla_maestra)
+    return [gen.getrandbits(63) for _ in range(n_replicas)]
+
+
+def resumen_replica(res: Dict) -> Dict:
+    """Lo que se manda de vuelta al proceso principal por réplica."""
+    return {
+        "rol_mas_rico": res["rol_mas_rico"],
+        "rol_mas_longevo": res["rol_mas_longevo"],
+        "rol_mas_violento": res["rol_mas_violento"],
+        "territorio_mas_letal": res["territorio_mas_letal"],
+        "media_comercio_por_turno": res["media_comercio_por_turno"],
+        "historia_roles": res["historia_roles"],
+        "historia_riqueza": res["historia_riqueza"],
+        "muertes_por_rol": res["muertes_por_rol"],
+        "muertes_en_territorio": res["muertes_en_territorio"],
+    }
+
+
+def _ejecutar_replica(tarea: Tuple[ConfigSimulacion, int, str]) -> Dict:
+    config, semilla, backend = tarea
+    return resumen_resultados(simular(config, semilla=semilla, backend=backend))
+
+
+# -------------------------------------------------------------------
+# AGREGACIÓN
+# -------------------------------------------------------------------
+
+def _cuantil(ordenados: Sequence[float], q: float) -> float:
+    """Cuantil con interpolación lineal sobre una lista ya ordenada."""
+    pos = (len(ordenados) - 1) * q
+    i = int(pos)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (pos - i)
+
+
+def _proporcion(exitos: int, n: int, z: float) -> Dict[str, float]:
+    """Proporción con intervalo de Wilson."""
+    p = exitos / n
+    centro = (p + z * z / (2 * n)) / (1 + z * z / n)
+    margen = z * ((p * (1 - p) / n + z * z / (4 * n * n)) ** 0.5) / (1 + z * z / n)
+    return {"media": p, "ic_inf": max(centro - margen, 0.0), "ic_sup": min(centro + margen, 1.0)}
+
+
+def _media_ic(valores: Sequence[float], z: float) -> Dict[str, float]:
+    m = mean(valores)
+    margen = z * stdev(valores) / len(valores) ** 0.5 if len(valores) > 1 else 0.0
+    return {"media": m, "ic_inf": m - margen, "ic_sup": m + margen}
+
+
+def _banda(series: List[List[int]], q_inf: float, q_sup: float) -> Dict[str, List[float]]:
+    """
+    Media y cuantiles turno a turno de varias series. Las que acaban antes
+    (réplicas paradas por parar_si) siguen con su último valor.
+    """
+    banda = {"media": [], "inf": [], "sup": []}
+    largo = max((len(s) for s in series), default=0)
+    series = [list(s) + [s[-1] if s else 0] * (largo - len(s)) for s in series]
+    for valores in zip(*series):
+        ordenados = sorted(valores)
+        banda["media"].append(mean(ordenados))
+        banda["inf"].append(_cuantil(ordenados, q_inf))
+        banda["sup"].append(_cuantil(ordenados, q_sup))
+    return banda
+
+
+def agregar(resumenes: List[Dict], nivel: float = 0.95) -> Dict:
+    """
+    Estadísticas del ensamble:
+    - frecuencia de cada rol como rol_mas_rico (con IC de Wilson)
+    - banda de historia_roles por rol (media y cuantiles del nivel dado)
+    - muertes por territorio (media con IC normal)
+    """
+    n = len(resumenes)
+    z = NormalDist().inv_cdf(0.5 + nivel / 2)
+    q_inf, q_sup = (1 - nivel) / 2, (1 + nivel) / 2
+
+    conteo_rico = {rol: 0 for rol in ROLES}
+    for r in resumenes:
+        conteo_rico[r["rol_mas_rico"]] += 1
+
+    territorios = list(resumenes[0]["muertes_en_territorio"])
+    return {
+        "n_replicas": n,
+        "nivel": nivel,
+        "rol_mas_rico": {rol: _proporcion(c, n, z) for rol, c in conteo_rico.items()},
+        "historia_roles": {
+            rol: _banda([r["historia_roles"][rol] for r in resumenes], q_inf, q_sup)
+            for rol in ROLES
+        },
+        "historia_riqueza": {
+            rol: _banda([r["historia_riqueza"][rol] for r in resumenes], q_inf, q_sup)
+            for rol in ROLES
+        },
+        "muertes_en_territorio": {
+            t: _media_ic([r["muertes_en_territorio"][t] for r in resumenes], z)
+            for t in territorios
+        },
+        "media_comercio_por_turno": _media_ic(
+            [r["media_comercio_por_turno"] for r in resumenes], z
+        ),
+    }
+
+
+# -------------------------------------------------------------------
+# EJECUCIÓN
+# -------------------------------------------------------------------
+
+def ejecutar_ensamble(
+    config: Optional[ConfigSimulacion] = None,
+    n_replicas: int = 8,
+    semilla_maestra: int = 0,
+    procesos: Optional[int] = None,
+    backend: str = "objetos",
+    nivel: float = 0.95,
+    guardar_resumenes: bool = False,
+    cache: Optional[CacheResultados] = None,
+) -> Dict:
+    """
+    Ejecuta n_replicas de simular() repartidas entre 'procesos' procesos
+    (None = todos los núcleos, 1 = en este mismo proceso) y devuelve las
+    estadísticas agregadas más la lista de semillas usadas. Con cache, las
+    réplicas que ya estén se leen de ella y las nuevas se guardan.
+    """
+    config = config or ConfigSimulacion.desde_globales()
+    semillas = semillas_replicas(semilla_maestra, n_replicas)
+    completos: List[Optional[Dict]] = [None] * n_replicas
+    if cache is not None:
+        completos = [cache.obtener(config, s, backend) for s in semillas]
+    pendientes = [i for i, r in enumerate(completos) if r is None]
+    tareas = [(config, semillas[i], backend) for i in pendientes]
+
+    if procesos == 1 or len(tareas) <= 1:
+        nuevos = [_ejecutar_replica(t) for t in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            nuevos = list(pool.map(_ejecutar_replica, tareas))
+    for i, res in zip(pendientes, nuevos):
+        completos[i] = res
+        if cache is not None:
+            cache.guardar(config, semillas[i], res, backend)
+    resumenes = [resumen_replica(r) for r in completos]
+
+    res = agregar(resumenes, nivel)
+    res["config"] = config
+    res["semillas"] = semillas
+    if guardar_resumenes:
+        res["resumenes"] = resumenes
+    return res
@@ -0,0 +1,64 @@
+# estadisticas.py
+from __future__ import annotations
+from typing import Dict, Iterable, List
+
+from persona import Persona, ROLES
+
+
+class ContadoresRol:
+    """
+    Contadores por rol que se actualizan justo donde cambia el estado
+    (combate, recoger_monedas, muertes por evento, intercambiar y
+    envejecimiento), para no recorrer todas las personas cada turno.
+    """
+
+    def __init__(self, personas: Iterable[Persona] = (), roles: List[str] = ROLES):
+        self.vivos: Dict[str, int] = {rol: 0 for rol in roles}
+        self.riqueza_viva: Dict[str, int] = {rol: 0 for rol in roles}
+        self.riqueza_total: Dict[str, int] = {rol: 0 for rol in roles}
+        self.combates: Dict[str, int] = {rol: 0 for rol in roles}
+        self.edad_total: Dict[str, int] = {rol: 0 for rol in roles}
+        self.n_total: Dict[str, int] = {rol: 0 for rol in roles}
+        for p in personas:
+            self.alta(p)
+
+    def alta(self, p: Persona) -> None:
+        """Añade a una persona con su estado actual."""
+        self.n_total[p.rol] += 1
+        self.edad_total[p.rol] += p.edad_turnos
+        self.combates[p.rol] += p.combates_totales
+        self.riqueza_total[p.rol] += p.monedas
+        if p.esta_vivo():
+            self.vivos[p.rol] += 1
+            self.riqueza_viva[p.rol] += p.monedas
+
+    # --- cambios de estado ---
+
+    def muerte(self, p: Persona) -> None:
+        self.vivos[p.rol] -= 1
+        self.riqueza_viva[p.rol] -= p.monedas
+
+    def monedas(self, p: Persona, cantidad: int) -> None:
+        """p ha ganado (o perdido, si es negativa) 'cantidad' monedas."""
+        self.riqueza_total[p.rol] += cantidad
+        if p.esta_vivo():
+            self.riqueza_viva[p.rol] += cantidad
+
+    def combate(self, a: Persona, b: Persona) -> None:
+        self.combates[a.rol] += 1
+        self.combates[b.rol] += 1
+
+    def sumar_combates(self, p: Persona, n: int) -> None:
+        """n combates de p de golpe (interacciones por lotes)."""
+        self.combates[p.rol] += n
+
+    def envejecer(self, p: Persona) -> None:
+        self.edad_total[p.rol] += 1
+
+    # --- métricas ---
+
+    def edad_media(self) -> Dict[str, float]:
+        return {
+            rol: (self.edad_total[rol] / n) if n else 0
+            for rol, n in self.n_total.items()
+        }
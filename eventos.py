@@ -0,0 +1,229 @@
+# eventos.py
+"""
+Catálogo de eventos globales del turno, común a los tres motores.
+
+Cada evento declara su probabilidad por turno, su ámbito (los nombres de
+los territorios a los que afecta, o None para todo el tablero) y su efecto
+en lote, uno por motor:
+- sobre_personas(afectados, ctx) -> muertos, con la lista de Persona vivas
+  del ámbito (motor de objetos);
+- sobre_columnas(pob, afectados, ctx) -> índices de los muertos, con los
+  índices de los vivos del ámbito en una Poblacion (motor_numpy).
+Los muertos se devuelven juntos para que el motor sume las muertes por rol
+y por territorio de una vez. sin_interacciones=True deja el turno sin
+comercio ni combate (la niebla).
+
+Para usar otro catálogo se pasa a simular(eventos=...), por ejemplo una
+plaga que solo llega a la ciudad:
+
+    plaga = replace(CATALOGO["plaga"], territorios=("Ciudad Central",))
+    simular(config, eventos=CATALOGO.con(plaga))
+
+Con el catálogo por defecto (cinco eventos, 1% cada uno) los sorteos son
+los de siempre, así que con la misma semilla sale la misma ejecución.
+"""
+from __future__ import annotations
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Any, Callable, FrozenSet, List, Optional, Sequence, Tuple
+
+from persona import Persona
+from territorio import Territorio
+
+
+@dataclass
+class ContextoEvento:
+    """Lo que un evento puede tocar además de los afectados."""
+    monedas: Any                 # AlmacenMonedas o MonedasDensas (las dos tienen agregar)
+    ancho: int
+    alto: int
+    rng: Any                     # random.Random / AzarPorBloques, o Generator de NumPy
+
+
+@dataclass(frozen=True)
+class Evento:
+    nombre: str
+    probabilidad: float
+    sobre_personas: Optional[Callable[[List[Persona], ContextoEvento], List[Persona]]] = None
+    sobre_columnas: Optional[Callable] = None
+    territorios: Optional[Tuple[str, ...]] = None    # ámbito (None = todo el tablero)
+    afecta_personas: bool = True     # False: no hace falta buscar a los afectados
+    sin_interacciones: bool = False
+
+
+# -------------------------------------------------------------------
+# EFECTOS DE LOS EVENTOS POR DEFECTO
+# -------------------------------------------------------------------
+
+def lluvia(afectados: List[Persona], ctx: ContextoEvento) -> List[Persona]:
+    """Diez monedas nuevas en casillas al azar."""
+    rng = ctx.rng
+    xs, ys, valores = [], [], []
+    for _ in range(10):
+        xs.append(rng.randrange(ctx.ancho))
+        ys.append(rng.randrange(ctx.alto))
+        valores.append(rng.randint(1, 5))
+    ctx.monedas.agregar(xs, ys, valores)
+    return []
+
+
+def lluvia_columnas(pob, afectados, ctx: ContextoEvento):
+    rng = ctx.rng
+    xs = rng.integers(ctx.ancho, size=10)
+    ys = rng.integers(ctx.alto, size=10)
+    ctx.monedas.agregar(xs, ys, rng.integers(1, 6, size=10))
+    return afectados[:0]
+
+
+def terremoto(afectados: List[Persona], ctx: ContextoEvento) -> List[Persona]:
+    """Todos pierden 3 de energía."""
+    for p in afectados:
+        p.recibir_daño(3)
+    return [p for p in afectados if not p.esta_vivo()]
+
+
+def terremoto_columnas(pob, afectados, ctx: ContextoEvento):
+    pob.energia[afectados] -= 3
+    muertos = afectados[pob.energia[afectados] <= 0]
+    pob.vivo[muertos] = False
+    return muertos
+
+
+def plaga(afectados: List[Persona], ctx: ContextoEvento) -> List[Persona]:
+    """Cada uno muere al instante con probabilidad 0.1."""
+    rng = ctx.rng
+    muertos = [p for p in afectados if rng.random() < 0.1]
+    for p in muertos:
+        p.recibir_daño(p.energia)
+    return muertos
+
+
+def plaga_columnas(pob, afectados, ctx: ContextoEvento):
+    muertos = afectados[ctx.rng.random(len(afectados)) < 0.1]
+    pob.energia[muertos] = 0
+    pob.vivo[muertos] = False
+    return muertos
+
+# -------------------------------------------------------------------
+# CATÁLOGO
+# -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CatalogoEventos:
+    """Eventos posibles; como mucho uno por turno."""
+    eventos: Tuple[Evento, ...]
+
+    def __post_init__(self) -> None:
+        total = sum(e.probabilidad for e in self.eventos)
+        if total > 1:
+            raise ValueError(f"las probabilidades de los eventos suman {total} (> 1)")
+
+    @property
+    def nombres(self) -> List[str]:
+        return [e.nombre for e in self.eventos]
+
+    def __getitem__(self, nombre: str) -> Evento:
+        for e in self.eventos:
+            if e.nombre == nombre:
+                return e
+        raise KeyError(nombre)
+
+    def con(self, *eventos: Evento) -> "CatalogoEventos":
+        """Copia con estos eventos en lugar de los del mismo nombre (o añadidos al final)."""
+        nuevos = {e.nombre: e for e in eventos}
+        actuales = [nuevos.pop(e.nombre, e) for e in self.eventos]
+        return CatalogoEventos(tuple(actuales) + tuple(nuevos.values()))
+
+    def _equiprobables(self) -> bool:
+        return len({e.probabilidad for e in self.eventos}) <= 1
+
+    def sortear(self, rng) -> Optional[Evento]:
+        """Evento del turno (o None) con un random.Random o un AzarPorBloques."""
+        if not self.eventos:
+            return None
+        u = rng.random()
+        total = sum(e.probabilidad for e in self.eventos)
+        if u >= total:
+            return None
+        if self._equiprobables():
+            # el sorteo de siempre (uno para saber si hay evento, otro para cuál)
+            return rng.choice(self.eventos)
+        acumulada = list(accumulate(e.probabilidad for e in self.eventos))
+        return self.eventos[bisect_right(acumulada, u)]
+
+    def sortear_numpy(self, rng) -> Optional[Evento]:
+        """Lo mismo con un numpy.random.Generator."""
+        if not self.eventos:
+            return None
+        u = rng.random()
+        total = sum(e.probabilidad for e in self.eventos)
+        if u >= total:
+            return None
+        if self._equiprobables():
+            return self.eventos[rng.integers(len(self.eventos))]
+        acumulada = list(accumulate(e.probabilidad for e in self.eventos))
+        return self.eventos[bisect_right(acumulada, u)]
+
+    def sin_interacciones(self, nombre: Optional[str]) -> bool:
+        return nombre is not None and self[nombre].sin_interacciones
+
+
+CATALOGO = CatalogoEventos((
+    Evento("lluvia", 0.01, lluvia, lluvia_columnas, afecta_personas=False),
+    Evento("terremoto", 0.01, terremoto, terremoto_columnas),
+    Evento("plaga", 0.01, plaga, plaga_columnas),
+    Evento("niebla", 0.01, afecta_personas=False, sin_interacciones=True),
+    # el mercado no tiene efecto propio (queda anotado en el turno)
+    Evento("mercado", 0.01, afecta_personas=False),
+))
+
+# -------------------------------------------------------------------
+# APLICAR UN EVENTO
+# -------------------------------------------------------------------
+
+def indices_ambito(evento: Evento, territorios: Sequence[Territorio]) -> Optional[FrozenSet[int]]:
+    """Índices (en territorios) de los del ámbito, o None si es todo el tablero."""
+    if evento.territorios is None:
+        return None
+    return frozenset(i for i, t in enumerate(territorios) if t.nombre in evento.territorios)
+
+
+def aplicar_a_personas(evento: Evento, personas: List[Persona], mapa_territorios,
+                       ctx: ContextoEvento) -> List[Persona]:
+    """
+    Aplica el evento a los vivos de su ámbito (mapa_territorios es un
+    MapaTerritorios) y devuelve los muertos.
+    """
+    if evento.sobre_personas is None:
+        return []
+    afectados: List[Persona] = []
+    if evento.afecta_personas:
+        ambito = indices_ambito(evento, mapa_territorios.territorios)
+        if ambito is None:
+            afectados = [p for p in personas if p.esta_vivo()]
+        else:
+            ids = mapa_territorios.ids
+            afectados = [p for p in personas
+                         if p.esta_vivo() and ids[p.x][p.y] in ambito]
+    return evento.sobre_personas(afectados, ctx)
+
+
+def aplicar_a_columnas(evento: Evento, pob, ids, territorios: Sequence[Territorio],
+                       ctx: ContextoEvento):
+    """
+    Lo mismo con una Poblacion de motor_numpy; ids es la tabla ancho x alto
+    de índices de territorio. Devuelve los índices de los muertos.
+    """
+    # import aquí para no exigir NumPy al motor de objetos
+    import numpy as np
+
+    afectados = np.flatnonzero(pob.vivo) if evento.afecta_personas else np.empty(0, dtype=np.int64)
+    if evento.sobre_columnas is None:
+        return afectados[:0]
+    ambito = indices_ambito(evento, territorios)
+    if ambito is not None and len(afectados):
+        dentro = np.isin(ids[pob.x[afectados], pob.y[afectados]], list(ambito))
+        afectados = afectados[dentro]
+    return evento.sobre_columnas(pob, afectados, ctx)
+
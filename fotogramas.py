@@ -0,0 +1,69 @@
+# fotogramas.py
+"""
+Fotogramas de una ejecución de simular() (motor de objetos) para verla
+después como animación: visualizacion.animar / exportar_animacion.
+
+    res = simular(config, semilla=1, grabar_fotogramas=1)
+    exportar_animacion(res["fotogramas"], "ejecucion.gif")
+
+Cada fotograma es el estado completo del turno (no la diferencia con el
+anterior), en arrays compactos del módulo array (sin NumPy): posición y
+rol de cada vivo y las casillas con monedas. Lo que no cambia (los
+territorios y el tamaño del tablero) se guarda una sola vez en la
+grabación.
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterator, List
+
+from persona import ROLES
+from territorio import Territorio
+
+_INDICE_ROL = {rol: i for i, rol in enumerate(ROLES)}
+
+
+@dataclass
+class Fotograma:
+    """Estado tras 'turno' turnos; roles son índices en ROLES."""
+    turno: int
+    xs: array                  # 'H'
+    ys: array                  # 'H'
+    roles: bytes
+    monedas_x: array           # casillas con alguna moneda
+    monedas_y: array
+
+
+@dataclass
+class GrabacionFotogramas:
+    """Un fotograma cada 'cada' turnos (y el del inicio)."""
+    ancho: int
+    alto: int
+    territorios: List[Territorio]
+    cada: int = 1
+    fotogramas: List[Fotograma] = field(default_factory=list)
+
+    def grabar(self, estado) -> None:
+        """Añade el fotograma del estado actual (un EstadoMundo)."""
+        vivos = [p for p in estado.personas if p.esta_vivo()]
+        casillas = list(estado.monedas.keys())
+        self.fotogramas.append(Fotograma(
+            estado.turno,
+            array("H", [p.x for p in vivos]),
+            array("H", [p.y for p in vivos]),
+            bytes(_INDICE_ROL[p.rol] for p in vivos),
+            array("H", [x for x, _ in casillas]),
+            array("H", [y for _, y in casillas]),
+        ))
+
+    def toca(self, turno: int) -> bool:
+        return turno % self.cada == 0
+
+    def __len__(self) -> int:
+        return len(self.fotogramas)
+
+    def __iter__(self) -> Iterator[Fotograma]:
+        return iter(self.fotogramas)
+
+    def __getitem__(self, i: int) -> Fotograma:
+        return self.fotogramas[i]
@@ -0,0 +1,152 @@
+# indice_espacial.py
+from __future__ import annotations
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+# entrada guardada en una cubeta: (x, y, orden, valor)
+Entrada = Tuple[int, int, int, Any]
+
+
+class RejillaCubetas:
+    """
+    Rejilla uniforme de cubetas sobre el tablero.
+    Cada cubeta agrupa las entradas de un bloque de tam x tam casillas,
+    así una búsqueda solo mira las cubetas cercanas al punto.
+    """
+
+    def __init__(self, ancho: int, alto: int, tam: int = 4):
+        self.ancho = ancho
+        self.alto = alto
+        self.tam = tam
+        self.n_cx = (ancho + tam - 1) // tam
+        self.n_cy = (alto + tam - 1) // tam
+        self.cubetas: Dict[Tuple[int, int], Dict[Hashable, Entrada]] = {}
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def cubeta(self, x: int, y: int) -> Tuple[int, int]:
+        return x // self.tam, y // self.tam
+
+    def insertar(self, clave: Hashable, x: int, y: int, orden: int, valor: Any = None) -> None:
+        self.cubetas.setdefault(self.cubeta(x, y), {})[clave] = (x, y, orden, valor)
+        self.n += 1
+
+    def quitar(self, clave: Hashable, x: int, y: int) -> Entrada:
+        c = self.cubeta(x, y)
+        cubeta = self.cubetas[c]
+        entrada = cubeta.pop(clave)
+        if not cubeta:
+            del self.cubetas[c]
+        self.n -= 1
+        return entrada
+
+    def mover(self, clave: Hashable, x0: int, y0: int, x1: int, y1: int) -> None:
+        c0 = self.cubeta(x0, y0)
+        c1 = self.cubeta(x1, y1)
+        if c0 == c1:
+            _, _, orden, valor = self.cubetas[c0][clave]
+            self.cubetas[c0][clave] = (x1, y1, orden, valor)
+        else:
+            _, _, orden, valor = self.quitar(clave, x0, y0)
+            self.insertar(clave, x1, y1, orden, valor)
+
+
+def _anillo(cx: int, cy: int, r: int, n_cx: int, n_cy: int) -> Iterator[Tuple[int, int]]:
+    """Cubetas a distancia (Chebyshev) exactamente r de (cx, cy), recortadas al tablero."""
+    if r == 0:
+        yield cx, cy
+        return
+    x0, x1 = cx - r, cx + r
+    y0, y1 = cy - r, cy + r
+    for ix in range(max(x0, 0), min(x1, n_cx - 1) + 1):
+        if y0 >= 0:
+            yield ix, y0
+        if y1 < n_cy:
+            yield ix, y1
+    for iy in range(max(y0 + 1, 0), min(y1 - 1, n_cy - 1) + 1):
+        if x0 >= 0:
+            yield x0, iy
+        if x1 < n_cx:
+            yield x1, iy
+
+
+def mas_cercano(
+    rejillas: Iterable[RejillaCubetas],
+    x: int,
+    y: int,
+    excluir: Optional[Hashable] = None,
+) -> Optional[Entrada]:
+    """
+    Entrada más cercana a (x, y) en distancia Manhattan (sin wrap),
+    buscando por anillos de cubetas que se expanden.
+    Los empates se resuelven por 'orden' (el menor gana), igual que
+    min() sobre una lista en ese orden.
+    Todas las rejillas deben tener las mismas dimensiones.
+    """
+    rejillas = [r for r in rejillas if r.n > 0]
+    if not rejillas:
+        return None
+
+    ref = rejillas[0]
+    tam, n_cx, n_cy = ref.tam, ref.n_cx, ref.n_cy
+    cx, cy = ref.cubeta(x, y)
+    r_max = max(cx, n_cx - 1 - cx, cy, n_cy - 1 - cy)
+
+    mejor: Optional[Entrada] = None
+    mejor_d = -1
+    for r in range(r_max + 1):
+        for c in _anillo(cx, cy, r, n_cx, n_cy):
+            for rejilla in rejillas:
+                cubeta = rejilla.cubetas.get(c)
+                if not cubeta:
+                    continue
+                for clave, entrada in cubeta.items():
+                    if clave == excluir:
+                        continue
+                    d = abs(entrada[0] - x) + abs(entrada[1] - y)
+                    if mejor is None or d < mejor_d or (d == mejor_d and entrada[2] < mejor[2]):
+                        mejor = entrada
+                        mejor_d = d
+        # todo lo que quede en anillos siguientes está a distancia > r * tam
+        if mejor is not None and mejor_d <= r * tam:
+            break
+    return mejor
+
+
+class IndicePersonas:
+    """
+    Índice espacial de personas vivas, separado por rol.
+    Se construye una vez por turno y se actualiza al mover a cada persona,
+    así las búsquedas ven las mismas posiciones que el recorrido lineal.
+    """
+
+    def __init__(self, personas: List["Persona"], ancho: int, alto: int, tam: int = 4):
+        self.ancho = ancho
+        self.alto = alto
+        self.tam = tam
+        self.por_rol: Dict[str, RejillaCubetas] = {}
+        for i, p in enumerate(personas):
+            if not p.esta_vivo():
+                continue
+            self._rejilla(p.rol).insertar(id(p), p.x, p.y, i, p)
+
+    def _rejilla(self, rol: str) -> RejillaCubetas:
+        rejilla = self.por_rol.get(rol)
+        if rejilla is None:
+            rejilla = RejillaCubetas(self.ancho, self.alto, self.tam)
+            self.por_rol[rol] = rejilla
+        return rejilla
+
+    def mover(self, p: "Persona", x0: int, y0: int) -> None:
+        """Actualiza la posición de p tras moverse desde (x0, y0)."""
+        self.por_rol[p.rol].mover(id(p), x0, y0, p.x, p.y)
+
+    def mas_cercano(self, p: "Persona", roles: Optional[Iterable[str]] = None) -> Optional["Persona"]:
+        """Persona viva más cercana a p (sin contar a p), opcionalmente solo de ciertos roles."""
+        if roles is None:
+            rejillas = self.por_rol.values()
+        else:
+            rejillas = [self.por_rol[r] for r in roles if r in self.por_rol]
+        entrada = mas_cercano(rejillas, p.x, p.y, excluir=id(p))
+        return entrada[3] if entrada is not None else None
@@ -0,0 +1,96 @@
+# informe_memoria.py
+"""
+Informe de memoria por agente: Persona antigua (dataclass con __dict__ y
+un set de casillas visitadas) frente a la actual (__slots__ y MapaVisitas
+compartido). Cada agente da un paseo aleatorio marcando casillas, como
+haría un explorador.
+
+    python informe_memoria.py --n 100000 --pasos 100
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Optional
+import argparse
+import random
+import tracemalloc
+
+from persona import Persona
+from visitas import MapaVisitas
+
+
+@dataclass
+class PersonaAntigua:
+    """Copia de la Persona de antes (con __dict__ y set de tuplas)."""
+    id_: int
+    x: int
+    y: int
+    rol: str
+    energia: int = 10
+    monedas: int = 0
+    vivo: bool = True
+    edad_turnos: int = 0
+    objetos: List[str] = field(default_factory=list)
+    combates_ganados: int = 0
+    combates_totales: int = 0
+    intercambios_realizados: int = 0
+    territorio_actual: Optional[str] = None
+    celdas_visitadas: set = field(default_factory=set)
+
+    def marcar_celda_visitada(self) -> None:
+        self.celdas_visitadas.add((self.x, self.y))
+
+
+def _pasear(personas, pasos: int, ancho: int, alto: int, rng: random.Random) -> None:
+    for p in personas:
+        for _ in range(pasos):
+            p.x = (p.x + rng.randint(-1, 1)) % ancho
+            p.y = (p.y + rng.randint(-1, 1)) % alto
+            p.marcar_celda_visitada()
+
+
+def medir(crear, n: int, pasos: int, ancho: int, alto: int) -> float:
+    """Bytes por agente (según tracemalloc) tras crear y pasear n agentes."""
+    rng = random.Random(0)
+    tracemalloc.start()
+    personas = crear(n, rng)
+    _pasear(personas, pasos, ancho, alto, rng)
+    total, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del personas
+    return total / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--pasos", type=int, default=100)
+    parser.add_argument("--ancho", type=int, default=20)
+    parser.add_argument("--alto", type=int, default=20)
+    args = parser.parse_args()
+
+    def crear_antiguas(n, rng):
+        return [
+            PersonaAntigua(i, rng.randrange(args.ancho), rng.randrange(args.alto),
+                           "explorador", objetos=["poción", "mapa"])
+            for i in range(n)
+        ]
+
+    def crear_actuales(n, rng):
+        visitas = MapaVisitas(args.ancho, args.alto)
+        return [
+            Persona(i, rng.randrange(args.ancho), rng.randrange(args.alto),
+                    "explorador", objetos=["poción", "mapa"], visitas=visitas)
+            for i in range(n)
+        ]
+
+    antes = medir(crear_antiguas, args.n, args.pasos, args.ancho, args.alto)
+    despues = medir(crear_actuales, args.n, args.pasos, args.ancho, args.alto)
+
+    print(f"{args.n} agentes, tablero {args.ancho}x{args.alto}, {args.pasos} pasos")
+    print(f"  antes   (dataclass + set):       {antes:8.0f} bytes/agente")
+    print(f"  después (__slots__ + bits):      {despues:8.0f} bytes/agente")
+    print(f"  reducción: x{antes / despues:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# instrumentacion.py
+"""
+Observadores del bucle de turnos de simular(): tiempo de cada fase,
+contadores por turno y, si se pide, instantáneas de tracemalloc.
+
+    perfil = PerfilFases()
+    simular(config, semilla=1, observador=perfil)
+    print(perfil.informe())
+
+Sin observador el turno no mide nada (el coste es comprobar un None).
+"""
+from __future__ import annotations
+from typing import Dict, List
+
+# contadores que recibe fin_turno (cuántos hubo en ese turno)
+CONTADORES = ("decisiones", "parejas", "combates", "comercios", "monedas_recogidas")
+
+
+class Observador:
+    """
+    Interfaz de un observador: todos los métodos están vacíos y se
+    sobreescriben los que interesen.
+    memoria_cada > 0 pide una instantánea de tracemalloc cada tantos
+    turnos (simular arranca tracemalloc si no estaba en marcha).
+    """
+
+    memoria_cada: int = 0
+
+    def inicio_turno(self, turno: int) -> None:
+        pass
+
+    def inicio_fase(self, turno: int, fase: str) -> None:
+        pass
+
+    def fin_fase(self, turno: int, fase: str, segundos: float) -> None:
+        pass
+
+    def fin_turno(self, turno: int, contadores: Dict[str, int], instantanea=None) -> None:
+        """instantanea es un tracemalloc.Snapshot o None."""
+        pass
+
+
+class PerfilFases(Observador):
+    """Acumula segundos por fase y los contadores de todos los turnos."""
+
+    def __init__(self, memoria_cada: int = 0):
+        self.memoria_cada = memoria_cada
+        self.segundos: Dict[str, float] = {}
+        self.totales: Dict[str, int] = {c: 0 for c in CONTADORES}
+        self.por_turno: List[Dict[str, int]] = []
+        self.memoria: List[tuple] = []   # (turno, bytes en uso)
+        self.turnos = 0
+
+    def fin_fase(self, turno, fase, segundos) -> None:
+        self.segundos[fase] = self.segundos.get(fase, 0.0) + segundos
+
+    def fin_turno(self, turno, contadores, instantanea=None) -> None:
+        self.turnos += 1
+        self.por_turno.append(contadores)
+        for c, n in contadores.items():
+            self.totales[c] += n
+        if instantanea is not None:
+            en_uso = sum(s.size for s in instantanea.statistics("filename"))
+            self.memoria.append((turno, en_uso))
+
+    def segundos_por_turno(self) -> Dict[str, float]:
+        por_turno = {f: s / max(self.turnos, 1) for f, s in self.segundos.items()}
+        por_turno["total"] = sum(por_turno.values())
+        return por_turno
+
+    def informe(self) -> str:
+        tiempos = self.segundos_por_turno()
+        total = tiempos.pop("total") or 1.0
+        lineas = [f"{self.turnos} turnos, {total * 1e3:.3f} ms/turno"]
+        for fase, s in sorted(tiempos.items(), key=lambda kv: -kv[1]):
+            lineas.append(f"  {fase:14s} {s * 1e3:9.3f} ms  {100 * s / total:5.1f}%")
+        lineas.append("  " + ", ".join(f"{c}={n}" for c, n in self.totales.items()))
+        if self.memoria:
+            turno, en_uso = self.memoria[-1]
+            lineas.append(f"  memoria (turno {turno}): {en_uso / 1e6:.2f} MB")
+        return "\n".join(lineas)
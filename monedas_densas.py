@@ -0,0 +1,126 @@
+# monedas_densas.py
+"""
+Monedas como dos tablas ancho x alto (valor total y número de monedas por
+casilla) en vez de un dict de listas. Las usa siempre motor_numpy y, con
+ConfigSimulacion.monedas_densas, también el motor de objetos.
+
+Las monedas de una casilla se recogen siempre todas a la vez, así que
+basta con su suma: agregar es un scatter-add y recoger un gather-and-zero
+de todas las posiciones a la vez. Para el motor de objetos se ve como un
+dict de solo lectura {(x, y): [valor_total]} (como AlmacenMonedas) con
+pop y mas_cercana; en mas_cercana los empates van por orden de casilla
+(x, luego y), no por orden de llegada, así que con la misma semilla el
+resultado no es idéntico al de AlmacenMonedas.
+"""
+from __future__ import annotations
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+Posicion = Tuple[int, int]
+
+
+class MonedasDensas(Mapping):
+    """Monedas como dos tablas ancho x alto: valor total y número de monedas."""
+
+    def __init__(self, ancho: int, alto: int, dtype=np.int64):
+        self.valor = np.zeros((ancho, alto), dtype=dtype)
+        self.conteo = np.zeros((ancho, alto), dtype=dtype)
+        self._posiciones = None
+
+    @classmethod
+    def sobre(cls, valor: np.ndarray, conteo: np.ndarray) -> "MonedasDensas":
+        """Monedas sobre tablas ya creadas (p. ej. en memoria compartida)."""
+        monedas = cls.__new__(cls)
+        monedas.valor = valor
+        monedas.conteo = conteo
+        monedas._posiciones = None
+        return monedas
+
+    # --- modificación (en bloque) ---
+
+    def agregar(self, xs, ys, valores) -> None:
+        np.add.at(self.valor, (xs, ys), valores)
+        np.add.at(self.conteo, (xs, ys), 1)
+        self._posiciones = None
+
+    def recoger(self, xs, ys) -> np.ndarray:
+        """
+        Cada posición (xs[i], ys[i]) recoge las monedas de su casilla; si
+        hay varias en la misma, se las lleva la primera (como en el bucle).
+        Devuelve lo recogido por cada posición y deja esas casillas vacías.
+        """
+        xs, ys = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+        cantidades = np.zeros(len(xs), dtype=self.valor.dtype)
+        if len(xs) == 0:
+            return cantidades
+        celdas = xs * self.valor.shape[1] + ys
+        con = np.flatnonzero(self.conteo.ravel()[celdas] > 0)
+        if len(con) == 0:
+            return cantidades
+        celdas_con, primero = np.unique(celdas[con], return_index=True)
+        cantidades[con[primero]] = self.valor.ravel()[celdas_con]
+        self.valor.ravel()[celdas_con] = 0
+        self.conteo.ravel()[celdas_con] = 0
+        self._posiciones = None
+        return cantidades
+
+    def pop(self, pos: Posicion, *default):
+        """Vacía la casilla y devuelve [valor_total]."""
+        if pos not in self:
+            if default:
+                return default[0]
+            raise KeyError(pos)
+        valores = self[pos]
+        self.valor[pos] = 0
+        self.conteo[pos] = 0
+        self._posiciones = None
+        return valores
+
+    # --- consultas ---
+
+    def hay_monedas(self) -> bool:
+        return bool(self.conteo.any())
+
+    def mas_cercana(self, x: int, y: int) -> Optional[Posicion]:
+        """Casilla con monedas más cercana a (x, y) en distancia Manhattan."""
+        if self._posiciones is None:
+            # las casillas con monedas no cambian durante la fase de movimiento
+            self._posiciones = np.nonzero(self.conteo)
+        xs, ys = self._posiciones
+        if len(xs) == 0:
+            return None
+        i = int(np.argmin(np.abs(xs - x) + np.abs(ys - y)))
+        return int(xs[i]), int(ys[i])
+
+    def a_dict(self) -> Dict[Posicion, List[int]]:
+        """{(x, y): [valor_total]} para las casillas con monedas."""
+        return dict(self.items())
+
+    # --- vista de dict {(x, y): [valor_total]} ---
+
+    def __getitem__(self, pos: Posicion) -> List[int]:
+        if not self._dentro(pos) or not self.conteo[pos]:
+            raise KeyError(pos)
+        return [int(self.valor[pos])]
+
+    def __iter__(self) -> Iterator[Posicion]:
+        xs, ys = np.nonzero(self.conteo)
+        return zip(xs.tolist(), ys.tolist())
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.conteo))
+
+    def __bool__(self) -> bool:
+        return self.hay_monedas()
+
+    def __contains__(self, pos) -> bool:
+        return self._dentro(pos) and bool(self.conteo[pos])
+
+    def __repr__(self) -> str:
+        return f"MonedasDensas({self.a_dict()!r})"
+
+    def _dentro(self, pos) -> bool:
+        x, y = pos
+        return 0 <= x < self.valor.shape[0] and 0 <= y < self.valor.shape[1]
@@ -0,0 +1,560 @@
+# motor_dominios.py
+"""
+Motor de columnas (motor_numpy) repartido en varios procesos por franjas
+del tablero, para poblaciones que no caben en el turno de un solo núcleo.
+
+El tablero, que da la vuelta en x e y, se corta en franjas de filas x
+consecutivas, una por proceso. Cada proceso es dueño de los agentes de su
+franja y de las monedas de sus casillas. Las tablas del tablero
+(territorios, bosque, monedas) están en memoria compartida y cada proceso
+solo escribe en sus filas; las casillas que ha pisado cada explorador
+(Visitadas) van con él de una franja a otra. En cada turno:
+
+1. evento (sorteado de antemano por el proceso principal, el mismo para
+   todos; ver _plan_eventos) y territorio actual;
+2. cada proceso publica qué casillas de su franja tienen agentes, por
+   grupos (presencia) → barrera;
+3. movimiento: los objetivos se buscan en la franja más 'halo' filas a
+   cada lado, leyendo la presencia que han publicado los vecinos; quien
+   sale de la franja se copia a su buzón de salida (ver _Buzones) →
+   barrera;
+4. cada proceso recoge a los que le llegan y resuelve monedas e
+   interacciones, que ya solo afectan a sus casillas.
+
+Las estadísticas de cada franja se suman al final en las historias de
+siempre. Diferencias con motor_numpy (además de las de ese motor con el de
+objetos): cada franja tiene su propio generador, y un objetivo a más de
+'halo' filas de la franja no se ve. Con la población densa para la que
+está pensado, el resultado es igual en distribución, no idéntico.
+"""
+from __future__ import annotations
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import multiprocessing as mp
+import os
+import queue
+import secrets
+import threading
+import traceback
+
+import numpy as np
+
+from persona import ROLES
+from territorio import Territorio
+from eventos import CATALOGO, ContextoEvento, aplicar_a_columnas
+from monedas_densas import MonedasDensas
+from motor_numpy import (
+    EXPLORADOR,
+    GUERRERO,
+    Poblacion,
+    Visitadas,
+    crear_poblacion,
+    resultados_numpy,
+    # fases del turno de motor_numpy
+    _interacciones,
+    _movimiento,
+    _recoger_monedas,
+    _registrar_muertes,
+)
+
+# columnas de Poblacion que viajan con un agente que cambia de franja
+COLUMNAS = (
+    "x", "y", "rol", "energia", "monedas", "vivo", "edad_turnos", "n_objetos",
+    "combates_ganados", "combates_totales", "intercambios_realizados", "territorio_actual",
+    "ident",
+)
+
+# bits de la tabla de presencia (grupos de fuentes de _movimiento)
+TODOS, COMERCIABLES, GUERREROS = 1, 2, 4
+
+IZQUIERDA, DERECHA = 0, 1
+
+CAPACIDAD_MINIMA = 4096   # enteros (int64) del primer bloque de un buzón
+
+# -------------------------------------------------------------------
+# MEMORIA COMPARTIDA
+# -------------------------------------------------------------------
+
+def _crear_compartidos(especs: Dict[str, Tuple[tuple, str]]):
+    """
+    Un bloque de memoria compartida por array. Devuelve (arrays, bloques,
+    nombres). Los bloques nuevos ya vienen a ceros, y no se rellenan: así
+    solo ocupan RAM las páginas que se escriben.
+    """
+    arrays, bloques, nombres = {}, [], {}
+    for nombre, (forma, dtype) in especs.items():
+        tam = max(int(np.prod(forma)) * np.dtype(dtype).itemsize, 1)
+        bloque = shared_memory.SharedMemory(create=True, size=tam)
+        bloques.append(bloque)
+        arrays[nombre] = np.ndarray(forma, dtype=dtype, buffer=bloque.buf)
+        nombres[nombre] = (bloque.name, forma, dtype)
+    return arrays, bloques, nombres
+
+
+def _abrir_compartidos(nombres: Dict[str, Tuple[str, tuple, str]]):
+    arrays, bloques = {}, []
+    for nombre, (nombre_bloque, forma, dtype) in nombres.items():
+        bloque = shared_memory.SharedMemory(name=nombre_bloque)
+        bloques.append(bloque)
+        arrays[nombre] = np.ndarray(forma, dtype=dtype, buffer=bloque.buf)
+    return arrays, bloques
+
+
+def _liberar(bloques: List[shared_memory.SharedMemory], borrar: bool) -> None:
+    for bloque in bloques:
+        try:
+            bloque.close()
+        except BufferError:
+            pass   # queda alguna vista (p. ej. en un traceback): se libera al salir
+        if borrar:
+            bloque.unlink()
+
+
+def _nombre_buzon(prefijo: str, k: int, lado: int, generacion: int) -> str:
+    return f"{prefijo}_{k}_{lado}_{generacion}"
+
+
+class _Buzones:
+    """
+    Buzones de los agentes que cambian de franja, uno por franja y lado.
+    Cada buzón es un bloque de memoria compartida propio, que crea la
+    franja que escribe en él: las COLUMNAS de cada agente, una fila por
+    agente, y detrás las claves de Visitadas de los exploradores. Si no
+    cabe, el bloque se cambia por otro con sitio para el doble y se sube
+    la generación, que va en el nombre del bloque; quien lee lo vuelve a
+    abrir al ver la generación nueva. Así la memoria va con los que
+    cruzan y no con la población.
+
+    En memoria compartida: cuantos[k, lado] = (agentes, claves) y
+    generacion[k, lado] (0 = todavía sin bloque).
+    """
+
+    def __init__(self, prefijo: str, cuantos: np.ndarray, generacion: np.ndarray):
+        self.prefijo, self.cuantos, self.generacion = prefijo, cuantos, generacion
+        # (k, lado) -> (generación, bloque, enteros del bloque)
+        self.abiertos: Dict[Tuple[int, int], tuple] = {}
+
+    def _abrir(self, k: int, lado: int, generacion: int, capacidad: int = 0) -> None:
+        """Abre el bloque (o lo crea, si se da la capacidad en enteros)."""
+        nombre = _nombre_buzon(self.prefijo, k, lado, generacion)
+        if capacidad:
+            bloque = shared_memory.SharedMemory(name=nombre, create=True, size=capacidad * 8)
+        else:
+            bloque = shared_memory.SharedMemory(name=nombre)
+        datos = np.ndarray(bloque.size // 8, dtype=np.int64, buffer=bloque.buf)
+        self.abiertos[(k, lado)] = (generacion, bloque, datos)
+
+    def _cerrar(self, k: int, lado: int, borrar: bool = False) -> None:
+        abierto = self.abiertos.pop((k, lado), None)
+        if abierto is not None:
+            bloque = abierto[1]
+            del abierto
+            _liberar([bloque], borrar)
+
+    def escribir(self, k: int, lado: int, pob: Poblacion, idx: np.ndarray,
+                 claves: np.ndarray) -> None:
+        """Copia al buzón (k, lado) a los agentes idx de pob y sus claves de Visitadas."""
+        m, n_claves = len(idx), len(claves)
+        self.cuantos[k, lado] = m, n_claves
+        if not m:
+            return
+        hace_falta = m * len(COLUMNAS) + n_claves
+        abierto = self.abiertos.get((k, lado))
+        if abierto is None or len(abierto[2]) < hace_falta:
+            generacion = int(self.generacion[k, lado]) + 1
+            del abierto
+            # el vecino ya ha leído el bloque viejo (hay una barrera entre medias)
+            self._cerrar(k, lado, borrar=True)
+            self._abrir(k, lado, generacion, capacidad=max(2 * hace_falta, CAPACIDAD_MINIMA))
+            self.generacion[k, lado] = generacion
+        datos = self.abiertos[(k, lado)][2]
+        filas = datos[:m * len(COLUMNAS)].reshape(m, len(COLUMNAS))
+        for j, c in enumerate(COLUMNAS):
+            filas[:, j] = getattr(pob, c)[idx]
+        datos[m * len(COLUMNAS):hace_falta] = claves
+
+    def leer(self, k: int, lado: int, plantilla: Poblacion) -> Optional[Tuple[Poblacion, np.ndarray]]:
+        """
+        Los agentes del buzón (k, lado), con los tipos de plantilla, y sus
+        claves de Visitadas (None si no hay nadie).
+        """
+        m, n_claves = (int(v) for v in self.cuantos[k, lado])
+        if not m:
+            return None
+        generacion = int(self.generacion[k, lado])
+        abierto = self.abiertos.get((k, lado))
+        if abierto is None or abierto[0] != generacion:
+            del abierto
+            self._cerrar(k, lado)
+            self._abrir(k, lado, generacion)
+        datos = self.abiertos[(k, lado)][2]
+        filas = datos[:m * len(COLUMNAS)].reshape(m, len(COLUMNAS))
+        entrada = Poblacion(0)
+        for j, c in enumerate(COLUMNAS):
+            setattr(entrada, c, filas[:, j].astype(getattr(plantilla, c).dtype))
+        return entrada, datos[m * len(COLUMNAS):m * len(COLUMNAS) + n_claves].copy()
+
+    def cerrar(self) -> None:
+        for k, lado in list(self.abiertos):
+            self._cerrar(k, lado)
+
+    def borrar(self) -> None:
+        """Borra el último bloque de cada buzón (los anteriores los borra quien los cambia)."""
+        self.cerrar()
+        for (k, lado), generacion in np.ndenumerate(self.generacion):
+            if generacion:
+                try:
+                    bloque = shared_memory.SharedMemory(
+                        name=_nombre_buzon(self.prefijo, k, lado, int(generacion)))
+                except FileNotFoundError:
+                    continue
+                _liberar([bloque], borrar=True)
+
+# -------------------------------------------------------------------
+# POBLACIÓN DE UNA FRANJA
+# -------------------------------------------------------------------
+
+def _seleccionar(pob: Poblacion, idx: np.ndarray) -> Poblacion:
+    nueva = Poblacion(0)
+    for c in COLUMNAS:
+        setattr(nueva, c, getattr(pob, c)[idx])
+    return nueva
+
+
+def _unir(pobs: List[Poblacion]) -> Poblacion:
+    nueva = Poblacion(0)
+    for c in COLUMNAS:
+        setattr(nueva, c, np.concatenate([getattr(p, c) for p in pobs]))
+    return nueva
+
+
+def _tabla_ids(territorios: List[Territorio], ancho: int, alto: int) -> np.ndarray:
+    """Lo mismo que MapaTerritorios.ids, rellenado con NumPy (tableros enormes)."""
+    ids = np.full((ancho, alto), -1, dtype=np.int16)
+    # al revés, para que si se solapan gane el primero
+    for i in range(len(territorios) - 1, -1, -1):
+        t = territorios[i]
+        ids[max(t.x_min, 0):min(t.x_max, ancho - 1) + 1,
+            max(t.y_min, 0):min(t.y_max, alto - 1) + 1] = i
+    return ids
+
+# -------------------------------------------------------------------
+# PROCESO DE UNA FRANJA
+# -------------------------------------------------------------------
+
+def _publicar_presencia(pob: Poblacion, presencia: np.ndarray, x0: int, x1: int, alto: int) -> None:
+    filas = presencia[x0:x1].reshape(-1)
+    filas.fill(0)
+    vivos = np.flatnonzero(pob.vivo)
+    celdas = (pob.x[vivos] - x0) * alto + pob.y[vivos]
+    guerrero = pob.rol[vivos] == GUERRERO
+    filas[celdas] |= TODOS
+    filas[celdas[~guerrero]] |= COMERCIABLES
+    filas[celdas[guerrero]] |= GUERREROS
+
+
+def _enviar(pob: Poblacion, visitadas: Visitadas, buzones: _Buzones, k: int,
+            x0: int, x1: int, ancho: int) -> Poblacion:
+    """
+    Copia a los buzones de k a los vivos que han salido de [x0, x1), con
+    sus casillas visitadas, y los quita de la franja.
+    """
+    fuera = pob.vivo & ((pob.x < x0) | (pob.x >= x1)) if x1 - x0 < ancho else None
+    if fuera is None:
+        return pob
+    a_izquierda = fuera & (pob.x == (x0 - 1) % ancho)
+    # con dos franjas las dos salidas pueden ser la misma fila: va por la izquierda
+    for lado, sale in ((IZQUIERDA, a_izquierda), (DERECHA, fuera & ~a_izquierda)):
+        idx = np.flatnonzero(sale)
+        buzones.escribir(k, lado, pob, idx, visitadas.extraer(pob.ident[idx]))
+    return _seleccionar(pob, np.flatnonzero(~fuera)) if fuera.any() else pob
+
+
+def _recibir(pob: Poblacion, visitadas: Visitadas, buzones: _Buzones, k: int, n: int) -> Poblacion:
+    """Añade a los que el vecino de la izquierda manda a la derecha y viceversa."""
+    if n == 1:
+        return pob
+    llegan = [pob]
+    for vecino, lado in (((k - 1) % n, DERECHA), ((k + 1) % n, IZQUIERDA)):
+        recibido = buzones.leer(vecino, lado, pob)
+        if recibido is not None:
+            entrada, claves = recibido
+            llegan.append(entrada)
+            visitadas.agregar(claves)
+    return _unir(llegan) if len(llegan) > 1 else pob
+
+
+def _franja(k: int, n: int, limites: List[int], ancho: int, alto: int, n_turnos: int,
+            n_personas: int, primer_ident: int, halo: int, semilla, eventos, plan, nombres,
+            prefijo, territorios, barrera, cola) -> None:
+    """
+    Simula la franja k (filas limites[k] .. limites[k + 1] - 1) todos los
+    turnos. Sus agentes se numeran desde primer_ident.
+    """
+    bloques, buzones = [], None
+    try:
+        comp, bloques = _abrir_compartidos(nombres)
+        buzones = _Buzones(prefijo, comp["cuantos"], comp["generacion"])
+        rng = np.random.default_rng(semilla)
+        x0, x1 = limites[k], limites[k + 1]
+        # filas en las que se buscan objetivos (sin dar la vuelta, como motor_numpy)
+        xa, xb = max(x0 - halo, 0), min(x1 + halo, ancho)
+        ids, bosque = comp["ids"], comp["bosque"]
+        presencia = comp["presencia"]
+        monedas = MonedasDensas.sobre(comp["valor"], comp["conteo"])
+        franja = _MonedasDeFranja(monedas, x0, x1)
+        n_terr = comp["muertes_terr"].shape[-1]
+        muertes_por_rol = np.zeros(len(ROLES), dtype=np.int64)
+        muertes_terr = np.zeros(n_terr, dtype=np.int64)
+
+        pob = crear_poblacion(n_personas, x1 - x0, alto, rng)
+        pob.x += x0
+        pob.ident += primer_ident
+        visitadas = Visitadas(ancho, alto)
+        expl = pob.rol == EXPLORADOR
+        visitadas.marcar(pob.ident[expl], pob.x[expl], pob.y[expl])
+        ventana = None
+
+        for turno in range(n_turnos):
+            muertes_antes = muertes_terr.copy()
+            nombre, agregadas = plan[turno]
+            evento = eventos[nombre] if nombre is not None else None
+            for xs, ys, valores in agregadas:
+                franja.agregar(xs, ys, valores)
+            if evento is not None and evento.afecta_personas:
+                ctx = ContextoEvento(franja, ancho, alto, rng)
+                muertos = aplicar_a_columnas(evento, pob, ids, territorios, ctx)
+                _registrar_muertes(pob, muertos, ids, muertes_por_rol, muertes_terr)
+
+            vivos = pob.vivo
+            pob.territorio_actual[vivos] = ids[pob.x[vivos], pob.y[vivos]]
+
+            _publicar_presencia(pob, presencia, x0, x1, alto)
+            barrera.wait()
+
+            ventana = presencia[xa:xb]
+            fuentes = {
+                "todos": (ventana & TODOS) > 0,
+                "comerciables": (ventana & COMERCIABLES) > 0,
+                "guerreros": (ventana & GUERREROS) > 0,
+            }
+            _movimiento(pob, monedas, ancho, alto, bosque, visitadas, rng, ventana=(xa, fuentes))
+            pob = _enviar(pob, visitadas, buzones, k, x0, x1, ancho)
+            barrera.wait()
+
+            # nadie vuelve a escribir en los buzones hasta la barrera del turno siguiente
+            pob = _recibir(pob, visitadas, buzones, k, n)
+            _recoger_monedas(pob, monedas)
+            comercios = _interacciones(pob, alto, bool(evento and evento.sin_interacciones), rng,
+                                       ids, muertes_por_rol, muertes_terr)
+
+            vivos = pob.vivo
+            comp["historia_roles"][k, turno] = np.bincount(pob.rol[vivos], minlength=len(ROLES))
+            comp["historia_riqueza"][k, turno] = np.bincount(
+                pob.rol[vivos], weights=pob.monedas[vivos], minlength=len(ROLES)
+            )
+            comp["comercios"][k, turno] = comercios
+            comp["muertes_terr"][k, turno] = muertes_terr - muertes_antes
+
+        comp["muertes_por_rol"][k] = muertes_por_rol
+        del comp, ids, bosque, presencia, monedas, franja, ventana
+        cola.put((k, {c: getattr(pob, c) for c in COLUMNAS}))
+    except threading.BrokenBarrierError:
+        cola.put((k, None))    # ha fallado otra franja
+    except BaseException:
+        # que los demás no se queden esperando en la barrera
+        barrera.abort()
+        cola.put((k, traceback.format_exc()))
+    finally:
+        if buzones is not None:
+            buzones.cerrar()
+            del buzones
+        _liberar(bloques, borrar=False)
+
+# -------------------------------------------------------------------
+# SIMULACIÓN PRINCIPAL
+# -------------------------------------------------------------------
+
+class _MonedasGrabadas:
+    """Apunta lo que se agrega en vez de agregarlo (para repartirlo luego)."""
+
+    def __init__(self):
+        self.agregadas = []
+
+    def agregar(self, xs, ys, valores) -> None:
+        self.agregadas.append((xs, ys, valores))
+
+
+class _MonedasDeFranja:
+    """Solo agrega las monedas que caen en las filas x0 .. x1 - 1."""
+
+    def __init__(self, monedas: MonedasDensas, x0: int, x1: int):
+        self.monedas, self.x0, self.x1 = monedas, x0, x1
+
+    def agregar(self, xs, ys, valores) -> None:
+        mias = (xs >= self.x0) & (xs < self.x1)
+        self.monedas.agregar(xs[mias], ys[mias], valores[mias])
+
+
+def _plan_eventos(rng: np.random.Generator, eventos, n_turnos: int, ancho: int, alto: int):
+    """
+    Evento de cada turno, igual que en motor_numpy._turno. Los que no
+    afectan a personas (la lluvia) se aplican aquí sobre unas monedas que
+    solo apuntan, y cada franja se queda luego con lo que cae en ella.
+    Los demás los aplica cada franja a sus agentes con su generador.
+    """
+    plan = []
+    sin_agentes = np.empty(0, dtype=np.int64)
+    for _ in range(n_turnos):
+        evento = eventos.sortear_numpy(rng)
+        grabadas = _MonedasGrabadas()
+        if evento is not None and not evento.afecta_personas and evento.sobre_columnas:
+            evento.sobre_columnas(None, sin_agentes, ContextoEvento(grabadas, ancho, alto, rng))
+        plan.append((evento.nombre if evento else None, grabadas.agregadas))
+    return plan
+
+
+def simular_dominios(
+    territorios: List[Territorio],
+    ancho: int,
+    alto: int,
+    n_personas: int,
+    n_turnos: int,
+    semilla: Optional[int] = None,
+    n_procesos: int = 0,
+    halo: int = 16,
+    sumidero=None,
+    historia_en_memoria: bool = True,
+    eventos=None,
+) -> Dict:
+    """
+    Como motor_numpy.simular_numpy, repartido en n_procesos franjas
+    (0 = una por núcleo). Devuelve las mismas claves. El sumidero recibe
+    los turnos al terminar (los procesos no se paran a esperarlo). El
+    catálogo de eventos viaja a los procesos, así que sus efectos tienen
+    que ser funciones de módulo (no lambdas).
+    """
+    eventos = eventos or CATALOGO
+    n = min(n_procesos or os.cpu_count() or 1, ancho)
+    limites = [ancho * k // n for k in range(n + 1)]
+    semillas = np.random.SeedSequence(semilla).spawn(n + 1)
+    rng = np.random.default_rng(semillas[0])
+
+    # agentes por franja (el total exacto; cada uno en una casilla al azar)
+    anchos = np.diff(limites)
+    por_franja = rng.multinomial(n_personas, anchos / ancho)
+    plan = _plan_eventos(rng, eventos, n_turnos, ancho, alto)
+
+    n_roles, n_terr = len(ROLES), len(territorios)
+    # los buzones de los que cambian de franja los crea cada franja (_Buzones)
+    prefijo = "dom_" + secrets.token_hex(4)
+    comp, bloques, nombres = _crear_compartidos({
+        "ids": ((ancho, alto), "int16"),
+        "bosque": ((ancho, alto), "bool"),
+        "presencia": ((ancho, alto), "uint8"),
+        "valor": ((ancho, alto), "int64"),
+        "conteo": ((ancho, alto), "int64"),
+        "cuantos": ((n, 2, 2), "int64"),
+        "generacion": ((n, 2), "int64"),
+        "historia_roles": ((n, n_turnos, n_roles), "int64"),
+        "historia_riqueza": ((n, n_turnos, n_roles), "int64"),
+        "comercios": ((n, n_turnos), "int64"),
+        "muertes_terr": ((n, n_turnos, n_terr), "int64"),
+        "muertes_por_rol": ((n, n_roles), "int64"),
+    })
+    buzones = _Buzones(prefijo, comp["cuantos"], comp["generacion"])
+    try:
+        comp["ids"][:] = _tabla_ids(territorios, ancho, alto)
+        tipo_de = np.array([t.tipo for t in territorios] + [None], dtype=object)
+        comp["bosque"][:] = np.isin(comp["ids"], [i for i, t in enumerate(territorios)
+                                                   if t.tipo == "bosque"])
+
+        # monedas iniciales, como inicializar_monedas_densas (en montaña valen más)
+        monedas_compartidas = MonedasDensas.sobre(comp["valor"], comp["conteo"])
+        xs = rng.integers(ancho, size=50)
+        ys = rng.integers(alto, size=50)
+        montaña = tipo_de[comp["ids"][xs, ys]] == "montaña"
+        monedas_compartidas.agregar(xs, ys, np.where(
+            montaña, rng.integers(3, 11, size=50), rng.integers(1, 6, size=50)
+        ))
+
+        barrera = mp.Barrier(n)
+        cola = mp.Queue()
+        procesos = [
+            mp.Process(target=_franja, args=(
+                k, n, limites, ancho, alto, n_turnos, int(por_franja[k]),
+                int(por_franja[:k].sum()), halo,
+                semillas[k + 1], eventos, plan, nombres, prefijo, territorios, barrera, cola,
+            ))
+            for k in range(n)
+        ]
+        for p in procesos:
+            p.start()
+        # leer la cola antes de join: un proceso no acaba hasta vaciar lo que envía
+        columnas: Dict[int, Dict[str, np.ndarray]] = {}
+        errores = []
+        respuestas = 0
+        while respuestas < n:
+            try:
+                k, res = cola.get(timeout=1.0)
+            except queue.Empty:
+                # un proceso que muere sin avisar (p. ej. sin memoria)
+                muertos = [k for k, p in enumerate(procesos) if p.exitcode not in (None, 0)]
+                if muertos:
+                    barrera.abort()
+                    for p in procesos:
+                        p.join()
+                    raise RuntimeError(f"la franja {muertos[0]} terminó sin resultado "
+                                       f"(código {procesos[muertos[0]].exitcode})")
+                continue
+            respuestas += 1
+            if isinstance(res, dict):
+                columnas[k] = res
+            elif res is not None:
+                errores.append((k, res))
+        for p in procesos:
+            p.join()
+        if errores or len(columnas) < n:
+            k, error = errores[0] if errores else (None, "")
+            raise RuntimeError(f"falló la franja {k}:\n{error}")
+
+        franjas = []
+        for k in range(n):
+            pob = Poblacion(0)
+            for c in COLUMNAS:
+                setattr(pob, c, columnas[k][c])
+            franjas.append(pob)
+        pob = _unir(franjas)
+        monedas = MonedasDensas.sobre(comp["valor"].copy(), comp["conteo"].copy())
+        historia_roles = comp["historia_roles"].sum(axis=0)
+        historia_riqueza = comp["historia_riqueza"].sum(axis=0)
+        comercios = comp["comercios"].sum(axis=0)
+        muertes_turno = comp["muertes_terr"].sum(axis=0)
+        muertes_por_rol = comp["muertes_por_rol"].sum(axis=0)
+        del comp, monedas_compartidas
+    finally:
+        buzones.borrar()
+        del buzones
+        _liberar(bloques, borrar=True)
+
+    if sumidero is not None:
+        nombres_terr = [t.nombre for t in territorios]
+        sumidero.abrir(ROLES, nombres_terr, eventos.nombres, n_turnos)
+        try:
+            for turno in range(n_turnos):
+                sumidero.escribir_turno(
+                    turno,
+                    dict(zip(ROLES, historia_roles[turno].tolist())),
+                    dict(zip(ROLES, historia_riqueza[turno].tolist())),
+                    dict(zip(nombres_terr, muertes_turno[turno].tolist())),
+                    int(comercios[turno]),
+                    plan[turno][0],
+                )
+        finally:
+            sumidero.cerrar()
+
+    return resultados_numpy(
+        pob, monedas, territorios, historia_roles, historia_riqueza,
+        muertes_por_rol, muertes_turno.sum(axis=0), int(comercios.sum()),
+        n_turnos, historia_en_memoria,
+    )
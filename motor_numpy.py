@@ -0,0 +1,885 @@
+# motor_numpy.py
+"""
+Motor alternativo de la simulación con columnas NumPy (una fila por persona)
+en lugar de un objeto Persona por agente. Pensado para 10^5 - 10^6 agentes.
+
+Sigue las mismas reglas que simular() por fases, pero cada fase se resuelve
+para muchos agentes a la vez, así que hay diferencias respecto al motor
+de objetos (que sigue siendo la referencia):
+- el movimiento va por tandas de la población en orden (BARRIDOS), no
+  agente a agente; dentro de una tanda se decide a la vez y se corrigen
+  los encuentros (ver _movimiento);
+- los objetivos a más de RADIO_LOCAL casillas se buscan con las
+  posiciones del inicio de la fase.
+El resultado es igual en distribución, no idéntico (tests/test_motor_numpy.py
+lo comprueba).
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from persona import Persona, ROLES
+from territorio import Territorio, MapaTerritorios
+from eventos import CATALOGO, ContextoEvento, aplicar_a_columnas
+from monedas_densas import MonedasDensas
+from interacciones import rondas_por_diagonales
+
+ROL_CODIGO = {rol: i for i, rol in enumerate(ROLES)}
+GUERRERO = ROL_CODIGO["guerrero"]
+COMERCIANTE = ROL_CODIGO["comerciante"]
+RECOLECTOR = ROL_CODIGO["recolector"]
+EXPLORADOR = ROL_CODIGO["explorador"]
+AVARO = ROL_CODIGO["avaro"]
+
+# mismas opciones (y mismo orden) que Persona.decidir_movimiento
+OPCIONES = np.array([
+    (0, 0), (1, 0), (-1, 0),
+    (0, 1), (0, -1),
+    (1, 1), (1, -1), (-1, 1), (-1, -1),
+])
+OPCIONES_AVARO = np.array([(0, 0), (1, 0), (0, 1), (-1, 0), (0, -1)])
+
+# distancia "infinita" para casillas sin fuente
+INF = 1 << 30
+
+# tandas en que se reparte la población para moverse por orden (_movimiento)
+BARRIDOS = 32
+# radio (Manhattan) en que cada tanda busca objetivos con las posiciones del
+# momento; más allá se usa un campo de distancias (uno por fase)
+RADIO_LOCAL = 4
+
+
+def _rombo(radio: int):
+    """Desplazamientos (dx, dy) a distancia Manhattan d, para d = 0 .. radio."""
+    anillos = []
+    for d in range(radio + 1):
+        desp = sorted({(i, s * (d - abs(i))) for i in range(-d, d + 1) for s in (1, -1)})
+        anillos.append((np.array([i for i, _ in desp]), np.array([j for _, j in desp])))
+    return anillos
+
+
+ROMBO = _rombo(RADIO_LOCAL)
+
+
+# -------------------------------------------------------------------
+# POBLACIÓN (struct of arrays)
+# -------------------------------------------------------------------
+
+class Poblacion:
+    """Columnas de la población: el agente i es la fila i de cada array."""
+
+    def __init__(self, n: int):
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.rol = np.zeros(n, dtype=np.int8)
+        self.energia = np.full(n, 10, dtype=np.int64)
+        self.monedas = np.zeros(n, dtype=np.int64)
+        self.vivo = np.ones(n, dtype=bool)
+        self.edad_turnos = np.zeros(n, dtype=np.int64)
+        # solo importa cuántos objetos lleva: el trueque es 1 por 1
+        self.n_objetos = np.zeros(n, dtype=np.int64)
+
+        # estadísticas
+        self.combates_ganados = np.zeros(n, dtype=np.int64)
+        self.combates_totales = np.zeros(n, dtype=np.int64)
+        self.intercambios_realizados = np.zeros(n, dtype=np.int64)
+        self.territorio_actual = np.full(n, -1, dtype=np.int64)
+        # número fijo de cada agente (el id_ de Persona), que no cambia
+        # aunque cambie su fila (motor_dominios)
+        self.ident = np.arange(n, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def a_personas(self, territorios: List[Territorio]) -> List[Persona]:
+        """Convierte las columnas en objetos Persona (para graficar o comparar)."""
+        personas = []
+        for i in range(len(self)):
+            t = int(self.territorio_actual[i])
+            personas.append(Persona(
+                id_=int(self.ident[i]),
+                x=int(self.x[i]),
+                y=int(self.y[i]),
+                rol=ROLES[self.rol[i]],
+                energia=int(self.energia[i]),
+                monedas=int(self.monedas[i]),
+                vivo=bool(self.vivo[i]),
+                edad_turnos=int(self.edad_turnos[i]),
+                combates_ganados=int(self.combates_ganados[i]),
+                combates_totales=int(self.combates_totales[i]),
+                intercambios_realizados=int(self.intercambios_realizados[i]),
+                territorio_actual=territorios[t].nombre if t >= 0 else None,
+            ))
+        return personas
+
+
+def crear_poblacion(n: int, ancho: int, alto: int, rng: np.random.Generator) -> Poblacion:
+    pob = Poblacion(n)
+    pob.x[:] = rng.integers(ancho, size=n)
+    pob.y[:] = rng.integers(alto, size=n)
+    pob.rol[:] = rng.integers(len(ROLES), size=n)
+    # comerciante y explorador empiezan con 2 objetos, el resto con 1
+    pob.n_objetos[:] = np.where(
+        (pob.rol == COMERCIANTE) | (pob.rol == EXPLORADOR), 2, 1
+    )
+    return pob
+
+
+class Visitadas:
+    """
+    Casillas que ha pisado cada explorador (el MapaVisitas del motor de
+    objetos), como claves int64 ordenadas: ident * ancho * alto + casilla.
+    Ocupa lo visitado, no tablero × agentes.
+    """
+
+    def __init__(self, ancho: int, alto: int):
+        self.ancho, self.alto = ancho, alto
+        self.claves = np.empty(0, dtype=np.int64)
+
+    def _clave(self, ident, x, y):
+        return (ident * self.ancho + x) * self.alto + y
+
+    def _estan(self, claves: np.ndarray) -> np.ndarray:
+        pos = np.searchsorted(self.claves, claves)
+        hay = pos < len(self.claves)
+        hay[hay] = self.claves[pos[hay]] == claves[hay]
+        return hay
+
+    def marcar(self, ident, x, y) -> None:
+        self.agregar(self._clave(ident, x, y))
+
+    def agregar(self, claves: np.ndarray) -> None:
+        """Añade claves (las de marcar o las que devuelve extraer)."""
+        claves = np.unique(claves)
+        claves = claves[~self._estan(claves)]
+        self.claves = np.insert(self.claves, np.searchsorted(self.claves, claves), claves)
+
+    def visitadas(self, ident, x, y) -> np.ndarray:
+        """Si el agente ident ha pisado (x, y); ident, x, y con broadcasting."""
+        return self._estan(np.asarray(self._clave(ident, x, y)))
+
+    def extraer(self, idents: np.ndarray) -> np.ndarray:
+        """Quita y devuelve las claves de esos agentes (los que se van a otra franja)."""
+        suyas = np.isin(self.claves // (self.ancho * self.alto), idents)
+        fuera = self.claves[suyas]
+        self.claves = self.claves[~suyas]
+        return fuera
+
+
+def inicializar_monedas_densas(
+    tipos: np.ndarray, ancho: int, alto: int, rng: np.random.Generator, n: int = 50
+) -> MonedasDensas:
+    monedas = MonedasDensas(ancho, alto)
+    xs = rng.integers(ancho, size=n)
+    ys = rng.integers(alto, size=n)
+    # en montaña valores más altos
+    montaña = tipos[xs, ys] == "montaña"
+    valores = np.where(
+        montaña, rng.integers(3, 11, size=n), rng.integers(1, 6, size=n)
+    )
+    monedas.agregar(xs, ys, valores)
+    return monedas
+
+
+# -------------------------------------------------------------------
+# OBJETIVO MÁS CERCANO (transformada de distancia Manhattan)
+# -------------------------------------------------------------------
+
+def _mezclar(dA, fA, dB, fB, rango):
+    """Une dos listas (ya ordenadas) de las dos fuentes más cercanas."""
+    def antes(d1, f1, d2, f2):
+        # a igual distancia gana la fuente de menor rango (y si no, la de A)
+        return (d1 < d2) | ((d1 == d2) & (rango[f1] <= rango[f2]))
+
+    a_gana = antes(dA[0], fA[0], dB[0], fB[0])
+    d0 = np.where(a_gana, dA[0], dB[0])
+    f0 = np.where(a_gana, fA[0], fB[0])
+    # el segundo es el mejor de lo que queda en cada lista
+    da = np.where(a_gana, dA[1], dA[0])
+    fa = np.where(a_gana, fA[1], fA[0])
+    db = np.where(a_gana, dB[0], dB[1])
+    fb = np.where(a_gana, fB[0], fB[1])
+    usa_a = antes(da, fa, db, fb)
+    d1 = np.where(usa_a, da, db)
+    f1 = np.where(usa_a, fa, fb)
+    return np.stack([d0, d1]), np.stack([f0, f1])
+
+
+def _prefijo(h: np.ndarray, f: np.ndarray, rango: np.ndarray):
+    """
+    Para cada posición y del último eje, las dos mejores entre
+    h_k(y') + (y - y') con y' <= y. Sin bucles: se usan mínimos acumulados
+    sobre claves que codifican (valor, rango de la fuente, posición).
+    h y f tienen forma (2, ..., n); h[0] <= h[1] en cada posición.
+    """
+    n = h.shape[-1]
+    S = n + 1
+    R = int(rango.max()) + 1
+    pos = np.arange(n)
+    # sin fuente (INF) cuenta como 'techo', más que cualquier distancia real,
+    # para que las claves (y su desfase por tramos) quepan en 64 bits
+    finitas = h[h < INF]
+    techo = (int(finitas.max()) if finitas.size else 0) + n + 1
+    h = np.minimum(h, techo)
+    tope = (techo + n + 1) * R * S + S     # mayor que cualquier clave real
+
+    def clave(hk, fk):
+        return ((hk - pos + n) * R + rango[fk]) * S + pos
+
+    k1 = clave(h[0], f[0])
+    k2 = clave(h[1], f[1])
+
+    # la mejor: mínimo acumulado de la primera lista
+    m = np.minimum.accumulate(k1, axis=-1)
+    p = m % S
+
+    # la segunda sale de uno de estos tres sitios:
+    # a) la segunda entrada de la posición ganadora p
+    kA = np.take_along_axis(k2, p, -1)
+    # b) lo mejor estrictamente antes de p
+    antes = np.empty_like(m)
+    antes[..., 0] = tope
+    antes[..., 1:] = m[..., :-1]
+    kB = np.take_along_axis(antes, p, -1)
+    # c) lo mejor en (p, y]: mínimo acumulado por tramos entre "récords"
+    record = p == pos
+    tramo = np.cumsum(record, axis=-1)
+    desfase = tramo * (tope + 1)
+    kC = np.minimum.accumulate(np.where(record, tope, k1) - desfase, axis=-1) + desfase
+
+    k_seg = np.minimum(np.minimum(kA, kB), kC)
+    de_A = k_seg == kA
+    f_seg = np.where(
+        de_A,
+        np.take_along_axis(f[1], p, -1),
+        np.take_along_axis(f[0], k_seg % S, -1),
+    )
+
+    D = np.stack([m // S // R, k_seg // S // R]) - n + pos
+    F = np.stack([np.take_along_axis(f[0], p, -1), f_seg])
+    # lo que no tenga fuente se queda en INF / -1
+    sin = D >= techo
+    D[sin] = INF
+    F[sin] = -1
+    return D, F
+
+
+def _barrido(D: np.ndarray, F: np.ndarray, rango: np.ndarray):
+    """
+    Propaga las dos fuentes más cercanas a lo largo del último eje:
+    hacia delante, hacia atrás (sobre el eje invertido) y unión.
+    """
+    ida_D, ida_F = _prefijo(D, F, rango)
+    vta_D, vta_F = _prefijo(D[..., ::-1], F[..., ::-1], rango)
+    vta_D, vta_F = vta_D[..., ::-1], vta_F[..., ::-1]
+
+    # ida[y] ya incluye la casilla y; vuelta[y + 1] aporta lo que hay después
+    res_D, res_F = ida_D.copy(), ida_F.copy()
+    if D.shape[-1] > 1:
+        res_D[..., :-1], res_F[..., :-1] = _mezclar(
+            ida_D[..., :-1], ida_F[..., :-1], vta_D[..., 1:] + 1, vta_F[..., 1:], rango
+        )
+    return res_D, res_F
+
+
+def dos_mas_cercanas(fuentes: np.ndarray, rango: Optional[np.ndarray] = None):
+    """
+    Para cada casilla, las dos casillas-fuente distintas más cercanas en
+    distancia Manhattan (sin wrap). fuentes es un bool (ancho, alto).
+    rango (opcional, ancho x alto) desempata entre fuentes a la misma
+    distancia: gana la de menor rango, como en el motor de objetos gana
+    la persona que va antes en la lista. Sin rango, o si el rango es tan
+    grande que las claves no caben en 64 bits, se desempata por posición.
+    Devuelve (D, F) de forma (2, ancho, alto): distancias e índice plano
+    x * alto + y de la fuente (INF / -1 si no hay).
+    """
+    ancho, alto = fuentes.shape
+    # rango por índice plano; el último elemento es el de "sin fuente" (F = -1)
+    plano = np.zeros(ancho * alto + 1, dtype=np.int64)
+    if rango is not None:
+        R = int(rango.max()) + 1
+        L = max(ancho, alto)
+        # cota de las claves de _prefijo, con el desfase por tramos
+        if (3 * L + 3) * R * (L + 1) ** 2 < 2 ** 62:
+            plano[:-1] = rango.ravel()
+            plano[-1] = R
+    D = np.full((2, ancho, alto), INF, dtype=np.int64)
+    F = np.full((2, ancho, alto), -1, dtype=np.int64)
+    D[0][fuentes] = 0
+    F[0] = np.where(fuentes, np.arange(ancho * alto).reshape(ancho, alto), -1)
+    D, F = _barrido(D, F, plano)
+    # segundo barrido sobre x (copias contiguas: mucho más rápido)
+    D, F = _barrido(
+        np.ascontiguousarray(D.swapaxes(1, 2)), np.ascontiguousarray(F.swapaxes(1, 2)), plano
+    )
+    return D.swapaxes(1, 2), F.swapaxes(1, 2)
+
+
+def _objetivo(D, F, celdas, es_fuente, solo_en_celda):
+    """
+    Objetivo (índice plano) de cada agente, o -1.
+    Si el agente es fuente y está solo en su casilla, su propia casilla
+    no cuenta y se usa la segunda más cercana.
+    """
+    usar_segunda = es_fuente & solo_en_celda
+    d = np.where(usar_segunda, D[1].ravel()[celdas], D[0].ravel()[celdas])
+    f = np.where(usar_segunda, F[1].ravel()[celdas], F[0].ravel()[celdas])
+    return np.where(d < INF, f, -1)
+
+
+def _mas_cercana_local(cuenta, rango, ajenas, cx, cy, es_fuente, sin_rango):
+    """
+    Casilla-fuente más cercana (índice plano en la tabla) a cada (cx, cy), a
+    distancia <= RADIO_LOCAL, o -1 si no hay ninguna tan cerca.
+    cuenta y rango son los agentes fuente por casilla y el primero de ellos
+    en la población; a igual distancia gana la casilla de menor rango. La
+    casilla propia no cuenta por el propio agente (si es fuente).
+    ajenas (o None) son casillas-fuente fijas con rango sin_rango.
+    """
+    ancho, alto = cuenta.shape
+    cuenta, rango = cuenta.ravel(), rango.ravel()
+    ajenas = None if ajenas is None else ajenas.ravel()
+    res = np.full(len(cx), -1, dtype=np.int64)
+    pendientes = np.arange(len(cx))
+    for d, (ox, oy) in enumerate(ROMBO):
+        if len(pendientes) == 0:
+            break
+        nx = cx[pendientes, None] + ox
+        ny = cy[pendientes, None] + oy
+        dentro = (nx >= 0) & (nx < ancho) & (ny >= 0) & (ny < alto)
+        celda = np.where(dentro, nx * alto + ny, 0)
+        n = np.where(dentro, cuenta[celda], 0)
+        if d == 0:
+            n -= es_fuente[pendientes, None]
+        hay = n > 0
+        rk = np.where(hay, rango[celda], INF)
+        if ajenas is not None:
+            fija = dentro & ajenas[celda] & ~hay
+            rk = np.where(fija, sin_rango, rk)
+            hay |= fija
+        alguna = hay.any(axis=1)
+        mejor = rk.argmin(axis=1)
+        res[pendientes[alguna]] = celda[alguna, mejor[alguna]]
+        pendientes = pendientes[~alguna]
+    return res
+
+
+# -------------------------------------------------------------------
+# FASES DEL TURNO
+# -------------------------------------------------------------------
+
+def _registrar_muertes(pob, muertos, ids, muertes_por_rol, muertes_terr):
+    if len(muertos) == 0:
+        return
+    muertes_por_rol += np.bincount(pob.rol[muertos], minlength=len(ROLES))
+    t = ids[pob.x[muertos], pob.y[muertos]]
+    t = t[t >= 0]
+    muertes_terr += np.bincount(t, minlength=len(muertes_terr))
+
+
+def _paso_hacia(x, y, objetivo, alto):
+    tx, ty = np.divmod(objetivo, alto)
+    return np.sign(tx - x), np.sign(ty - y)
+
+
+# a quién mira cada agente al decidir (para _resolver_llegadas)
+NADIE, A_CUALQUIERA, A_COMERCIABLE, A_GUERRERO = -1, 0, 1, 2
+
+
+def _primera_llegada(destino, llega, celdas):
+    """Para cada casilla de celdas, el menor índice de los que llegan a ella (o m)."""
+    m = len(destino)
+    idx = np.flatnonzero(llega)
+    primero = np.full(len(celdas), m, dtype=np.int64)
+    if len(idx) == 0:
+        return primero
+    casillas, i = np.unique(destino[idx], return_index=True)
+    pos = np.minimum(np.searchsorted(casillas, celdas), len(casillas) - 1)
+    hay = casillas[pos] == celdas
+    primero[hay] = idx[i[pos[hay]]]
+    return primero
+
+
+def _resolver_llegadas(x, y, dx, dy, rol, clase, ancho, alto):
+    """
+    Ajusta los pasos de una tanda, decididos a la vez, para que den lo que
+    daría el bucle del motor de objetos, que mueve a los agentes uno detrás
+    de otro en el orden de la población. En el bucle, quien persigue a alguien (o
+    huye de un guerrero) y ve llegar a su casilla, antes de que le toque, a
+    alguien de los que mira, lo tiene a distancia 0 y se queda quieto. Sin
+    esto, dos perseguidores vecinos se cambian de casilla en cada turno y
+    no se encuentran nunca.
+    clase dice a quién mira cada uno (A_CUALQUIERA, A_COMERCIABLE,
+    A_GUERRERO o NADIE). Quedarse quieto cambia a su vez quién llega a
+    dónde, así que se repite hasta que nada cambia (las cadenas son cortas).
+    Modifica dx y dy.
+    """
+    sensibles = np.flatnonzero((clase != NADIE) & ((dx != 0) | (dy != 0)))
+    if len(sensibles) == 0:
+        return
+    m = len(x)
+    origen = x * alto + y
+    dx0, dy0 = dx[sensibles], dy[sensibles]
+    mirados = {
+        A_CUALQUIERA: np.ones(m, dtype=bool),
+        A_COMERCIABLE: rol != GUERRERO,
+        A_GUERRERO: rol == GUERRERO,
+    }
+    quieto = np.zeros(len(sensibles), dtype=bool)
+    while True:
+        destino = ((x + dx) % ancho) * alto + (y + dy) % alto
+        llega = destino != origen
+        nuevo = np.zeros(len(sensibles), dtype=bool)
+        for k, mascara in mirados.items():
+            sel = np.flatnonzero(clase[sensibles] == k)
+            if len(sel):
+                b = sensibles[sel]
+                primero = _primera_llegada(destino, llega & mascara, origen[b])
+                nuevo[sel] = primero < b
+        if np.array_equal(nuevo, quieto):
+            return
+        quieto = nuevo
+        dx[sensibles] = np.where(quieto, 0, dx0)
+        dy[sensibles] = np.where(quieto, 0, dy0)
+
+
+def _movimiento(pob, monedas, ancho, alto, bosque, visitadas, rng, ventana=None,
+                barridos=BARRIDOS):
+    """
+    Mueve a los vivos y marca en visitadas las casillas nuevas de los
+    exploradores. Como en el bucle del motor de objetos, los agentes se mueven por orden:
+    la población se parte en 'barridos' tandas consecutivas, y cada tanda
+    decide con las posiciones que han dejado las anteriores. Dentro de una
+    tanda se decide a la vez y _resolver_llegadas corrige los encuentros.
+    ventana = (x0, fuentes) limita la búsqueda de objetivos a las filas
+    x0 .. x0 + w - 1, con las casillas-fuente de personas ya dadas en
+    fuentes["todos" / "comerciables" / "guerreros"] (bool w x alto); así lo
+    usa motor_dominios, donde hay agentes de otros procesos en esas filas.
+    """
+    vivos = np.flatnonzero(pob.vivo)
+    m = len(vivos)
+    if m == 0:
+        return
+    x = pob.x[vivos]
+    y = pob.y[vivos]
+    rol = pob.rol[vivos]
+    x0, fuentes = ventana if ventana is not None else (0, None)
+    w = ancho if fuentes is None else fuentes["todos"].shape[0]
+    todos = np.ones(m, dtype=bool)
+    mascaras = {"todos": todos, "comerciables": rol != GUERRERO, "guerreros": rol == GUERRERO}
+
+    def ocupacion(mascara):
+        """
+        Agentes de mascara por casilla de la ventana, donde están ahora, y
+        el rango de cada casilla: el primero de ellos en la población (m
+        si no hay ninguno), para desempatar como el motor de objetos.
+        """
+        xl = x - x0
+        dentro = np.flatnonzero(mascara & (xl >= 0) & (xl < w))
+        celdas = xl[dentro] * alto + y[dentro]
+        cuenta = np.bincount(celdas, minlength=w * alto).reshape(w, alto)
+        rango = np.full(w * alto, m, dtype=np.int64)
+        np.minimum.at(rango, celdas, dentro)
+        return cuenta, rango.reshape(w, alto)
+
+    if fuentes is not None:
+        # de lo publicado quedan los agentes de los vecinos; los nuestros se
+        # cuentan donde estén en cada tanda
+        sin_nuestros = ocupacion(todos)[0] == 0
+        ajenas = {nombre: hay & sin_nuestros for nombre, hay in fuentes.items()}
+
+    campos = {}     # campos de distancias (uno por grupo y fase)
+    locales = {}    # ocupación de la tanda en curso
+
+    def objetivo_personas(nombre, quien):
+        """Persona (del grupo 'nombre') más cercana para los agentes 'quien'."""
+        es_fuente = mascaras[nombre][quien]
+        if nombre not in locales:
+            locales[nombre] = ocupacion(mascaras[nombre])
+        cuenta, rango = locales[nombre]
+        vecinos = None if fuentes is None else ajenas[nombre]
+        obj = _mas_cercana_local(cuenta, rango, vecinos, x[quien] - x0, y[quien],
+                                 es_fuente.astype(np.int64), m)
+        lejos = obj < 0
+        if lejos.any():
+            # nadie a RADIO_LOCAL o menos: campo de distancias, calculado la
+            # primera vez que hace falta en la fase
+            if nombre not in campos:
+                cuenta0, rango0 = ocupacion(mascaras[nombre])
+                hay = cuenta0 > 0 if fuentes is None else ajenas[nombre] | (cuenta0 > 0)
+                campos[nombre] = (cuenta0, *dos_mas_cercanas(hay, rango0))
+            cuenta0, D, F = campos[nombre]
+            q = quien[lejos]
+            c = (x[q] - x0) * alto + y[q]
+            solo = cuenta0.ravel()[c] == 1
+            obj[lejos] = _objetivo(D, F, c, es_fuente[lejos], solo)
+        return obj
+
+    dx = np.zeros(m, dtype=np.int64)
+    dy = np.zeros(m, dtype=np.int64)
+    # a quién persigue (o de quién huye) cada uno, para _resolver_llegadas
+    clase = np.full(m, NADIE, dtype=np.int8)
+
+    def mover_hacia(quien, objetivo, huir=False):
+        hay = objetivo >= 0
+        idx = quien[hay]
+        sx, sy = _paso_hacia(x[idx] - x0, y[idx], objetivo[hay], alto)
+        if huir:
+            sx, sy = -sx, -sy
+        dx[idx] = sx
+        dy[idx] = sy
+
+    # las monedas no se mueven en esta fase
+    con_monedas = monedas.conteo[x0:x0 + w] > 0
+    hay_monedas = bool(con_monedas.any())
+    if hay_monedas:
+        D_m, F_m = dos_mas_cercanas(con_monedas)
+
+    def hacia_monedas(quien):
+        mover_hacia(quien, F_m[0].ravel()[(x[quien] - x0) * alto + y[quien]])
+
+    exploradores = []
+    for tanda in np.array_split(np.arange(m), min(barridos, m)):
+        locales.clear()
+        rol_t = rol[tanda]
+
+        # por defecto, paso aleatorio
+        eleccion = rng.integers(len(OPCIONES), size=len(tanda))
+        dx[tanda] = OPCIONES[eleccion, 0]
+        dy[tanda] = OPCIONES[eleccion, 1]
+
+        # guerreros: hacia la persona más cercana
+        g = tanda[rol_t == GUERRERO]
+        if len(g):
+            mover_hacia(g, objetivo_personas("todos", g))
+            clase[g] = A_CUALQUIERA
+
+        # comerciantes: hacia alguien que no sea guerrero (o cualquiera)
+        c = tanda[rol_t == COMERCIANTE]
+        if len(c):
+            obj = objetivo_personas("comerciables", c)
+            sin = obj < 0
+            if sin.any():
+                obj[sin] = objetivo_personas("todos", c[sin])
+            mover_hacia(c, obj)
+            clase[c] = np.where(sin, A_CUALQUIERA, A_COMERCIABLE)
+
+        # recolectores: huyen del guerrero más cercano, si no van a por monedas
+        r = tanda[rol_t == RECOLECTOR]
+        if len(r):
+            obj = objetivo_personas("guerreros", r)
+            huye = obj >= 0
+            mover_hacia(r[huye], obj[huye], huir=True)
+            clase[r[huye]] = A_GUERRERO
+            resto = r[~huye]
+            if hay_monedas and len(resto):
+                hacia_monedas(resto)
+
+        # exploradores: casillas vecinas aún no exploradas
+        e = tanda[rol_t == EXPLORADOR]
+        if len(e):
+            nx = (x[e, None] + OPCIONES[None, :, 0]) % ancho
+            ny = (y[e, None] + OPCIONES[None, :, 1]) % alto
+            libres = ~visitadas.visitadas(pob.ident[vivos[e], None], nx, ny)
+            claves = rng.random(libres.shape) * libres
+            hay_libres = libres.any(axis=1)
+            k = claves.argmax(axis=1)
+            sel = e[hay_libres]
+            dx[sel] = OPCIONES[k[hay_libres], 0]
+            dy[sel] = OPCIONES[k[hay_libres], 1]
+            exploradores.append(e)
+
+        # avaros: 40% a por monedas, si no pasos cortos
+        a = tanda[rol_t == AVARO]
+        if len(a):
+            va = rng.random(len(a)) < 0.4
+            corto = rng.integers(len(OPCIONES_AVARO), size=len(a))
+            dx[a] = OPCIONES_AVARO[corto, 0]
+            dy[a] = OPCIONES_AVARO[corto, 1]
+            if hay_monedas and va.any():
+                hacia_monedas(a[va])
+
+        # efecto bosque: 50% de no moverse
+        en_bosque = tanda[bosque[x[tanda], y[tanda]]]
+        quietos = en_bosque[rng.random(len(en_bosque)) < 0.5]
+        dx[quietos] = 0
+        dy[quietos] = 0
+
+        dx_t, dy_t = dx[tanda], dy[tanda]
+        _resolver_llegadas(x[tanda], y[tanda], dx_t, dy_t, rol_t, clase[tanda], ancho, alto)
+        x[tanda] = (x[tanda] + dx_t) % ancho
+        y[tanda] = (y[tanda] + dy_t) % alto
+
+    pob.x[vivos] = x
+    pob.y[vivos] = y
+    pob.edad_turnos[vivos] += 1
+    if exploradores:
+        e = vivos[np.concatenate(exploradores)]
+        visitadas.marcar(pob.ident[e], pob.x[e], pob.y[e])
+
+
+def _recoger_monedas(pob, monedas):
+    vivos = np.flatnonzero(pob.vivo)
+    pob.monedas[vivos] += monedas.recoger(pob.x[vivos], pob.y[vivos])
+
+
+def _quiere_comerciar(pob, idx, rng):
+    rol = pob.rol[idx]
+    quiere = rol == COMERCIANTE
+    quiere |= (rol == EXPLORADOR) & (rng.random(len(idx)) < 0.2)
+    quiere |= (rol == RECOLECTOR) & (pob.monedas[idx] > 0) & (pob.n_objetos[idx] > 0)
+    return quiere
+
+
+def _interacciones(pob, alto, sin_interacciones, rng, ids, muertes_por_rol, muertes_terr) -> int:
+    """
+    Comercio y combate por casilla. Las parejas se reparten en rondas por
+    diagonales (interacciones.rondas_por_diagonales): cada agente ve sus
+    parejas en el mismo orden que en el doble bucle (i, j), y cada ronda
+    se resuelve a la vez en todas las casillas. Con k agentes en la casilla
+    más llena son 2k - 3 rondas en vez de k*(k-1)/2.
+    Devuelve el número de comercios.
+    """
+    if sin_interacciones:
+        # niebla: nadie comercia ni pelea
+        return 0
+    vivos = np.flatnonzero(pob.vivo)
+    celdas = pob.x[vivos] * alto + pob.y[vivos]
+    orden = np.argsort(celdas, kind="stable")
+    miembros = vivos[orden]
+    celdas = celdas[orden]
+
+    _, inicio, tam = np.unique(celdas, return_index=True, return_counts=True)
+    llenas = tam >= 2
+    inicio = inicio[llenas]
+    tam = tam[llenas]
+    if len(tam) == 0:
+        return 0
+
+    # casillas con al menos dos vivos (las demás ya no tienen parejas)
+    casilla_de = np.full(len(pob.vivo), -1, dtype=np.int64)
+    en_llenas = np.repeat(inicio - (np.cumsum(tam) - tam), tam) + np.arange(tam.sum())
+    casilla_de[miembros[en_llenas]] = np.repeat(np.arange(len(tam)), tam)
+    vivos_casilla = tam.copy()
+    activas = np.ones(len(tam), dtype=bool)
+
+    comercios = 0
+    for pa, pb in rondas_por_diagonales(inicio, tam, activas):
+        a, b = miembros[pa], miembros[pb]
+        activos = pob.vivo[a] & pob.vivo[b]
+        a = a[activos]
+        b = b[activos]
+        if len(a) == 0:
+            continue
+
+        # intento de comercio primero
+        comercia = (
+            _quiere_comerciar(pob, a, rng) & _quiere_comerciar(pob, b, rng)
+            & (pob.monedas[a] > 0) & (pob.monedas[b] > 0)
+            & (pob.n_objetos[a] > 0) & (pob.n_objetos[b] > 0)
+        )
+        ca, cb = a[comercia], b[comercia]
+        pob.monedas[ca] -= 1
+        pob.monedas[cb] -= 1
+        pob.intercambios_realizados[ca] += 1
+        pob.intercambios_realizados[cb] += 1
+        comercios += len(ca)
+
+        # luego combate
+        a, b = a[~comercia], b[~comercia]
+        muertos = _combate(pob, a, b, rng, ids, muertes_por_rol, muertes_terr)
+        if len(muertos):
+            vivos_casilla -= np.bincount(casilla_de[muertos], minlength=len(tam))
+            activas &= vivos_casilla >= 2
+    return comercios
+
+
+def _combate(pob, a, b, rng, ids, muertes_por_rol, muertes_terr) -> np.ndarray:
+    """Un combate por pareja (a[i], b[i]). Devuelve los índices de los muertos."""
+    if len(a) == 0:
+        return a
+    pob.combates_totales[a] += 1
+    pob.combates_totales[b] += 1
+
+    # prob ganador proporcional a energía
+    total = np.maximum(pob.energia[a] + pob.energia[b], 1)
+    gana_a = rng.random(len(a)) < pob.energia[a] / total
+    ganador = np.where(gana_a, a, b)
+    perdedor = np.where(gana_a, b, a)
+
+    pob.energia[perdedor] -= 5
+    muere = pob.energia[perdedor] <= 0
+    pob.vivo[perdedor[muere]] = False
+    pob.combates_ganados[ganador[muere]] += 1
+    _registrar_muertes(pob, perdedor[muere], ids, muertes_por_rol, muertes_terr)
+    return perdedor[muere]
+
+
+# -------------------------------------------------------------------
+# SIMULACIÓN PRINCIPAL
+# -------------------------------------------------------------------
+
+def _turno(pob, monedas, ancho, alto, ids, bosque, visitadas, rng,
+           muertes_por_rol, muertes_terr, territorios, eventos) -> Tuple[Optional[str], int]:
+    """Fases 0-4 de un turno. Devuelve (evento, número de comercios)."""
+    # evento global (ver eventos.py)
+    evento = eventos.sortear_numpy(rng)
+    if evento:
+        ctx = ContextoEvento(monedas, ancho, alto, rng)
+        muertos = aplicar_a_columnas(evento, pob, ids, territorios, ctx)
+        _registrar_muertes(pob, muertos, ids, muertes_por_rol, muertes_terr)
+
+    # 1) Territorio actual
+    vivos = pob.vivo
+    pob.territorio_actual[vivos] = ids[pob.x[vivos], pob.y[vivos]]
+
+    # 2) Movimiento
+    _movimiento(pob, monedas, ancho, alto, bosque, visitadas, rng)
+
+    # 3) Recoger monedas
+    _recoger_monedas(pob, monedas)
+
+    # 4) Interacciones por casilla
+    comercios = _interacciones(
+        pob, alto, bool(evento and evento.sin_interacciones), rng, ids,
+        muertes_por_rol, muertes_terr,
+    )
+    return (evento.nombre if evento else None), comercios
+
+
+def simular_numpy(
+    territorios: List[Territorio],
+    ancho: int,
+    alto: int,
+    n_personas: int,
+    n_turnos: int,
+    semilla: Optional[int] = None,
+    sumidero=None,
+    historia_en_memoria: bool = True,
+    eventos=None,
+) -> Dict:
+    """
+    Igual que simulacion.simular() pero con el motor de columnas.
+    Devuelve las mismas claves; "personas" es una Poblacion y "monedas"
+    unas MonedasDensas (ver Poblacion.a_personas y MonedasDensas.a_dict).
+    sumidero (opcional) recibe cada turno y historia_en_memoria=False
+    devuelve las historias vacías, como en simular(). eventos es el
+    catálogo de eventos (por defecto eventos.CATALOGO).
+    """
+    rng = np.random.default_rng(semilla)
+    eventos = eventos or CATALOGO
+
+    mapa = MapaTerritorios(territorios, ancho, alto)
+    ids = np.array(mapa.ids, dtype=np.int64)
+    tipos = np.array(mapa.tipos, dtype=object)
+    bosque = tipos == "bosque"
+
+    pob = crear_poblacion(n_personas, ancho, alto, rng)
+    monedas = inicializar_monedas_densas(tipos, ancho, alto, rng)
+    visitadas = Visitadas(ancho, alto)
+    expl = pob.rol == EXPLORADOR
+    visitadas.marcar(pob.ident[expl], pob.x[expl], pob.y[expl])
+
+    n_roles = len(ROLES)
+    historia_roles = np.zeros((n_turnos, n_roles), dtype=np.int64)
+    historia_riqueza = np.zeros((n_turnos, n_roles), dtype=np.int64)
+    muertes_por_rol = np.zeros(n_roles, dtype=np.int64)
+    muertes_terr = np.zeros(len(territorios), dtype=np.int64)
+    total_comercios = 0
+
+    nombres_terr = [t.nombre for t in territorios]
+    if sumidero is not None:
+        sumidero.abrir(ROLES, nombres_terr, eventos.nombres, n_turnos)
+    try:
+        for turno in range(n_turnos):
+            muertes_antes = muertes_terr.copy()
+            evento, comercios = _turno(
+                pob, monedas, ancho, alto, ids, bosque, visitadas, rng,
+                muertes_por_rol, muertes_terr, territorios, eventos,
+            )
+            total_comercios += comercios
+
+            # 5) Estadísticas por turno
+            vivos = pob.vivo
+            historia_roles[turno] = np.bincount(pob.rol[vivos], minlength=n_roles)
+            historia_riqueza[turno] = np.bincount(
+                pob.rol[vivos], weights=pob.monedas[vivos], minlength=n_roles
+            )
+            if sumidero is not None:
+                sumidero.escribir_turno(
+                    turno,
+                    dict(zip(ROLES, historia_roles[turno].tolist())),
+                    dict(zip(ROLES, historia_riqueza[turno].tolist())),
+                    dict(zip(nombres_terr, (muertes_terr - muertes_antes).tolist())),
+                    comercios,
+                    evento,
+                )
+    finally:
+        if sumidero is not None:
+            sumidero.cerrar()
+
+    return resultados_numpy(
+        pob, monedas, territorios, historia_roles, historia_riqueza,
+        muertes_por_rol, muertes_terr, total_comercios, n_turnos, historia_en_memoria,
+    )
+
+
+def resultados_numpy(
+    pob: Poblacion,
+    monedas: MonedasDensas,
+    territorios: List[Territorio],
+    historia_roles: np.ndarray,
+    historia_riqueza: np.ndarray,
+    muertes_por_rol: np.ndarray,
+    muertes_terr: np.ndarray,
+    total_comercios: int,
+    n_turnos: int,
+    historia_en_memoria: bool = True,
+) -> Dict:
+    """El dict de resultados (mismas claves que simular) a partir de las columnas."""
+    n_roles = len(ROLES)
+    n_por_rol = np.bincount(pob.rol, minlength=n_roles)
+    riqueza = np.bincount(pob.rol, weights=pob.monedas, minlength=n_roles)
+    edades = np.bincount(pob.rol, weights=pob.edad_turnos, minlength=n_roles)
+    combates = np.bincount(pob.rol, weights=pob.combates_totales, minlength=n_roles)
+
+    riqueza_final_por_rol = {rol: int(riqueza[i]) for i, rol in enumerate(ROLES)}
+    edad_media_por_rol = {
+        rol: (edades[i] / n_por_rol[i]) if n_por_rol[i] else 0
+        for i, rol in enumerate(ROLES)
+    }
+    combates_por_rol = {rol: int(combates[i]) for i, rol in enumerate(ROLES)}
+    muertes_en_territorio = {
+        t.nombre: int(muertes_terr[i]) for i, t in enumerate(territorios)
+    }
+
+    return {
+        "personas": pob,
+        "territorios": territorios,
+        "monedas": monedas,
+        "historia_roles": {
+            rol: historia_roles[:, i].tolist() if historia_en_memoria else []
+            for i, rol in enumerate(ROLES)
+        },
+        "historia_riqueza": {
+            rol: historia_riqueza[:, i].tolist() if historia_en_memoria else []
+            for i, rol in enumerate(ROLES)
+        },
+        "muertes_por_rol": {
+            rol: int(muertes_por_rol[i]) for i, rol in enumerate(ROLES)
+        },
+        "muertes_en_territorio": muertes_en_territorio,
+        "riqueza_final_por_rol": riqueza_final_por_rol,
+        "edad_media_por_rol": edad_media_por_rol,
+        "combates_por_rol": combates_por_rol,
+        "rol_mas_rico": max(riqueza_final_por_rol, key=riqueza_final_por_rol.get),
+        "rol_mas_longevo": max(edad_media_por_rol, key=edad_media_por_rol.get),
+        "rol_mas_violento": max(combates_por_rol, key=combates_por_rol.get),
+        "territorio_mas_letal": max(
+            muertes_en_territorio, key=muertes_en_territorio.get
+        ),
+        "media_comercio_por_turno": total_comercios / n_turnos,
+        # este motor no para antes de tiempo
+        "fin": {"motivo": "turnos", "turno": n_turnos},
+    }
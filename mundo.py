@@ -0,0 +1,97 @@
+# mundo.py
+"""
+Estado completo de una simulación en curso (motor de objetos) y su
+guardado en disco, para poder reanudar una ejecución larga.
+
+Con el mismo estado (incluido el del generador) el resto de la ejecución
+es idéntico, así que reanudar desde un punto de control da la misma
+trayectoria que no haberse parado.
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+import os
+import pickle
+import zlib
+
+from persona import Persona
+from territorio import Territorio, MapaTerritorios
+from almacen_monedas import AlmacenMonedas
+from estadisticas import ContadoresRol
+from eventos import CatalogoEventos, CATALOGO
+
+# cabecera de los ficheros de punto de control (cambiarla si cambia el formato)
+FORMATO = b"SIMULACION-ESTADO-1\n"
+
+
+@dataclass
+class EstadoMundo:
+    """Todo lo que cambia de un turno a otro; turno es el siguiente a simular."""
+    config: Any                      # ConfigSimulacion
+    rng: Any                         # random.Random o AzarPorBloques
+    territorios: List[Territorio]
+    personas: List[Persona]
+    monedas: AlmacenMonedas          # o MonedasDensas con config.monedas_densas
+    contadores: ContadoresRol
+    historia_roles: Dict[str, List[int]]
+    historia_riqueza: Dict[str, List[int]]
+    muertes_por_rol: Dict[str, int]
+    muertes_en_territorio: Dict[str, int]
+    total_comercios: int = 0
+    # acumulados para la instrumentación (ver instrumentacion.py)
+    decisiones: int = 0
+    parejas_evaluadas: int = 0
+    monedas_recogidas: int = 0
+    turno: int = 0
+    evento: Optional[str] = None     # evento del turno en curso
+    eventos: CatalogoEventos = CATALOGO
+    # parada anticipada (ConfigSimulacion.parar_si)
+    motivo_fin: Optional[str] = None
+    firma: Optional[tuple] = None    # vivos y riqueza por rol del último turno
+    turnos_estables: int = 0         # turnos seguidos con la misma firma
+    mapa_territorios: MapaTerritorios = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.mapa_territorios = MapaTerritorios(
+            self.territorios, self.config.ancho, self.config.alto
+        )
+
+    def terminado(self) -> bool:
+        return self.turno >= self.config.n_turnos or self.motivo_fin is not None
+
+    # la tabla de territorios se rehace al cargar (es grande y se deduce);
+    # la config se guarda como dict para no depender de dónde se definió
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        del estado["mapa_territorios"]
+        estado["config"] = asdict(self.config)
+        return estado
+
+    def __setstate__(self, estado) -> None:
+        from simulacion import ConfigSimulacion
+
+        estado["config"] = ConfigSimulacion(**estado["config"])
+        self.__dict__.update(estado)
+        self.__post_init__()
+
+
+def guardar_estado(estado: EstadoMundo, ruta: str, nivel: int = 6) -> None:
+    """
+    Escribe el estado comprimido (pickle + zlib). Se escribe a un fichero
+    temporal y luego se renombra, así que un corte a mitad no estropea el
+    punto de control anterior.
+    """
+    datos = zlib.compress(pickle.dumps(estado, protocol=pickle.HIGHEST_PROTOCOL), nivel)
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(FORMATO)
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+
+def cargar_estado(ruta: str) -> EstadoMundo:
+    with open(ruta, "rb") as f:
+        cabecera = f.read(len(FORMATO))
+        if cabecera != FORMATO:
+            raise ValueError(f"{ruta} no es un punto de control de la simulación")
+        return pickle.loads(zlib.decompress(f.read()))
@@ -4,11 +4,17 @@ from dataclasses import dataclass, field
 from typing import List, Tuple, Optional
 import random
 
+from territorio import buscar_territorio
+from visitas import MapaVisitas
+
 # Lista de roles que usamos en la simulación
 ROLES = ["recolector", "guerrero", "comerciante", "explorador", "avaro"]
 
+# roles con los que un comerciante puede intentar comerciar
+ROLES_COMERCIABLES = [r for r in ROLES if r != "guerrero"]
+
 
-@dataclass
+@dataclass(slots=True)
 class Persona:
     id_: int
     x: int
@@ -26,15 +32,30 @@ class Persona:
     intercambios_realizados: int = 0
     territorio_actual: Optional[str] = None
 
-    # para exploradores (casillas ya visitadas)
-    celdas_visitadas: set = field(default_factory=set)
+    # para exploradores (casillas ya visitadas): bits en un mapa compartido
+    # indexado por id_; sin mapa se usa un set propio. Los demás roles no
+    # las miran, así que no se anotan.
+    visitas: Optional[MapaVisitas] = None
+    celdas_visitadas: Optional[set] = None
 
     def posicion(self) -> Tuple[int, int]:
         return self.x, self.y
 
     def marcar_celda_visitada(self) -> None:
+        if self.rol != "explorador":
+            return
+        if self.visitas is not None:
+            self.visitas.marcar(self.id_, self.x, self.y)
+            return
+        if self.celdas_visitadas is None:
+            self.celdas_visitadas = set()
         self.celdas_visitadas.add((self.x, self.y))
 
+    def ha_visitado(self, x: int, y: int) -> bool:
+        if self.visitas is not None:
+            return self.visitas.visitada(self.id_, x, y)
+        return self.celdas_visitadas is not None and (x, y) in self.celdas_visitadas
+
     def esta_en_territorio(self, nombre: str) -> bool:
         return self.territorio_actual == nombre
 
@@ -69,12 +90,20 @@ class Persona:
         personas: List["Persona"],
         monedas: dict,
         territorios: List["Territorio"],
+        indice: Optional["IndicePersonas"] = None,
+        rng=None,
     ) -> Tuple[int, int]:
         """
         Devuelve (dx, dy) según el rol.
         personas incluye a esta persona.
-        monedas es un dict {(x, y): [valores]}
+        monedas es un dict {(x, y): [valores]} o un AlmacenMonedas
+        indice (opcional) es el índice espacial del turno; si no se da,
+        se recorre la lista de personas entera.
+        rng es el generador de azar (por defecto, el módulo random).
         """
+        if rng is None:
+            rng = random
+
         # movimientos vecinos (incluye quedarse)
         opciones = [
             (0, 0), (1, 0), (-1, 0),
@@ -82,39 +111,43 @@ class Persona:
             (1, 1), (1, -1), (-1, 1), (-1, -1)
         ]
 
-        otros = [p for p in personas if p is not self and p.esta_vivo()]
         pos = self.posicion()
 
-        def vecino_mas_cercano(filtro=None):
-            candidatos = otros
-            if filtro is not None:
-                candidatos = [p for p in otros if filtro(p)]
-            if not candidatos:
-                return None
-            px, py = pos
-            p_obj = min(
-                candidatos,
-                key=lambda p: abs(p.x - px) + abs(p.y - py)
-            )
-            return p_obj.posicion()
+        if indice is not None:
+            def vecino_mas_cercano(roles=None):
+                p_obj = indice.mas_cercano(self, roles)
+                return p_obj.posicion() if p_obj is not None else None
+        else:
+            otros = [p for p in personas if p is not self and p.esta_vivo()]
+
+            def vecino_mas_cercano(roles=None):
+                candidatos = otros
+                if roles is not None:
+                    candidatos = [p for p in otros if p.rol in roles]
+                if not candidatos:
+                    return None
+                px, py = pos
+                p_obj = min(
+                    candidatos,
+                    key=lambda p: abs(p.x - px) + abs(p.y - py)
+                )
+                return p_obj.posicion()
 
         def moneda_mas_cercana():
             if not monedas:
                 return None
             px, py = pos
+            if hasattr(monedas, "mas_cercana"):
+                return monedas.mas_cercana(px, py)
             (mx, my), _ = min(
                 monedas.items(),
                 key=lambda item: abs(item[0][0] - px) + abs(item[0][1] - py)
             )
             return (mx, my)
 
-        objetivo_persona = vecino_mas_cercano()
-        objetivo_comerciable = vecino_mas_cercano(lambda p: p.rol != "guerrero")
-        objetivo_moneda = moneda_mas_cercana()
-
         def paso_hacia(obj, huir: bool = False) -> Tuple[int, int]:
             if obj is None:
-                return random.choice(opciones)
+                return rng.choice(opciones)
             x, y = pos
             tx, ty = obj
             dx = 0 if x == tx else (1 if tx > x else -1)
@@ -126,49 +159,47 @@ class Persona:
         # comportamiento según rol
         if self.rol == "guerrero":
             # busca combate
-            dx, dy = paso_hacia(objetivo_persona)
+            dx, dy = paso_hacia(vecino_mas_cercano())
         elif self.rol == "comerciante":
             # busca a otros para intercambiar
-            dx, dy = paso_hacia(objetivo_comerciable or objetivo_persona)
+            dx, dy = paso_hacia(
+                vecino_mas_cercano(ROLES_COMERCIABLES) or vecino_mas_cercano()
+            )
         elif self.rol == "recolector":
             # se mueve hacia monedas, huye de guerreros
-            guerrero_cercano = vecino_mas_cercano(lambda p: p.rol == "guerrero")
+            guerrero_cercano = vecino_mas_cercano(["guerrero"])
             if guerrero_cercano is not None:
                 dx, dy = paso_hacia(guerrero_cercano, huir=True)
-            elif objetivo_moneda is not None:
-                dx, dy = paso_hacia(objetivo_moneda)
+            elif monedas:
+                dx, dy = paso_hacia(moneda_mas_cercana())
             else:
-                dx, dy = random.choice(opciones)
+                dx, dy = rng.choice(opciones)
         elif self.rol == "explorador":
             # prioriza casillas no visitadas
             candidatos = []
             for dx, dy in opciones:
                 nx = (self.x + dx) % ancho
                 ny = (self.y + dy) % alto
-                if (nx, ny) not in self.celdas_visitadas:
+                if not self.ha_visitado(nx, ny):
                     candidatos.append((dx, dy))
             if candidatos:
-                dx, dy = random.choice(candidatos)
+                dx, dy = rng.choice(candidatos)
             else:
-                dx, dy = random.choice(opciones)
+                dx, dy = rng.choice(opciones)
         else:  # avaro
             # avaro persigue monedas pero se mueve poco
-            if random.random() < 0.4 and objetivo_moneda is not None:
-                dx, dy = paso_hacia(objetivo_moneda)
+            if rng.random() < 0.4 and monedas:
+                dx, dy = paso_hacia(moneda_mas_cercana())
             else:
-                dx, dy = random.choice(
+                dx, dy = rng.choice(
                     [(0, 0), (1, 0), (0, 1), (-1, 0), (0, -1)]
                 )
 
         # efecto bosque: menos movimiento
-        territorio = None
-        for t in territorios:
-            if t.contiene(*pos):
-                territorio = t
-                break
+        territorio = buscar_territorio(*pos, territorios)
         if territorio and territorio.tipo == "bosque":
             # 50% de no moverse
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 dx, dy = (0, 0)
 
         return dx, dy
@@ -1,18 +1,28 @@
 # simulacion.py
 from __future__ import annotations
-from typing import List, Dict, Tuple
+from dataclasses import dataclass
+from time import perf_counter
+from typing import List, Dict, Optional, Tuple
 import random
-
-import matplotlib.pyplot as plt
+import tracemalloc
 
 from persona import Persona, ROLES
+from visitas import MapaVisitas
 from territorio import Territorio
+from indice_espacial import IndicePersonas
+from almacen_monedas import AlmacenMonedas
+from estadisticas import ContadoresRol
+from mundo import EstadoMundo, guardar_estado, cargar_estado
+from azar import crear_rng
+from telemetria import SumideroTelemetria
+from instrumentacion import Observador
+from fotogramas import GrabacionFotogramas
+from eventos import CatalogoEventos, ContextoEvento, aplicar_a_personas
 from utils import (
     recoger_monedas,
+    recoger_monedas_en_bloque,
     combate,
     intercambiar,
-    generar_evento,
-    aplicar_evento,
     territorio_en_posicion,
 )
 
@@ -25,6 +35,55 @@ GRID_ALTO = 20
 N_PERSONAS_INICIALES = 30
 N_TURNOS = 200
 
+# condiciones de parada de ConfigSimulacion.parar_si:
+# - "extincion": no queda nadie vivo
+# - "superviviente": queda uno (o ninguno)
+# - "estable": vivos y riqueza por rol sin cambios en ventana_estable turnos
+PARADAS = ("extincion", "superviviente", "estable")
+
+
+@dataclass(frozen=True)
+class ConfigSimulacion:
+    """Parámetros de una ejecución (por defecto, los globales de arriba)."""
+    ancho: int = GRID_ANCHO
+    alto: int = GRID_ALTO
+    n_personas: int = N_PERSONAS_INICIALES
+    n_turnos: int = N_TURNOS
+    # uniformes precalculados en bloque con NumPy (ver azar.py)
+    azar_por_bloques: bool = False
+    # comercio/combate de todas las casillas a la vez con NumPy
+    # (ver interacciones.py; mismo reparto, no la misma secuencia)
+    interacciones_por_lotes: bool = False
+    # backend "dominios" (motor_dominios.py): nº de franjas/procesos
+    # (0 = uno por núcleo) y filas de los vecinos en las que se buscan objetivos
+    dominios: int = 0
+    halo: int = 16
+    # parar antes de n_turnos (ver PARADAS); las historias acaban en el
+    # turno de parada y res["fin"] dice cuándo y por qué
+    parar_si: Tuple[str, ...] = ()
+    ventana_estable: int = 50
+    # sin vivos, o con uno y sin monedas, turnos sin fases por agente (solo
+    # evento y estadísticas); idéntico sin vivos, no con un superviviente
+    avance_rapido: bool = False
+    # monedas del motor de objetos en dos tablas int32 (valor y número por
+    # casilla, ver monedas_densas.py) en vez de listas por casilla; la
+    # recogida es una sola operación y los empates hacia la moneda más
+    # cercana se resuelven distinto (no idéntico, igual en distribución)
+    monedas_densas: bool = False
+
+    def __post_init__(self) -> None:
+        desconocidas = [p for p in self.parar_si if p not in PARADAS]
+        if desconocidas:
+            raise ValueError(f"condición de parada desconocida: {desconocidas[0]!r} "
+                             f"(opciones: {PARADAS})")
+        # que siga siendo hashable aunque se pase una lista
+        object.__setattr__(self, "parar_si", tuple(self.parar_si))
+
+    @classmethod
+    def desde_globales(cls) -> "ConfigSimulacion":
+        """Config con el valor actual de los globales (por si se han cambiado)."""
+        return cls(GRID_ANCHO, GRID_ALTO, N_PERSONAS_INICIALES, N_TURNOS)
+
 # -------------------------------------------------------------------
 # CREACIÓN DE TERRITORIOS Y PERSONAS
 # -------------------------------------------------------------------
@@ -43,13 +102,18 @@ def crear_territorios() -> List[Territorio]:
     ]
 
 
-def crear_personas() -> List[Persona]:
+def crear_personas(config: Optional[ConfigSimulacion] = None, rng=None) -> List[Persona]:
+    config = config or ConfigSimulacion.desde_globales()
+    if rng is None:
+        rng = random
+    # casillas visitadas: una fila de bits por explorador (se crea al marcar)
+    visitas = MapaVisitas(config.ancho, config.alto)
     personas: List[Persona] = []
-    for i in range(N_PERSONAS_INICIALES):
-        x = random.randrange(GRID_ANCHO)
-        y = random.randrange(GRID_ALTO)
-        rol = random.choice(ROLES)
-        p = Persona(id_=i, x=x, y=y, rol=rol)
+    for i in range(config.n_personas):
+        x = rng.randrange(config.ancho)
+        y = rng.randrange(config.alto)
+        rol = rng.choice(ROLES)
+        p = Persona(id_=i, x=x, y=y, rol=rol, visitas=visitas)
         # algunos roles empiezan con objetos
         if rol in ("comerciante", "explorador"):
             p.objetos.extend(["poción", "mapa"])
@@ -64,23 +128,41 @@ def crear_personas() -> List[Persona]:
     return personas
 
 
-def inicializar_monedas(territorios: List[Territorio]) -> Dict[Tuple[int, int], List[int]]:
+def crear_monedas(config: ConfigSimulacion):
+    """Tablero sin monedas: AlmacenMonedas, o MonedasDensas con config.monedas_densas."""
+    if config.monedas_densas:
+        # import aquí para no exigir NumPy si no se usa
+        import numpy as np
+        from monedas_densas import MonedasDensas
+        return MonedasDensas(config.ancho, config.alto, dtype=np.int32)
+    return AlmacenMonedas(config.ancho, config.alto)
+
+
+def inicializar_monedas(territorios: List[Territorio],
+                        config: Optional[ConfigSimulacion] = None,
+                        rng=None):
     """
     Genera algunas monedas al principio.
     En montaña mayor probabilidad de monedas de alto valor.
     """
-    monedas: Dict[Tuple[int, int], List[int]] = {}
+    config = config or ConfigSimulacion.desde_globales()
+    if rng is None:
+        rng = random
+    monedas = crear_monedas(config)
 
+    xs, ys, valores = [], [], []
     for _ in range(50):
-        x = random.randrange(GRID_ANCHO)
-        y = random.randrange(GRID_ALTO)
+        x = rng.randrange(config.ancho)
+        y = rng.randrange(config.alto)
         territorio = territorio_en_posicion(x, y, territorios)
         if territorio and territorio.tipo == "montaña":
-            valor = random.randint(3, 10)
+            valor = rng.randint(3, 10)
         else:
-            valor = random.randint(1, 5)
-        monedas.setdefault((x, y), []).append(valor)
-
+            valor = rng.randint(1, 5)
+        xs.append(x)
+        ys.append(y)
+        valores.append(valor)
+    monedas.agregar(xs, ys, valores)
     return monedas
 
 
@@ -96,142 +178,352 @@ def agrupar_por_posicion(personas: List[Persona]) -> Dict[Tuple[int, int], List[
 # SIMULACIÓN PRINCIPAL
 # -------------------------------------------------------------------
 
-def simular():
+BACKENDS = ("objetos", "numpy", "dominios")
+
+
+def crear_estado(config: Optional[ConfigSimulacion] = None,
+                 semilla: Optional[int] = None,
+                 eventos: Optional[CatalogoEventos] = None) -> EstadoMundo:
+    """Estado inicial del motor de objetos (turno 0)."""
+    config = config or ConfigSimulacion.desde_globales()
+    rng = crear_rng(semilla, config.azar_por_bloques)
     territorios = crear_territorios()
-    personas = crear_personas()
-    monedas = inicializar_monedas(territorios)
-
-    # estadísticas por turno
-    historia_roles = {rol: [] for rol in ROLES}
-    historia_riqueza = {rol: [] for rol in ROLES}
-    muertes_por_rol = {rol: 0 for rol in ROLES}
-    muertes_en_territorio = {t.nombre: 0 for t in territorios}
-    total_comercios = 0
-
-    for turno in range(N_TURNOS):
-        # evento global
-        evento = generar_evento()
-        info_evento = {}
-        if evento:
-            info_evento = aplicar_evento(
-                evento,
-                personas,
-                monedas,
-                ancho=GRID_ANCHO,
-                alto=GRID_ALTO,
-            )
-            # registrar muertes por evento
-            for victima in info_evento.get("muertes", []):
-                muertes_por_rol[victima.rol] += 1
-                terr = territorio_en_posicion(victima.x, victima.y, territorios)
-                if terr:
-                    muertes_en_territorio[terr.nombre] += 1
-
-        # 1) Actualizar territorio actual de cada persona
-        for p in personas:
-            if not p.esta_vivo():
-                continue
-            terr = territorio_en_posicion(p.x, p.y, territorios)
-            p.territorio_actual = terr.nombre if terr else None
-
-        # 2) Movimiento
-        for p in personas:
-            if not p.esta_vivo():
-                continue
-            dx, dy = p.decidir_movimiento(
-                GRID_ANCHO, GRID_ALTO, personas, monedas, territorios
+    personas = crear_personas(config, rng)
+    estado = EstadoMundo(
+        config=config,
+        rng=rng,
+        territorios=territorios,
+        personas=personas,
+        monedas=crear_monedas(config),  # se reparten abajo
+        contadores=ContadoresRol(personas),
+        historia_roles={rol: [] for rol in ROLES},
+        historia_riqueza={rol: [] for rol in ROLES},
+        muertes_por_rol={rol: 0 for rol in ROLES},
+        muertes_en_territorio={t.nombre: 0 for t in territorios},
+    )
+    if eventos is not None:
+        estado.eventos = eventos
+    # con la tabla de territorios del estado ya hecha
+    estado.monedas = inicializar_monedas(estado.mapa_territorios, config, rng)
+    return estado
+
+
+def _registrar_muerte(estado: EstadoMundo, victima: Persona) -> None:
+    estado.muertes_por_rol[victima.rol] += 1
+    terr = territorio_en_posicion(victima.x, victima.y, estado.mapa_territorios)
+    if terr:
+        estado.muertes_en_territorio[terr.nombre] += 1
+
+
+def _registrar_muertes(estado: EstadoMundo, victimas: List[Persona]) -> None:
+    """Muertes de golpe (las de un evento): contadores, rol y territorio en una pasada."""
+    if not victimas:
+        return
+    contadores, mapa = estado.contadores, estado.mapa_territorios
+    por_rol: Dict[str, int] = {}
+    por_terr: Dict[str, int] = {}
+    for p in victimas:
+        contadores.muerte(p)
+        por_rol[p.rol] = por_rol.get(p.rol, 0) + 1
+        terr = territorio_en_posicion(p.x, p.y, mapa)
+        if terr:
+            por_terr[terr.nombre] = por_terr.get(terr.nombre, 0) + 1
+    for rol, n in por_rol.items():
+        estado.muertes_por_rol[rol] += n
+    for nombre, n in por_terr.items():
+        estado.muertes_en_territorio[nombre] += n
+
+# --- fases de un turno (en este orden) ---
+
+def fase_evento(estado: EstadoMundo) -> None:
+    """Evento global del turno (queda en estado.evento; ver eventos.py)."""
+    evento = estado.eventos.sortear(estado.rng)
+    estado.evento = evento.nombre if evento else None
+    if evento:
+        ctx = ContextoEvento(estado.monedas, estado.config.ancho, estado.config.alto, estado.rng)
+        muertos = aplicar_a_personas(evento, estado.personas, estado.mapa_territorios, ctx)
+        _registrar_muertes(estado, muertos)
+
+
+def fase_territorios(estado: EstadoMundo) -> None:
+    """Actualizar territorio actual de cada persona."""
+    for p in estado.personas:
+        if not p.esta_vivo():
+            continue
+        terr = territorio_en_posicion(p.x, p.y, estado.mapa_territorios)
+        p.territorio_actual = terr.nombre if terr else None
+
+
+def fase_movimiento(estado: EstadoMundo) -> None:
+    """Movimiento (el índice se actualiza con cada paso)."""
+    ancho, alto = estado.config.ancho, estado.config.alto
+    personas, contadores = estado.personas, estado.contadores
+    indice = IndicePersonas(personas, ancho, alto)
+    decisiones = 0
+    for p in personas:
+        if not p.esta_vivo():
+            continue
+        decisiones += 1
+        dx, dy = p.decidir_movimiento(
+            ancho, alto, personas, estado.monedas, estado.mapa_territorios,
+            indice=indice,
+            rng=estado.rng,
+        )
+        x0, y0 = p.x, p.y
+        p.mover(dx, dy, ancho, alto)
+        indice.mover(p, x0, y0)
+        p.edad_turnos += 1
+        contadores.envejecer(p)
+    estado.decisiones += decisiones
+
+
+def fase_monedas(estado: EstadoMundo) -> None:
+    """Recoger monedas."""
+    if estado.config.monedas_densas:
+        estado.monedas_recogidas += recoger_monedas_en_bloque(
+            estado.personas, estado.monedas, estado.contadores
+        )
+        return
+    recogidas = 0
+    for p in estado.personas:
+        if not p.esta_vivo():
+            continue
+        recogidas += recoger_monedas(p, estado.monedas, estado.contadores)
+    estado.monedas_recogidas += recogidas
+
+
+def fase_interacciones(estado: EstadoMundo) -> None:
+    """Interacciones (combate/comercio) por casilla."""
+    rng, contadores = estado.rng, estado.contadores
+    celdas = agrupar_por_posicion(estado.personas)
+    if estado.eventos.sin_interacciones(estado.evento):
+        # niebla: nadie comercia ni pelea, pero las parejas se miran igual
+        estado.parejas_evaluadas += sum(len(a) * (len(a) - 1) // 2 for a in celdas.values())
+        return
+    if estado.config.interacciones_por_lotes:
+        # las casillas muy llenas, todas a la vez con NumPy; el resto, como siempre
+        # (import aquí para no exigir NumPy si no se usa)
+        from interacciones import UMBRAL_LOTES, resolver_por_lotes
+        llenas = [agentes for agentes in celdas.values() if len(agentes) >= UMBRAL_LOTES]
+        if llenas:
+            comercios, parejas = resolver_por_lotes(
+                llenas, contadores, rng,
+                lambda victima: _registrar_muerte(estado, victima),
             )
-            p.mover(dx, dy, GRID_ANCHO, GRID_ALTO)
-            p.edad_turnos += 1
-
-        # 3) Recoger monedas
-        for p in personas:
-            if not p.esta_vivo():
-                continue
-            recoger_monedas(p, monedas)
-
-        # 4) Interacciones (combate/comercio) por casilla
-        celdas = agrupar_por_posicion(personas)
-
-        for pos, agentes in celdas.items():
-            if len(agentes) < 2:
-                continue
-
-            # niebla: nadie pelea
-            hay_niebla = evento == "niebla"
-
-            # todas las parejas en la casilla
-            for i in range(len(agentes)):
-                for j in range(i + 1, len(agentes)):
-                    a = agentes[i]
-                    b = agentes[j]
-                    if not (a.esta_vivo() and b.esta_vivo()):
-                        continue
-
-                    # intento de comercio primero
-                    hubo_comercio = intercambiar(a, b, territorios, evento_actual=evento)
-                    if hubo_comercio:
-                        total_comercios += 1
-                        continue
-
-                    # luego combate (si no hay niebla)
-                    if not hay_niebla:
-                        ganador = combate(a, b)
-                        if ganador is not None:
-                            perdedor = b if ganador is a else a
-                            if not perdedor.esta_vivo():
-                                muertes_por_rol[perdedor.rol] += 1
-                                terr = territorio_en_posicion(
-                                    perdedor.x, perdedor.y, territorios
-                                )
-                                if terr:
-                                    muertes_en_territorio[terr.nombre] += 1
-
-        # 5) Estadísticas por turno
+            estado.total_comercios += comercios
+            estado.parejas_evaluadas += parejas
+            celdas = {pos: agentes for pos, agentes in celdas.items()
+                      if len(agentes) < UMBRAL_LOTES}
+    parejas = 0
+
+    for pos, agentes in celdas.items():
+        if len(agentes) < 2:
+            continue
+
+        # todas las parejas en la casilla
+        for i in range(len(agentes)):
+            for j in range(i + 1, len(agentes)):
+                a = agentes[i]
+                b = agentes[j]
+                if not (a.esta_vivo() and b.esta_vivo()):
+                    continue
+                parejas += 1
+
+                # intento de comercio primero
+                hubo_comercio = intercambiar(
+                    a, b, estado.territorios, contadores=contadores, rng=rng,
+                )
+                if hubo_comercio:
+                    estado.total_comercios += 1
+                    continue
+
+                # luego combate
+                ganador = combate(a, b, contadores, rng)
+                if ganador is not None:
+                    perdedor = b if ganador is a else a
+                    if not perdedor.esta_vivo():
+                        _registrar_muerte(estado, perdedor)
+    estado.parejas_evaluadas += parejas
+
+
+def fase_estadisticas(estado: EstadoMundo, historia_en_memoria: bool = True) -> None:
+    """Estadísticas por turno (contadores mantenidos sobre la marcha)."""
+    if historia_en_memoria:
+        contadores = estado.contadores
         for rol in ROLES:
-            vivos_rol = [p for p in personas if p.esta_vivo() and p.rol == rol]
-            historia_roles[rol].append(len(vivos_rol))
-            riqueza_rol = sum(p.monedas for p in vivos_rol)
-            historia_riqueza[rol].append(riqueza_rol)
-
-    # métricas finales
-    riqueza_final_por_rol = {
-        rol: sum(p.monedas for p in personas if p.rol == rol)
-        for rol in ROLES
+            estado.historia_roles[rol].append(contadores.vivos[rol])
+            estado.historia_riqueza[rol].append(contadores.riqueza_viva[rol])
+
+
+def _motivo_parada(estado: EstadoMundo) -> Optional[str]:
+    """La primera condición de config.parar_si que se cumple tras el turno."""
+    paradas = estado.config.parar_si
+    if not paradas:
+        return None
+    contadores = estado.contadores
+    vivos = sum(contadores.vivos.values())
+    if "extincion" in paradas and vivos == 0:
+        return "extincion"
+    if "superviviente" in paradas and vivos <= 1:
+        return "superviviente"
+    if "estable" in paradas:
+        firma = (tuple(contadores.vivos.values()), tuple(contadores.riqueza_viva.values()))
+        estado.turnos_estables = estado.turnos_estables + 1 if firma == estado.firma else 0
+        estado.firma = firma
+        if estado.turnos_estables >= estado.config.ventana_estable:
+            return "estable"
+    return None
+
+
+def _puede_avanzar_rapido(estado: EstadoMundo) -> bool:
+    """Nadie puede interactuar ni recoger nada: ningún vivo, o uno y sin monedas."""
+    if not estado.config.avance_rapido:
+        return False
+    vivos = sum(estado.contadores.vivos.values())
+    return vivos == 0 or (vivos == 1 and not estado.monedas)
+
+
+def _turno_rapido(estado: EstadoMundo, historia_en_memoria: bool) -> None:
+    """
+    Turno sin fases por agente: evento, envejecer al superviviente (sin
+    moverlo) y estadísticas. Sin nadie vivo es lo mismo que un turno normal.
+    """
+    fase_evento(estado)
+    if sum(estado.contadores.vivos.values()):
+        if estado.monedas:
+            # la lluvia ha dejado monedas: el resto del turno, como siempre
+            for _, fase in FASES[1:]:
+                fase(estado)
+        else:
+            for p in estado.personas:
+                if p.esta_vivo():
+                    p.edad_turnos += 1
+                    estado.contadores.envejecer(p)
+    fase_estadisticas(estado, historia_en_memoria)
+
+
+# fases que cambian el mundo, con el nombre que usan benchmark.py y compañía
+FASES = (
+    ("eventos", fase_evento),
+    ("territorios", fase_territorios),
+    ("movimiento", fase_movimiento),
+    ("monedas", fase_monedas),
+    ("interacciones", fase_interacciones),
+)
+
+
+def _acumulados(estado: EstadoMundo) -> Dict[str, int]:
+    """Totales desde el turno 0 de los contadores de instrumentacion.CONTADORES."""
+    return {
+        "decisiones": estado.decisiones,
+        "parejas": estado.parejas_evaluadas,
+        # cada combate suma uno a los dos roles que pelean
+        "combates": sum(estado.contadores.combates.values()) // 2,
+        "comercios": estado.total_comercios,
+        "monedas_recogidas": estado.monedas_recogidas,
     }
+
+
+def _fases_observadas(estado: EstadoMundo, observador: Observador,
+                      historia_en_memoria: bool) -> None:
+    """
+    Las fases del turno, avisando al observador de cada una. Un turno de
+    avance rápido se ve como una sola fase, "avance_rapido".
+    """
+    turno = estado.turno
+    antes = _acumulados(estado)
+    observador.inicio_turno(turno)
+    if _puede_avanzar_rapido(estado):
+        fases = (("avance_rapido", lambda e: _turno_rapido(e, historia_en_memoria)),)
+    else:
+        fases = FASES + (
+            ("estadisticas", lambda e: fase_estadisticas(e, historia_en_memoria)),
+        )
+    for nombre, fase in fases:
+        observador.inicio_fase(turno, nombre)
+        t0 = perf_counter()
+        fase(estado)
+        observador.fin_fase(turno, nombre, perf_counter() - t0)
+
+    despues = _acumulados(estado)
+    instantanea = None
+    if observador.memoria_cada and turno % observador.memoria_cada == 0 \
+            and tracemalloc.is_tracing():
+        instantanea = tracemalloc.take_snapshot()
+    observador.fin_turno(
+        turno, {c: despues[c] - antes[c] for c in despues}, instantanea
+    )
+
+
+def ejecutar_turno(
+    estado: EstadoMundo,
+    sumidero: Optional[SumideroTelemetria] = None,
+    historia_en_memoria: bool = True,
+    observador: Optional[Observador] = None,
+) -> None:
+    """
+    Simula el turno estado.turno y avanza el contador. Si se cumple una
+    condición de config.parar_si, queda en estado.motivo_fin.
+    """
+    contadores = estado.contadores
+    if sumidero is not None:
+        muertes_antes = dict(estado.muertes_en_territorio)
+        comercios_antes = estado.total_comercios
+
+    if estado.config.azar_por_bloques:
+        # uniformes del turno de una vez (aprox. unos pocos por persona viva)
+        estado.rng.preparar(4 * sum(contadores.vivos.values()) + 16)
+
+    if observador is not None:
+        _fases_observadas(estado, observador, historia_en_memoria)
+    elif _puede_avanzar_rapido(estado):
+        _turno_rapido(estado, historia_en_memoria)
+    else:
+        for _, fase in FASES:
+            fase(estado)
+        fase_estadisticas(estado, historia_en_memoria)
+    if sumidero is not None:
+        sumidero.escribir_turno(
+            estado.turno,
+            contadores.vivos,
+            contadores.riqueza_viva,
+            {t: n - muertes_antes[t] for t, n in estado.muertes_en_territorio.items()},
+            estado.total_comercios - comercios_antes,
+            estado.evento,
+        )
+    estado.turno += 1
+    estado.motivo_fin = _motivo_parada(estado)
+
+
+def resultados_estado(estado: EstadoMundo) -> Dict:
+    """Métricas finales a partir del estado (el dict que devuelve simular)."""
+    contadores = estado.contadores
+    riqueza_final_por_rol = dict(contadores.riqueza_total)
     rol_mas_rico = max(riqueza_final_por_rol, key=riqueza_final_por_rol.get)
 
     # rol más longevo (edad media)
-    edad_media_por_rol = {}
-    for rol in ROLES:
-        agentes = [p for p in personas if p.rol == rol]
-        if agentes:
-            edad_media = sum(p.edad_turnos for p in agentes) / len(agentes)
-        else:
-            edad_media = 0
-        edad_media_por_rol[rol] = edad_media
+    edad_media_por_rol = contadores.edad_media()
     rol_mas_longevo = max(edad_media_por_rol, key=edad_media_por_rol.get)
 
     # rol más violento (más combates totales)
-    combates_por_rol = {
-        rol: sum(p.combates_totales for p in personas if p.rol == rol)
-        for rol in ROLES
-    }
+    combates_por_rol = dict(contadores.combates)
     rol_mas_violento = max(combates_por_rol, key=combates_por_rol.get)
 
+    muertes_en_territorio = estado.muertes_en_territorio
     territorio_mas_letal = max(
         muertes_en_territorio, key=muertes_en_territorio.get
     )
 
-    media_comercio_por_turno = total_comercios / N_TURNOS
+    # por turno simulado (menos de n_turnos si se ha parado antes)
+    media_comercio_por_turno = estado.total_comercios / estado.turno
 
     resultados = {
-        "personas": personas,
-        "territorios": territorios,
-        "monedas": monedas,
-        "historia_roles": historia_roles,
-        "historia_riqueza": historia_riqueza,
-        "muertes_por_rol": muertes_por_rol,
+        "personas": estado.personas,
+        "territorios": estado.territorios,
+        "monedas": estado.monedas,
+        "historia_roles": estado.historia_roles,
+        "historia_riqueza": estado.historia_riqueza,
+        "muertes_por_rol": estado.muertes_por_rol,
         "muertes_en_territorio": muertes_en_territorio,
         "riqueza_final_por_rol": riqueza_final_por_rol,
         "edad_media_por_rol": edad_media_por_rol,
@@ -241,126 +533,209 @@ def simular():
         "rol_mas_violento": rol_mas_violento,
         "territorio_mas_letal": territorio_mas_letal,
         "media_comercio_por_turno": media_comercio_por_turno,
+        "fin": {"motivo": estado.motivo_fin or "turnos", "turno": estado.turno},
     }
 
     return resultados
 
-# -------------------------------------------------------------------
-# FUNCIONES DE GRÁFICA (ANTES ESTABAN EN visualizacion.py)
-# -------------------------------------------------------------------
 
-def graficar_evolucion_roles(historia_roles: Dict[str, List[int]]) -> None:
-    turnos = range(len(next(iter(historia_roles.values()))))
-    for rol in ROLES:
-        plt.plot(turnos, historia_roles[rol], label=rol)
-    plt.xlabel("Turno")
-    plt.ylabel("Nº de agentes")
-    plt.title("Evolución de agentes por rol")
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
-
-
-def graficar_riqueza_por_rol(historia_riqueza: Dict[str, List[int]]) -> None:
-    turnos = range(len(next(iter(historia_riqueza.values()))))
-    for rol in ROLES:
-        plt.plot(turnos, historia_riqueza[rol], label=rol)
-    plt.xlabel("Turno")
-    plt.ylabel("Riqueza total")
-    plt.title("Evolución de riqueza total por rol")
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
-
-
-def graficar_muertes(muertes_por_rol: Dict[str, int]) -> None:
-    roles = list(muertes_por_rol.keys())
-    valores = [muertes_por_rol[r] for r in roles]
-    plt.bar(roles, valores)
-    plt.xlabel("Rol")
-    plt.ylabel("Muertes")
-    plt.title("Muertes por rol")
-    plt.tight_layout()
-    plt.show()
-
-
-def mapa_final(
-    personas: List[Persona],
-    territorios: List[Territorio],
-    monedas: Dict[Tuple[int, int], List[int]],
-    ancho: int,
-    alto: int
-) -> None:
+def simular(
+    config: Optional[ConfigSimulacion] = None,
+    semilla: Optional[int] = None,
+    backend: str = "objetos",
+    sumidero: Optional[SumideroTelemetria] = None,
+    historia_en_memoria: bool = True,
+    checkpoint_cada: Optional[int] = None,
+    ruta_checkpoint: Optional[str] = None,
+    reanudar_desde: Optional[str] = None,
+    observador: Optional[Observador] = None,
+    grabar_fotogramas: int = 0,
+    eventos: Optional[CatalogoEventos] = None,
+):
     """
-    Scatter del turno final:
-    - personas coloreadas por rol
-    - monedas en amarillo
-    - territorios como rectángulos semitransparentes
+    config: parámetros de la ejecución (por defecto, los globales).
+    semilla: semilla del generador de la ejecución; sin ella se saca una
+    del random global. Todo el azar sale de ese generador.
+    backend elige el motor:
+    - "objetos": un Persona por agente (implementación de referencia)
+    - "numpy": columnas NumPy y fases vectorizadas (motor_numpy.py),
+      para poblaciones muy grandes
+    - "dominios": el motor numpy repartido en procesos por franjas del
+      tablero (motor_dominios.py; config.dominios y config.halo)
+    sumidero: recibe cada turno según se simula (ver telemetria.py).
+    historia_en_memoria: si es False, historia_roles/historia_riqueza
+    se devuelven vacías (útil con un sumidero en ejecuciones largas).
+    checkpoint_cada / ruta_checkpoint: guarda el estado del mundo en
+    ruta_checkpoint cada tantos turnos (ver mundo.py).
+    reanudar_desde: sigue desde un punto de control guardado; la config y
+    la semilla son las del punto de control. El resultado es el mismo que
+    el de la ejecución sin interrumpir. Solo con el motor de objetos.
+    observador: recibe el tiempo de cada fase y los contadores de cada
+    turno (ver instrumentacion.py). Solo con el motor de objetos.
+    grabar_fotogramas: si es > 0, guarda posiciones, roles y monedas cada
+    tantos turnos en res["fotogramas"] (ver fotogramas.py), para
+    visualizacion.animar / exportar_animacion. Al reanudar, la grabación
+    empieza en el punto de control. Solo con el motor de objetos.
+    eventos: catálogo de eventos globales (por defecto eventos.CATALOGO).
+    Al reanudar se usa el del punto de control.
     """
-    fig, ax = plt.subplots()
-
-    # territorios
-    for t in territorios:
-        ancho_rect = t.x_max - t.x_min + 1
-        alto_rect = t.y_max - t.y_min + 1
-        ax.add_patch(
-            plt.Rectangle(
-                (t.x_min, t.y_min),
-                ancho_rect,
-                alto_rect,
-                alpha=0.2,
-                label=t.nombre
+    if backend not in BACKENDS:
+        raise ValueError(f"backend desconocido: {backend!r} (opciones: {BACKENDS})")
+    if checkpoint_cada is not None and ruta_checkpoint is None:
+        raise ValueError("checkpoint_cada necesita ruta_checkpoint")
+    usa_checkpoints = checkpoint_cada is not None or reanudar_desde is not None
+
+    if backend in ("numpy", "dominios"):
+        if usa_checkpoints:
+            raise ValueError("los puntos de control solo existen en el motor de objetos")
+        if observador is not None:
+            raise ValueError("los observadores solo existen en el motor de objetos")
+        if grabar_fotogramas:
+            raise ValueError("los fotogramas solo se graban en el motor de objetos")
+        config = config or ConfigSimulacion.desde_globales()
+        if config.parar_si or config.avance_rapido:
+            raise ValueError("parar_si y avance_rapido solo existen en el motor de objetos")
+        rng = crear_rng(semilla, config.azar_por_bloques)
+        if backend == "dominios":
+            from motor_dominios import simular_dominios
+            return simular_dominios(
+                crear_territorios(),
+                config.ancho,
+                config.alto,
+                config.n_personas,
+                config.n_turnos,
+                semilla=rng.getrandbits(64),
+                n_procesos=config.dominios,
+                halo=config.halo,
+                sumidero=sumidero,
+                historia_en_memoria=historia_en_memoria,
+                eventos=eventos,
             )
+        # import aquí para no exigir NumPy al motor de objetos
+        from motor_numpy import simular_numpy
+        return simular_numpy(
+            crear_territorios(),
+            config.ancho,
+            config.alto,
+            config.n_personas,
+            config.n_turnos,
+            semilla=rng.getrandbits(64),
+            sumidero=sumidero,
+            historia_en_memoria=historia_en_memoria,
+            eventos=eventos,
         )
 
-    # monedas
-    xs_m = [x for (x, y) in monedas.keys() for _ in monedas[(x, y)]]
-    ys_m = [y for (x, y) in monedas.keys() for _ in monedas[(x, y)]]
-    if xs_m:
-        ax.scatter(xs_m, ys_m, c="yellow", marker="*", label="moneda", alpha=0.6)
-
-    # personas por rol
-    colores_por_rol = {
-        "recolector": "green",
-        "guerrero": "red",
-        "comerciante": "blue",
-        "explorador": "purple",
-        "avaro": "black",
-    }
+    if reanudar_desde is not None:
+        estado = cargar_estado(reanudar_desde)
+        if config is not None and config != estado.config:
+            raise ValueError(
+                f"la config no coincide con la del punto de control: {estado.config}"
+            )
+        if eventos is not None and eventos != estado.eventos:
+            raise ValueError("el catálogo de eventos no coincide con el del punto de control")
+    else:
+        estado = crear_estado(config, semilla, eventos)
+
+    grabacion = None
+    if grabar_fotogramas:
+        grabacion = GrabacionFotogramas(
+            estado.config.ancho, estado.config.alto, estado.territorios, grabar_fotogramas
+        )
+        grabacion.grabar(estado)
+
+    if sumidero is not None:
+        sumidero.abrir(
+            ROLES, list(estado.muertes_en_territorio), estado.eventos.nombres, estado.config.n_turnos,
+            turno_inicial=estado.turno,
+        )
+    # tracemalloc solo si el observador pide memoria y nadie lo ha arrancado ya
+    arrancar_tracemalloc = (
+        observador is not None and observador.memoria_cada > 0
+        and not tracemalloc.is_tracing()
+    )
+    if arrancar_tracemalloc:
+        tracemalloc.start()
+    try:
+        while not estado.terminado():
+            ejecutar_turno(estado, sumidero, historia_en_memoria, observador)
+            if grabacion is not None and grabacion.toca(estado.turno):
+                grabacion.grabar(estado)
+            if checkpoint_cada and estado.turno % checkpoint_cada == 0:
+                guardar_estado(estado, ruta_checkpoint)
+    finally:
+        if sumidero is not None:
+            sumidero.cerrar()
+        if arrancar_tracemalloc:
+            tracemalloc.stop()
+
+    resultados = resultados_estado(estado)
+    if grabacion is not None:
+        resultados["fotogramas"] = grabacion
+    return resultados
+
+# -------------------------------------------------------------------
+# FUNCIONES DE GRÁFICA (EN visualizacion.py)
+# -------------------------------------------------------------------
+
+# se siguen pudiendo importar desde aquí, pero visualizacion (y con él
+# matplotlib) solo se carga la primera vez que se usan
+_GRAFICAS = (
+    "graficar_evolucion_roles",
+    "graficar_riqueza_por_rol",
+    "graficar_muertes",
+    "mapa_final",
+    "exportar_figuras",
+    "animar",
+    "exportar_animacion",
+)
+
 
-    for rol in ROLES:
-        xs = [p.x for p in personas if p.esta_vivo() and p.rol == rol]
-        ys = [p.y for p in personas if p.esta_vivo() and p.rol == rol]
-        if xs:
-            ax.scatter(xs, ys, c=colores_por_rol.get(rol, "gray"),
-                       label=rol, alpha=0.8)
-
-    ax.set_xlim(-0.5, ancho - 0.5)
-    ax.set_ylim(-0.5, alto - 0.5)
-    ax.set_xlabel("X")
-    ax.set_ylabel("Y")
-    ax.set_title("Mapa del turno final")
-    ax.legend()
-    ax.set_aspect("equal", "box")
-    plt.tight_layout()
-    plt.show()
+def __getattr__(nombre: str):
+    if nombre in _GRAFICAS:
+        import visualizacion
+        return getattr(visualizacion, nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # -------------------------------------------------------------------
 # MAIN
 # -------------------------------------------------------------------
 
 if __name__ == "__main__":
-    res = simular()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulación de agentes por roles")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument(
+        "--exportar", metavar="RUTA",
+        help="guarda las gráficas en un PDF (RUTA.pdf) o en una carpeta de PNG, sin ventanas",
+    )
+    parser.add_argument(
+        "--animacion", metavar="RUTA",
+        help="graba la ejecución y la guarda como GIF (RUTA.gif) o como carpeta de PNG",
+    )
+    args = parser.parse_args()
+
+    res = simular(semilla=args.semilla, grabar_fotogramas=1 if args.animacion else 0)
 
     print("Rol más rico:", res["rol_mas_rico"])
     print("Rol más longevo:", res["rol_mas_longevo"])
     print("Rol más violento:", res["rol_mas_violento"])
     print("Territorio con más muertes:", res["territorio_mas_letal"])
     print("Comercios por turno:", res["media_comercio_por_turno"])
+    print("Fin:", res["fin"]["motivo"], "en el turno", res["fin"]["turno"])
 
     # --- gráficas ---
-    graficar_evolucion_roles(res["historia_roles"])
-    graficar_riqueza_por_rol(res["historia_riqueza"])
-    graficar_muertes(res["muertes_por_rol"])
-    mapa_final(res["personas"], res["territorios"], res["monedas"],
-               GRID_ANCHO, GRID_ALTO)
+    import visualizacion
+
+    if args.animacion:
+        visualizacion.exportar_animacion(res["fotogramas"], args.animacion)
+        print(f"Animación guardada en {args.animacion} ({len(res['fotogramas'])} fotogramas)")
+    if args.exportar:
+        for ruta in visualizacion.exportar_figuras(res, args.exportar, GRID_ANCHO, GRID_ALTO):
+            print("Gráficas guardadas en", ruta)
+    else:
+        visualizacion.graficar_evolucion_roles(res["historia_roles"])
+        visualizacion.graficar_riqueza_por_rol(res["historia_riqueza"])
+        visualizacion.graficar_muertes(res["muertes_por_rol"])
+        visualizacion.mapa_final(res["personas"], res["territorios"], res["monedas"],
+                                 GRID_ANCHO, GRID_ALTO)
@@ -0,0 +1,223 @@
+# telemetria.py
+"""
+Telemetría por turno: simular() va escribiendo cada turno en un "sumidero"
+según se simula, en vez de (o además de) guardar las historias en listas.
+
+Sumideros incluidos:
+- SumideroCSV: una fila de texto por turno (se puede mirar con tail -f).
+- SumideroBinario: registros de ancho fijo en un np.memmap más un .json
+  con la cabecera (roles, territorios, eventos).
+
+leer_telemetria() convierte un fichero terminado en las historias que
+esperan graficar_evolucion_roles y graficar_riqueza_por_rol.
+"""
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import csv
+import json
+import os
+
+
+class SumideroTelemetria(ABC):
+    """
+    Interfaz de un sumidero. Las subclases tienen que implementar
+    escribir_turno; abrir y cerrar no hacen nada si no se redefinen.
+    """
+
+    def abrir(self, roles: List[str], territorios: List[str],
+              eventos: List[str], n_turnos: int, turno_inicial: int = 0) -> None:
+        """
+        turno_inicial > 0 al reanudar desde un punto de control: se conservan
+        los turnos anteriores ya escritos y se descartan los posteriores.
+        """
+        pass
+
+    @abstractmethod
+    def escribir_turno(
+        self,
+        turno: int,
+        vivos: Dict[str, int],
+        riqueza: Dict[str, int],
+        muertes: Dict[str, int],
+        comercios: int,
+        evento: Optional[str],
+    ) -> None:
+        """vivos y riqueza por rol; muertes por territorio en este turno."""
+
+    def cerrar(self) -> None:
+        pass
+
+
+# -------------------------------------------------------------------
+# CSV
+# -------------------------------------------------------------------
+
+class SumideroCSV(SumideroTelemetria):
+    """Una fila por turno: turno, evento, comercios, vivos_*, riqueza_*, muertes_*."""
+
+    def __init__(self, ruta: str, vaciar_cada: int = 1):
+        self.ruta = ruta
+        self.vaciar_cada = vaciar_cada
+        self._f = None
+        self._csv = None
+
+    def abrir(self, roles, territorios, eventos, n_turnos, turno_inicial=0) -> None:
+        self.roles = list(roles)
+        self.territorios = list(territorios)
+        anteriores = []
+        if turno_inicial > 0 and os.path.exists(self.ruta):
+            with open(self.ruta, newline="", encoding="utf-8") as f:
+                anteriores = [fila for fila in list(csv.reader(f))[1:]
+                              if int(fila[0]) < turno_inicial]
+        self._f = open(self.ruta, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._f)
+        self._csv.writerow(
+            ["turno", "evento", "comercios"]
+            + [f"vivos_{r}" for r in self.roles]
+            + [f"riqueza_{r}" for r in self.roles]
+            + [f"muertes_{t}" for t in self.territorios]
+        )
+        self._csv.writerows(anteriores)
+
+    def escribir_turno(self, turno, vivos, riqueza, muertes, comercios, evento) -> None:
+        self._csv.writerow(
+            [turno, evento or "", comercios]
+            + [vivos[r] for r in self.roles]
+            + [riqueza[r] for r in self.roles]
+            + [muertes[t] for t in self.territorios]
+        )
+        if (turno + 1) % self.vaciar_cada == 0:
+            self._f.flush()
+
+    def cerrar(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+# -------------------------------------------------------------------
+# BINARIO (np.memmap)
+# -------------------------------------------------------------------
+
+def _tipo_registro(n_roles: int, n_territorios: int):
+    import numpy as np
+    return np.dtype([
+        ("turno", np.int32),
+        ("evento", np.int8),           # índice en la lista de eventos, -1 = ninguno
+        ("comercios", np.int32),
+        ("vivos", np.int32, (n_roles,)),
+        ("riqueza", np.int64, (n_roles,)),
+        ("muertes", np.int32, (n_territorios,)),
+    ])
+
+
+class SumideroBinario(SumideroTelemetria):
+    """
+    Registros de ancho fijo en 'ruta' (np.memmap, reservado para n_turnos)
+    y la cabecera en 'ruta.json'. Los turnos sin escribir tienen turno = -1,
+    así que un fichero a medias también se puede leer.
+    """
+
+    def __init__(self, ruta: str, vaciar_cada: int = 50):
+        self.ruta = ruta
+        self.vaciar_cada = vaciar_cada
+        self._datos = None
+
+    def abrir(self, roles, territorios, eventos, n_turnos, turno_inicial=0) -> None:
+        import numpy as np
+
+        self.roles = list(roles)
+        self.territorios = list(territorios)
+        self.eventos = list(eventos)
+        with open(self.ruta + ".json", "w", encoding="utf-8") as f:
+            json.dump({
+                "roles": self.roles,
+                "territorios": self.territorios,
+                "eventos": self.eventos,
+                "n_turnos": n_turnos,
+            }, f, ensure_ascii=False)
+        tipo = _tipo_registro(len(self.roles), len(self.territorios))
+        forma = (max(n_turnos, 1),)
+        if turno_inicial > 0 and os.path.exists(self.ruta):
+            self._datos = np.memmap(self.ruta, dtype=tipo, mode="r+", shape=forma)
+            self._datos["turno"][turno_inicial:] = -1
+        else:
+            self._datos = np.memmap(self.ruta, dtype=tipo, mode="w+", shape=forma)
+            self._datos["turno"] = -1
+
+    def escribir_turno(self, turno, vivos, riqueza, muertes, comercios, evento) -> None:
+        reg = self._datos[turno]
+        reg["turno"] = turno
+        reg["evento"] = self.eventos.index(evento) if evento else -1
+        reg["comercios"] = comercios
+        reg["vivos"] = [vivos[r] for r in self.roles]
+        reg["riqueza"] = [riqueza[r] for r in self.roles]
+        reg["muertes"] = [muertes[t] for t in self.territorios]
+        if (turno + 1) % self.vaciar_cada == 0:
+            self._datos.flush()
+
+    def cerrar(self) -> None:
+        if self._datos is not None:
+            self._datos.flush()
+            self._datos = None
+
+
+# -------------------------------------------------------------------
+# LECTURA
+# -------------------------------------------------------------------
+
+def leer_telemetria(ruta: str) -> Dict:
+    """
+    Lee un fichero de SumideroCSV (.csv) o SumideroBinario y devuelve
+    historia_roles, historia_riqueza, muertes_por_turno (por territorio),
+    comercios y eventos, como listas turno a turno.
+    """
+    if ruta.endswith(".csv"):
+        return _leer_csv(ruta)
+    return _leer_binario(ruta)
+
+
+def _leer_csv(ruta: str) -> Dict:
+    with open(ruta, newline="", encoding="utf-8") as f:
+        filas = list(csv.reader(f))
+    cabecera, filas = filas[0], filas[1:]
+    col = {nombre: i for i, nombre in enumerate(cabecera)}
+
+    def serie(nombre):
+        return [int(fila[col[nombre]]) for fila in filas]
+
+    def por_prefijo(prefijo):
+        return {
+            nombre[len(prefijo):]: serie(nombre)
+            for nombre in cabecera if nombre.startswith(prefijo)
+        }
+
+    return {
+        "historia_roles": por_prefijo("vivos_"),
+        "historia_riqueza": por_prefijo("riqueza_"),
+        "muertes_por_turno": por_prefijo("muertes_"),
+        "comercios": serie("comercios"),
+        "eventos": [fila[col["evento"]] or None for fila in filas],
+    }
+
+
+def _leer_binario(ruta: str) -> Dict:
+    import numpy as np
+
+    with open(ruta + ".json", encoding="utf-8") as f:
+        cab = json.load(f)
+    roles, territorios, eventos = cab["roles"], cab["territorios"], cab["eventos"]
+    tipo = _tipo_registro(len(roles), len(territorios))
+    datos = np.memmap(ruta, dtype=tipo, mode="r")
+    datos = datos[datos["turno"] >= 0]
+
+    return {
+        "historia_roles": {r: datos["vivos"][:, i].tolist() for i, r in enumerate(roles)},
+        "historia_riqueza": {r: datos["riqueza"][:, i].tolist() for i, r in enumerate(roles)},
+        "muertes_por_turno": {
+            t: datos["muertes"][:, i].tolist() for i, t in enumerate(territorios)
+        },
+        "comercios": datos["comercios"].tolist(),
+        "eventos": [eventos[e] if e >= 0 else None for e in datos["evento"]],
+    }
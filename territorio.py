@@ -1,6 +1,6 @@
 # territorio.py
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 
 @dataclass
@@ -17,3 +17,67 @@ class Territorio:
 
     def rango(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
         return (self.x_min, self.y_min), (self.x_max, self.y_max)
+
+
+class MapaTerritorios:
+    """
+    Tabla precalculada ancho x alto con el territorio de cada casilla,
+    para que cada consulta sea un acceso a lista.
+    ids[x][y] es el índice del territorio (o -1) y tipos[x][y] su tipo.
+    Se recorre igual que la lista de territorios original.
+    """
+
+    def __init__(self, territorios: List[Territorio], ancho: int, alto: int):
+        self.territorios = list(territorios)
+        self.ancho = ancho
+        self.alto = alto
+        self.ids: List[List[int]] = [[-1] * alto for _ in range(ancho)]
+        self.tipos: List[List[Optional[str]]] = [[None] * alto for _ in range(ancho)]
+
+        # al revés, para que si se solapan gane el primero (como en el bucle)
+        for i in range(len(self.territorios) - 1, -1, -1):
+            t = self.territorios[i]
+            for x in range(max(t.x_min, 0), min(t.x_max, ancho - 1) + 1):
+                col_ids = self.ids[x]
+                col_tipos = self.tipos[x]
+                for y in range(max(t.y_min, 0), min(t.y_max, alto - 1) + 1):
+                    col_ids[y] = i
+                    col_tipos[y] = t.tipo
+
+    def __iter__(self) -> Iterator[Territorio]:
+        return iter(self.territorios)
+
+    def __len__(self) -> int:
+        return len(self.territorios)
+
+    def __getitem__(self, i: int) -> Territorio:
+        return self.territorios[i]
+
+    def _dentro(self, x: int, y: int) -> bool:
+        return 0 <= x < self.ancho and 0 <= y < self.alto
+
+    def en(self, x: int, y: int) -> Optional[Territorio]:
+        if not self._dentro(x, y):
+            return _buscar_lineal(x, y, self.territorios)
+        i = self.ids[x][y]
+        return self.territorios[i] if i >= 0 else None
+
+    def tipo_en(self, x: int, y: int) -> Optional[str]:
+        if not self._dentro(x, y):
+            t = _buscar_lineal(x, y, self.territorios)
+            return t.tipo if t else None
+        return self.tipos[x][y]
+
+
+def _buscar_lineal(x: int, y: int, territorios: Iterable[Territorio]) -> Optional[Territorio]:
+    for t in territorios:
+        if t.contiene(x, y):
+            return t
+    return None
+
+
+def buscar_territorio(x: int, y: int, territorios) -> Optional[Territorio]:
+    """Territorio en (x, y) usando la tabla si la hay; si no, el primero que lo contenga."""
+    if isinstance(territorios, MapaTerritorios):
+        return territorios.en(x, y)
+    return _buscar_lineal(x, y, territorios)
@@ -0,0 +1,18 @@
+# test_extra.py
+"""
+Simulador de EXTRA.py: con max_poblacion y "sin_nacimientos" solo nace
+(con nombre y evento) quien cabe.
+"""
+from EXTRA import INFO, RegistroEventos, Simulador
+
+
+def test_sin_nacimientos_no_registra_bebes_sin_sitio():
+    registro = RegistroEventos(nivel=INFO, capacidad=100_000)
+    sim = Simulador(4, 4, 4, max_poblacion=9, registro=registro, semilla=3)
+    for _ in range(200):
+        sim.step()
+    nacidos = registro.ultimos(100_000, "nacimiento")
+    assert len(sim.personas) == 9
+    assert len(nacidos) == 5
+    assert [ev.datos["nombre"] for ev in nacidos] == [f"Nuevo{i}" for i in range(1, 6)]
+    assert sim.nombre_nuevo() is None
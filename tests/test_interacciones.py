@@ -0,0 +1,42 @@
+# test_interacciones.py
+"""
+Con interacciones_por_lotes (casillas llenas resueltas con NumPy) el
+motor de objetos da la misma distribución de resultados que con el bucle
+por parejas.
+"""
+from statistics import mean, variance
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from persona import ROLES
+from simulacion import ConfigSimulacion, simular
+
+SEMILLAS = range(16)
+Z_MAX = 4.0     # diferencia de medias admitida, en errores estándar
+
+
+def _resultados(por_lotes):
+    # unas 20 personas por casilla (más que UMBRAL_LOTES); en un turno ya
+    # muere casi todo el mundo, así que basta con uno
+    config = ConfigSimulacion(ancho=10, alto=10, n_personas=2000, n_turnos=1,
+                              interacciones_por_lotes=por_lotes)
+    resultados = []
+    for semilla in SEMILLAS:
+        res = simular(config, semilla=semilla)
+        fila = {("vivos", rol): res["historia_roles"][rol][-1] for rol in ROLES}
+        fila.update({("combates", rol): res["combates_por_rol"][rol] for rol in ROLES})
+        resultados.append(fila)
+    return resultados
+
+
+def test_por_lotes_como_bucle():
+    bucle = _resultados(False)
+    lotes = _resultados(True)
+    n = len(SEMILLAS)
+    for clave in bucle[0]:
+        a = [v[clave] for v in bucle]
+        b = [v[clave] for v in lotes]
+        error = ((variance(a) + variance(b)) / n) ** 0.5
+        assert abs(mean(a) - mean(b)) <= Z_MAX * error + 1, (clave, mean(a), mean(b))
@@ -0,0 +1,65 @@
+# test_motor_dominios.py
+"""
+El motor por franjas (dos procesos) da la misma distribución de
+resultados que motor_numpy en un proceso.
+"""
+from statistics import mean, variance
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from persona import ROLES
+from simulacion import ConfigSimulacion, simular
+
+SEMILLAS = range(16)
+Z_MAX = 4.0     # diferencia de medias admitida, en errores estándar
+
+
+def _vivos_finales(backend, dominios):
+    config = ConfigSimulacion(ancho=20, alto=20, n_personas=300, n_turnos=10,
+                              dominios=dominios)
+    finales = []
+    for semilla in SEMILLAS:
+        res = simular(config, semilla=semilla, backend=backend)
+        finales.append({rol: res["historia_roles"][rol][-1] for rol in ROLES})
+    return finales
+
+
+def test_dominios_como_numpy():
+    numpy = _vivos_finales("numpy", 1)
+    dominios = _vivos_finales("dominios", 2)
+    n = len(SEMILLAS)
+    for rol in ROLES:
+        a = [v[rol] for v in numpy]
+        b = [v[rol] for v in dominios]
+        error = ((variance(a) + variance(b)) / n) ** 0.5
+        assert abs(mean(a) - mean(b)) <= Z_MAX * error + 1, (rol, mean(a), mean(b))
+
+
+def test_memoria_compartida_acotada(tmp_path, monkeypatch):
+    """Con muchos agentes, los buzones van con los que cruzan, no con la población."""
+    import motor_dominios
+    import multiprocessing as mp
+    from multiprocessing import shared_memory
+
+    if mp.get_start_method() != "fork":
+        pytest.skip("las franjas no heredarían la clase que cuenta los bloques")
+
+    apuntes = tmp_path / "bloques.txt"
+
+    class Contada(shared_memory.SharedMemory):
+        # los procesos de las franjas la heredan al arrancar (fork)
+        def __init__(self, name=None, create=False, size=0):
+            super().__init__(name, create, size)
+            if create:
+                with open(apuntes, "a") as f:
+                    f.write(f"{self.size}\n")
+
+    monkeypatch.setattr(motor_dominios.shared_memory, "SharedMemory", Contada)
+    n_personas = 200_000
+    config = ConfigSimulacion(ancho=40, alto=40, n_personas=n_personas, n_turnos=3, dominios=2)
+    simular(config, semilla=0, backend="dominios")
+    total = sum(int(linea) for linea in apuntes.read_text().split())
+    # menos que una sola columna int64 de la población
+    assert total < n_personas * 8, total
@@ -0,0 +1,57 @@
+# test_motor_numpy.py
+"""
+motor_numpy da la misma distribución de resultados que el motor de
+objetos (la referencia).
+"""
+from statistics import mean, variance
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from persona import ROLES
+from simulacion import ConfigSimulacion, simular
+
+SEMILLAS = range(20)
+Z_MAX = 4.0     # diferencia de medias admitida, en errores estándar
+
+
+def _vivos_finales(backend, ancho, n_personas):
+    config = ConfigSimulacion(ancho=ancho, alto=ancho, n_personas=n_personas, n_turnos=10)
+    finales = []
+    for semilla in SEMILLAS:
+        res = simular(config, semilla=semilla, backend=backend)
+        finales.append({rol: res["historia_roles"][rol][-1] for rol in ROLES})
+    return finales
+
+
+@pytest.mark.parametrize("ancho, n_personas", [(20, 300), (40, 900)])
+def test_numpy_como_objetos(ancho, n_personas):
+    objetos = _vivos_finales("objetos", ancho, n_personas)
+    numpy = _vivos_finales("numpy", ancho, n_personas)
+    n = len(SEMILLAS)
+    for rol in ROLES:
+        a = [v[rol] for v in objetos]
+        b = [v[rol] for v in numpy]
+        error = ((variance(a) + variance(b)) / n) ** 0.5
+        assert abs(mean(a) - mean(b)) <= Z_MAX * error + 1, (rol, mean(a), mean(b))
+
+
+def test_dos_mas_cercanas_con_rangos_grandes():
+    """Las dos fuentes más cercanas (desempate por rango), como a mano, aunque el rango sea enorme."""
+    import numpy as np
+    from motor_numpy import dos_mas_cercanas
+
+    rng = np.random.default_rng(0)
+    ancho, alto = 30, 30
+    fuentes = rng.random((ancho, alto)) < 0.1
+    rango = rng.permutation(ancho * alto).reshape(ancho, alto) * 50_000
+    D, F = dos_mas_cercanas(fuentes, rango)
+
+    fx, fy = np.nonzero(fuentes)
+    for x in range(ancho):
+        for y in range(alto):
+            d = np.abs(fx - x) + np.abs(fy - y)
+            orden = np.lexsort((rango[fx, fy], d))[:2]
+            assert D[:, x, y].tolist() == d[orden].tolist()
+            assert F[:, x, y].tolist() == (fx[orden] * alto + fy[orden]).tolist()
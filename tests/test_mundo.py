@@ -0,0 +1,64 @@
+# test_mundo.py
+"""
+Un punto de control guardado a mitad y reanudado da lo mismo que la
+ejecución sin interrumpir.
+"""
+import pytest
+
+from mundo import cargar_estado, guardar_estado
+from simulacion import (
+    ConfigSimulacion, crear_estado, ejecutar_turno, resultados_estado, simular,
+)
+
+# lo que no se compara directamente (objetos del tablero)
+SIN_COMPARAR = ("personas", "territorios", "monedas")
+
+CONFIGS = {
+    "normal": ConfigSimulacion(ancho=12, alto=12, n_personas=40, n_turnos=60),
+    "por_bloques": ConfigSimulacion(ancho=12, alto=12, n_personas=40, n_turnos=60,
+                                    azar_por_bloques=True),
+}
+
+
+def _comparable(res):
+    datos = {k: v for k, v in res.items() if k not in SIN_COMPARAR}
+    datos["personas"] = [
+        (p.id_, p.x, p.y, p.rol, p.energia, p.monedas, p.vivo, p.edad_turnos)
+        for p in res["personas"]
+    ]
+    datos["monedas"] = sorted((pos, sum(v)) for pos, v in res["monedas"].items())
+    return datos
+
+
+@pytest.mark.parametrize("nombre", sorted(CONFIGS))
+@pytest.mark.parametrize("semilla", [1, 7])
+def test_reanudar_da_lo_mismo(tmp_path, nombre, semilla):
+    config = CONFIGS[nombre]
+    seguida = simular(config, semilla=semilla)
+
+    ruta = str(tmp_path / "estado.ckpt")
+    estado = crear_estado(config, semilla)
+    for _ in range(25):
+        ejecutar_turno(estado)
+    guardar_estado(estado, ruta)
+    del estado
+
+    estado = cargar_estado(ruta)
+    assert estado.turno == 25
+    while not estado.terminado():
+        ejecutar_turno(estado)
+    assert _comparable(resultados_estado(estado)) == _comparable(seguida)
+
+
+@pytest.mark.parametrize("nombre", sorted(CONFIGS))
+def test_reanudar_desde_simular(tmp_path, nombre):
+    config = CONFIGS[nombre]
+    seguida = simular(config, semilla=3)
+
+    # con 60 turnos, el último punto de control es el del turno 50
+    ruta = str(tmp_path / "estado.ckpt")
+    simular(config, semilla=3, checkpoint_cada=25, ruta_checkpoint=ruta)
+    assert cargar_estado(ruta).turno == 50
+
+    reanudada = simular(semilla=3, reanudar_desde=ruta)
+    assert _comparable(reanudada) == _comparable(seguida)
@@ -4,49 +4,87 @@ from typing import Dict, Tuple, List, Optional
 import random
 
 from persona import Persona
-from territorio import Territorio
+from estadisticas import ContadoresRol
+from territorio import Territorio, buscar_territorio
 
 
 # -------------------------------------------------------------------
 # RECOGER MONEDAS
 # -------------------------------------------------------------------
 
-def recoger_monedas(persona: Persona, monedas: Dict[Tuple[int, int], List[int]]) -> None:
+def recoger_monedas(persona: Persona, monedas: Dict[Tuple[int, int], List[int]],
+                    contadores: Optional[ContadoresRol] = None) -> int:
     """
     Si hay monedas en la celda de la persona, recoge todas.
+    Devuelve el valor recogido (0 si no había).
     """
     pos = persona.posicion()
-    if pos in monedas:
-        valores = monedas.pop(pos)  # quita todas las monedas de esa casilla
-        persona.ganar_monedas(sum(valores))
+    if pos not in monedas:
+        return 0
+    valores = monedas.pop(pos)  # quita todas las monedas de esa casilla
+    cantidad = sum(valores)
+    persona.ganar_monedas(cantidad)
+    if contadores is not None and cantidad > 0:
+        contadores.monedas(persona, cantidad)
+    return cantidad
+
+
+def recoger_monedas_en_bloque(personas: List[Persona], monedas,
+                              contadores: Optional[ContadoresRol] = None) -> int:
+    """
+    Lo mismo para todos los vivos a la vez con unas MonedasDensas (una sola
+    recogida sobre todas las posiciones). Si hay varios en una casilla, se
+    las lleva el primero de la lista, como en el bucle. Devuelve el total.
+    """
+    vivos = [p for p in personas if p.esta_vivo()]
+    if not vivos or not monedas:
+        return 0
+    cantidades = monedas.recoger([p.x for p in vivos], [p.y for p in vivos])
+    total = 0
+    for i in cantidades.nonzero()[0].tolist():
+        p, cantidad = vivos[i], int(cantidades[i])
+        p.ganar_monedas(cantidad)
+        if contadores is not None:
+            contadores.monedas(p, cantidad)
+        total += cantidad
+    return total
 
 
 # -------------------------------------------------------------------
 # COMBATE
 # -------------------------------------------------------------------
 
-def combate(a: Persona, b: Persona) -> Optional[Persona]:
+def combate(a: Persona, b: Persona,
+            contadores: Optional[ContadoresRol] = None, rng=None) -> Optional[Persona]:
     """
     Devuelve el ganador o None si empatan.
     El daño y la probabilidad dependen de energía.
     """
+    if rng is None:
+        rng = random
     a.combates_totales += 1
     b.combates_totales += 1
+    if contadores is not None:
+        contadores.combate(a, b)
 
     # prob ganador proporcional a energía
     total = max(a.energia + b.energia, 1)
     prob_a = a.energia / total
 
-    if random.random() < prob_a:
+    if rng.random() < prob_a:
         b.recibir_daño(5)
         if not b.esta_vivo():
             a.combates_ganados += 1
+            if contadores is not None:
+                contadores.muerte(b)
             return a
         return None
     else:
         a.recibir_daño(5)
         if not a.esta_vivo():
             b.combates_ganados += 1
+            if contadores is not None:
+                contadores.muerte(a)
             return b
         return None
 
@@ -55,11 +93,16 @@ def combate(a: Persona, b: Persona) -> Optional[Persona]:
 # COMERCIO
 # -------------------------------------------------------------------
 
-def intercambiar(p1: Persona, p2: Persona, territorios: List[Territorio], evento_actual=None) -> bool:
+def intercambiar(p1: Persona, p2: Persona, territorios: List[Territorio],
+                 contadores: Optional[ContadoresRol] = None, rng=None) -> bool:
     """
     Si ambos aceptan comerciar y tienen moneda/objeto, intercambian.
-    Devuelve True si hubo comercio, False si no.
+    Devuelve True si hubo comercio, False si no. Los eventos que lo
+    impiden (la niebla) se miran antes de llamarla (ver eventos.py).
     """
+    if rng is None:
+        rng = random
+
     # reglas por rol
     def quiere_comerciar(p: Persona):
         if p.rol == "comerciante":
@@ -67,17 +110,13 @@ def intercambiar(p1: Persona, p2: Persona, territorios: List[Territorio], evento
         if p.rol == "guerrero":
             return False
         if p.rol == "explorador":
-            return random.random() < 0.2
+            return rng.random() < 0.2
         if p.rol == "recolector":
             return p.monedas > 0 and bool(p.objetos)
         if p.rol == "avaro":
             return False
         return False
 
-    # niebla = nada de interacciones
-    if evento_actual == "niebla":
-        return False
-
     if not (quiere_comerciar(p1) and quiere_comerciar(p2)):
         return False
 
@@ -89,6 +128,9 @@ def intercambiar(p1: Persona, p2: Persona, territorios: List[Territorio], evento
     # intercambio 1 moneda ↔ 1 objeto
     p1.monedas -= 1
     p2.monedas -= 1
+    if contadores is not None:
+        contadores.monedas(p1, -1)
+        contadores.monedas(p2, -1)
 
     obj1 = p1.objetos.pop()
     obj2 = p2.objetos.pop()
@@ -102,67 +144,13 @@ def intercambiar(p1: Persona, p2: Persona, territorios: List[Territorio], evento
     return True
 
 
-# -------------------------------------------------------------------
-# EVENTOS
-# -------------------------------------------------------------------
-
-def generar_evento() -> Optional[str]:
-    """
-    Devuelve un evento aleatorio con prob 5% por turno.
-    """
-    if random.random() < 0.05:
-        return random.choice(["lluvia", "terremoto", "plaga", "niebla", "mercado"])
-    return None
-
-
-def aplicar_evento(evento: str, personas: List[Persona],
-                   monedas: Dict[Tuple[int, int], List[int]],
-                   ancho: int, alto: int) -> Dict:
-    """
-    Aplica los efectos del evento y devuelve información
-    como lista de muertes.
-    """
-    info = {"muertes": []}
-
-    if evento == "lluvia":
-        # genera monedas nuevas
-        for _ in range(10):
-            x = random.randrange(ancho)
-            y = random.randrange(alto)
-            monedas.setdefault((x, y), []).append(random.randint(1, 5))
-
-    elif evento == "terremoto":
-        # todas las personas pierden energía
-        for p in personas:
-            if p.esta_vivo():
-                p.recibir_daño(3)
-                if not p.esta_vivo():
-                    info["muertes"].append(p)
-
-    elif evento == "plaga":
-        # algunos mueren al instante
-        for p in personas:
-            if p.esta_vivo() and random.random() < 0.1:
-                p.recibir_daño(p.energia)
-                info["muertes"].append(p)
-
-    elif evento == "mercado":
-        # aumenta comercio, pero lo hacemos desde simulación, no aquí
-        pass
-
-    elif evento == "niebla":
-        # impide combate; lo gestiona simulación
-        pass
-
-    return info
-
-
 # -------------------------------------------------------------------
 # TERRITORIOS
 # -------------------------------------------------------------------
 
 def territorio_en_posicion(x: int, y: int, territorios: List[Territorio]) -> Optional[Territorio]:
-    for t in territorios:
-        if t.contiene(x, y):
-            return t
-    return None
+    """
+    territorios puede ser la lista o un MapaTerritorios (una sola consulta
+    a la tabla en vez de recorrer todos los rectángulos).
+    """
+    return buscar_territorio(x, y, territorios)
@@ -0,0 +1,51 @@
+# visitas.py
+from __future__ import annotations
+from typing import Dict, Set, Tuple
+
+
+class MapaVisitas:
+    """
+    Casillas visitadas por cada agente, en una sola matriz de bits
+    compartida: cada agente que marca alguna casilla tiene su fila de
+    ancho*alto bits. Las filas se crean al marcar la primera casilla, así
+    que solo ocupan memoria los que la usan (los exploradores).
+    Con 20x20 son 50 bytes por agente, frente a un set de tuplas que
+    puede llegar a varios KB.
+    """
+
+    def __init__(self, ancho: int, alto: int):
+        self.ancho = ancho
+        self.alto = alto
+        self.bytes_por_agente = (ancho * alto + 7) // 8
+        self.filas: Dict[int, int] = {}     # agente -> fila en bits
+        self.bits = bytearray()
+
+    def _bit(self, fila: int, x: int, y: int) -> int:
+        return fila * self.bytes_por_agente * 8 + x * self.alto + y
+
+    def marcar(self, agente: int, x: int, y: int) -> None:
+        fila = self.filas.get(agente)
+        if fila is None:
+            fila = self.filas[agente] = len(self.filas)
+            self.bits.extend(bytes(self.bytes_por_agente))
+        i = self._bit(fila, x, y)
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def visitada(self, agente: int, x: int, y: int) -> bool:
+        fila = self.filas.get(agente)
+        if fila is None:
+            return False
+        i = self._bit(fila, x, y)
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def celdas(self, agente: int) -> Set[Tuple[int, int]]:
+        """Casillas visitadas por el agente, como set de (x, y)."""
+        return {
+            (x, y)
+            for x in range(self.ancho)
+            for y in range(self.alto)
+            if self.visitada(agente, x, y)
+        }
+
+    def nbytes(self) -> int:
+        return len(self.bits)
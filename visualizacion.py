@@ -0,0 +1,309 @@
+# visualizacion.py
+"""
+Gráficas de los resultados de simular().
+
+matplotlib se importa dentro de cada función: importar este módulo (o
+simulacion.py, que reexporta estas funciones) no carga matplotlib.
+
+- graficar_*/mapa_final: ventana interactiva (plt.show), como siempre.
+- exportar_figuras: todas las figuras de una vez a un PDF de varias páginas
+  o a un PNG por figura, sin pyplot ni ventanas (vale en un servidor).
+- animar/exportar_animacion: la ejecución turno a turno a partir de los
+  fotogramas que graba simular(grabar_fotogramas=...).
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import os
+
+from persona import Persona, ROLES
+from territorio import Territorio
+from fotogramas import GrabacionFotogramas
+
+COLORES_POR_ROL = {
+    "recolector": "green",
+    "guerrero": "red",
+    "comerciante": "blue",
+    "explorador": "purple",
+    "avaro": "black",
+}
+
+# -------------------------------------------------------------------
+# DIBUJO SOBRE UNOS EJES
+# -------------------------------------------------------------------
+
+def _dibujar_series(ax, historia: Dict[str, List[int]], ylabel: str, titulo: str) -> None:
+    turnos = range(len(next(iter(historia.values()))))
+    for rol in ROLES:
+        ax.plot(turnos, historia[rol], label=rol)
+    ax.set_xlabel("Turno")
+    ax.set_ylabel(ylabel)
+    ax.set_title(titulo)
+    ax.legend()
+
+
+def _dibujar_evolucion_roles(ax, historia_roles: Dict[str, List[int]]) -> None:
+    _dibujar_series(ax, historia_roles, "Nº de agentes", "Evolución de agentes por rol")
+
+
+def _dibujar_riqueza_por_rol(ax, historia_riqueza: Dict[str, List[int]]) -> None:
+    _dibujar_series(ax, historia_riqueza, "Riqueza total", "Evolución de riqueza total por rol")
+
+
+def _dibujar_muertes(ax, muertes_por_rol: Dict[str, int]) -> None:
+    roles = list(muertes_por_rol.keys())
+    valores = [muertes_por_rol[r] for r in roles]
+    ax.bar(roles, valores)
+    ax.set_xlabel("Rol")
+    ax.set_ylabel("Muertes")
+    ax.set_title("Muertes por rol")
+
+
+def _dibujar_territorios(ax, territorios: List[Territorio]) -> None:
+    from matplotlib.patches import Rectangle
+
+    for t in territorios:
+        ancho_rect = t.x_max - t.x_min + 1
+        alto_rect = t.y_max - t.y_min + 1
+        ax.add_patch(
+            Rectangle(
+                (t.x_min, t.y_min),
+                ancho_rect,
+                alto_rect,
+                alpha=0.2,
+                label=t.nombre
+            )
+        )
+
+
+def _ejes_tablero(ax, ancho: int, alto: int, titulo: str) -> None:
+    ax.set_xlim(-0.5, ancho - 0.5)
+    ax.set_ylim(-0.5, alto - 0.5)
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+    ax.set_title(titulo)
+    ax.legend()
+    ax.set_aspect("equal", "box")
+
+
+def _dibujar_mapa(
+    ax,
+    personas: List[Persona],
+    territorios: List[Territorio],
+    monedas: Dict[Tuple[int, int], List[int]],
+    ancho: int,
+    alto: int,
+) -> None:
+    _dibujar_territorios(ax, territorios)
+
+    # monedas
+    xs_m = [x for (x, y) in monedas.keys() for _ in monedas[(x, y)]]
+    ys_m = [y for (x, y) in monedas.keys() for _ in monedas[(x, y)]]
+    if xs_m:
+        ax.scatter(xs_m, ys_m, c="yellow", marker="*", label="moneda", alpha=0.6)
+
+    # personas por rol
+    for rol in ROLES:
+        xs = [p.x for p in personas if p.esta_vivo() and p.rol == rol]
+        ys = [p.y for p in personas if p.esta_vivo() and p.rol == rol]
+        if xs:
+            ax.scatter(xs, ys, c=COLORES_POR_ROL.get(rol, "gray"),
+                       label=rol, alpha=0.8)
+
+    _ejes_tablero(ax, ancho, alto, "Mapa del turno final")
+
+
+def _preparar_animacion(ax, grabacion: GrabacionFotogramas):
+    """
+    Dibuja lo fijo (territorios, ejes, leyenda) y crea los artistas que
+    cambian (animated=True: el dibujo normal del lienzo no los pinta).
+    Devuelve actualizar(fotograma) -> artistas, que solo cambia datos
+    (set_offsets, colores y texto) sin crear nada.
+    """
+    import numpy as np
+    from matplotlib.colors import to_rgba
+    from matplotlib.lines import Line2D
+
+    _dibujar_territorios(ax, grabacion.territorios)
+    monedas = ax.scatter([], [], c="yellow", marker="*", alpha=0.6, animated=True)
+    personas = ax.scatter([], [], alpha=0.8, animated=True)
+    turno = ax.text(0.02, 0.98, "", transform=ax.transAxes, va="top", animated=True)
+    colores = np.array([to_rgba(COLORES_POR_ROL.get(rol, "gray")) for rol in ROLES])
+
+    # la leyenda no puede salir de scatters vacíos: marcadores de muestra
+    for rol in ROLES:
+        ax.add_line(Line2D([], [], marker="o", linestyle="", label=rol,
+                           color=COLORES_POR_ROL.get(rol, "gray")))
+    ax.add_line(Line2D([], [], marker="*", linestyle="", color="yellow", label="moneda"))
+    _ejes_tablero(ax, grabacion.ancho, grabacion.alto, "Evolución del mapa")
+
+    def posiciones(xs, ys):
+        return np.column_stack((np.frombuffer(xs, dtype=np.uint16),
+                                np.frombuffer(ys, dtype=np.uint16)))
+
+    def actualizar(foto):
+        monedas.set_offsets(posiciones(foto.monedas_x, foto.monedas_y))
+        personas.set_offsets(posiciones(foto.xs, foto.ys))
+        personas.set_facecolor(colores[np.frombuffer(foto.roles, dtype=np.uint8)])
+        turno.set_text(f"Turno {foto.turno}")
+        return monedas, personas, turno
+
+    return actualizar
+
+# -------------------------------------------------------------------
+# VENTANAS (pyplot)
+# -------------------------------------------------------------------
+
+def _mostrar(dibujar, *args) -> None:
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    dibujar(ax, *args)
+    fig.tight_layout()
+    plt.show()
+
+
+def graficar_evolucion_roles(historia_roles: Dict[str, List[int]]) -> None:
+    _mostrar(_dibujar_evolucion_roles, historia_roles)
+
+
+def graficar_riqueza_por_rol(historia_riqueza: Dict[str, List[int]]) -> None:
+    _mostrar(_dibujar_riqueza_por_rol, historia_riqueza)
+
+
+def graficar_muertes(muertes_por_rol: Dict[str, int]) -> None:
+    _mostrar(_dibujar_muertes, muertes_por_rol)
+
+
+def mapa_final(
+    personas: List[Persona],
+    territorios: List[Territorio],
+    monedas: Dict[Tuple[int, int], List[int]],
+    ancho: int,
+    alto: int
+) -> None:
+    """
+    Scatter del turno final:
+    - personas coloreadas por rol
+    - monedas en amarillo
+    - territorios como rectángulos semitransparentes
+    """
+    _mostrar(_dibujar_mapa, personas, territorios, monedas, ancho, alto)
+
+# -------------------------------------------------------------------
+# EXPORTACIÓN SIN VENTANAS
+# -------------------------------------------------------------------
+
+def exportar_figuras(res: Dict, ruta: str, ancho: int, alto: int, dpi: int = 100) -> List[str]:
+    """
+    Dibuja las cuatro figuras de un resultado de simular() y las guarda:
+    - si ruta acaba en .pdf, en un único PDF (una página por figura);
+    - si no, ruta es una carpeta y se escribe un PNG por figura.
+    Usa Figure directamente (lienzo Agg), sin pyplot: no necesita pantalla.
+    Devuelve los ficheros escritos.
+    """
+    from matplotlib.figure import Figure
+
+    figuras = []
+    for nombre, dibujar, args in (
+        ("evolucion_roles", _dibujar_evolucion_roles, (res["historia_roles"],)),
+        ("riqueza_por_rol", _dibujar_riqueza_por_rol, (res["historia_riqueza"],)),
+        ("muertes", _dibujar_muertes, (res["muertes_por_rol"],)),
+        ("mapa_final", _dibujar_mapa,
+         (res["personas"], res["territorios"], res["monedas"], ancho, alto)),
+    ):
+        fig = Figure()
+        dibujar(fig.add_subplot(), *args)
+        fig.tight_layout()
+        figuras.append((nombre, fig))
+
+    if ruta.lower().endswith(".pdf"):
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        with PdfPages(ruta) as pdf:
+            for _, fig in figuras:
+                pdf.savefig(fig)
+        return [ruta]
+
+    os.makedirs(ruta, exist_ok=True)
+    escritos = []
+    for nombre, fig in figuras:
+        destino = os.path.join(ruta, f"{nombre}.png")
+        fig.savefig(destino, dpi=dpi)
+        escritos.append(destino)
+    return escritos
+
+# -------------------------------------------------------------------
+# ANIMACIÓN DE UNA EJECUCIÓN
+# -------------------------------------------------------------------
+
+def animar(grabacion: GrabacionFotogramas, intervalo_ms: int = 50) -> None:
+    """Ventana con la ejecución animada (FuncAnimation con blitting)."""
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    fig, ax = plt.subplots()
+    actualizar = _preparar_animacion(ax, grabacion)
+    fig.tight_layout()
+    # hay que guardar la animación en una variable mientras se muestra
+    animacion = FuncAnimation(fig, actualizar, frames=grabacion.fotogramas,
+                              interval=intervalo_ms, blit=True)
+    plt.show()
+    del animacion
+
+
+def exportar_animacion(grabacion: GrabacionFotogramas, ruta: str,
+                       dpi: int = 80, fps: int = 20) -> List[str]:
+    """
+    Guarda la ejecución sin ventanas:
+    - si ruta acaba en .gif, en un GIF animado (fps fotogramas por segundo);
+    - si no, ruta es una carpeta y se escribe un PNG por fotograma.
+    El fondo (territorios, ejes, leyenda) se dibuja una sola vez; en cada
+    fotograma se restaura y se pintan encima solo los puntos (blitting
+    sobre el lienzo Agg). Todo el GIF se arma en memoria: para
+    ejecuciones muy largas, mejor grabar con cada > 1 o usar PNG.
+    Devuelve los ficheros escritos.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from PIL import Image  # dependencia de matplotlib
+
+    fig = Figure(dpi=dpi)
+    lienzo = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    actualizar = _preparar_animacion(ax, grabacion)
+    fig.tight_layout()
+    lienzo.draw()
+    fondo = lienzo.copy_from_bbox(fig.bbox)
+
+    tam = lienzo.get_width_height()
+
+    def imagenes():
+        # con paleta (la del primer fotograma para todos, así los colores no
+        # parpadean): cuatro veces menos datos que RGBA al comprimir
+        paleta = None
+        for foto in grabacion.fotogramas:
+            lienzo.restore_region(fondo)
+            for artista in actualizar(foto):
+                ax.draw_artist(artista)
+            rgb = Image.frombuffer("RGBA", tam, lienzo.buffer_rgba(), "raw", "RGBA", 0, 1).convert("RGB")
+            if paleta is None:
+                paleta = rgb.quantize(colors=64, method=Image.Quantize.FASTOCTREE)
+                yield foto, paleta
+            else:
+                yield foto, rgb.quantize(palette=paleta, dither=Image.Dither.NONE)
+
+    if ruta.lower().endswith(".gif"):
+        cuadros = [img for _, img in imagenes()]
+        if cuadros:
+            # optimize=False: todos comparten paleta, no hace falta rehacerla
+            cuadros[0].save(ruta, save_all=True, append_images=cuadros[1:],
+                            duration=1000 // fps, loop=0, optimize=False)
+        return [ruta]
+
+    os.makedirs(ruta, exist_ok=True)
+    escritos = []
+    for foto, img in imagenes():
+        destino = os.path.join(ruta, f"turno_{foto.turno:05d}.png")
+        img.save(destino, compress_level=1)   # comprimir más tarda más que dibujar
+        escritos.append(destino)
+    return escritos